@@ -5,5 +5,5 @@ class ApiConfig(AppConfig):
     name = 'api'
 
     def ready(self):
-        # import api.signals 
-        pass
\ No newline at end of file
+        import api.checks  # Registers system checks
+        import api.signals  # Registers signal receivers
\ No newline at end of file
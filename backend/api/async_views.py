@@ -0,0 +1,103 @@
+"""
+Async versions of the read-heavy endpoints, served when ASYNC_VIEWS is on
+(the default under config/asgi.py).
+
+DRF dispatches synchronously, so `AsyncAPIViewMixin` makes `dispatch` a
+coroutine: authentication, permission and throttle checks, which may hit
+the user cache or the database, run in the request's sync thread; async
+handlers are awaited on the event loop and read through the async ORM;
+sync handlers (the write paths) run through sync_to_async, as Django would
+run a sync view under ASGI. Responses match the sync views exactly.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.http import Http404
+from rest_framework.response import Response
+from .auth_views import UserAPIView
+from .reports import asummarize_transactions
+from .serializers import UserSerializer, values_rows
+from .views import DashboardSummaryView, ExpenseViewSet, IncomeViewSet
+
+
+class AsyncAPIViewMixin:
+    """Coroutine `dispatch` for DRF views and viewsets; put it first in the bases."""
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        # Viewsets build their own view function, which Django would
+        # otherwise take for a sync view
+        return markcoroutinefunction(super().as_view(*args, **kwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def aget_object(self):
+        """`get_object` through the async ORM."""
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (ObjectDoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+
+class AsyncTransactionReadMixin(AsyncAPIViewMixin):
+    """Async list and retrieve for the income and expense viewsets."""
+
+    async def list(self, request, *args, **kwargs):
+        return await self.aconditional_response(self.alist, request, *args, **kwargs)
+
+    async def retrieve(self, request, *args, **kwargs):
+        return await self.aconditional_response(self.aretrieve, request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        queryset, fields = self.get_list_rows(request)
+        page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+        if page is not None:
+            return self.get_paginated_response(values_rows(page, fields))
+        return Response(values_rows([row async for row in queryset], fields))
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return Response(self.get_serializer(await self.aget_object()).data)
+
+
+class AsyncIncomeViewSet(AsyncTransactionReadMixin, IncomeViewSet):
+    pass
+
+
+class AsyncExpenseViewSet(AsyncTransactionReadMixin, ExpenseViewSet):
+    pass
+
+
+class AsyncDashboardSummaryView(AsyncAPIViewMixin, DashboardSummaryView):
+    async def get(self, request):
+        params = self.get_query_params(request)
+        return self.summary_response(params, await asummarize_transactions(request.user, **params))
+
+
+class AsyncUserAPIView(AsyncAPIViewMixin, UserAPIView):
+    async def get(self, request):
+        # The user was loaded by authentication; nothing left to query
+        return Response(UserSerializer(request.user).data)
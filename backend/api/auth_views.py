@@ -4,6 +4,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from .serializers import RegisterSerializer, LoginSerializer, UserSerializer
+from .token_blacklist import revoke_refresh_token
 from rest_framework_simplejwt.tokens import RefreshToken
 
 logger = logging.getLogger(__name__)
@@ -65,8 +66,7 @@ class LogoutAPIView(APIView):
             
             if refresh_token:
                 # Blacklist the refresh token
-                token = RefreshToken(refresh_token)
-                token.blacklist()
+                revoke_refresh_token(refresh_token)
                 
                 return Response({"detail": "Successfully logged out."}, status=status.HTTP_200_OK)
             else:
@@ -1,18 +1,136 @@
+import copy
 import logging
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
 
 logger = logging.getLogger(__name__)
 
+class UserCache:
+    """
+    Cache of authenticated users for the JWT auth path.
+
+    Entries live in an in-process LRU keyed by (user_id, jti) and expire
+    after `ttl` seconds. An optional shared Django cache (by alias) lets
+    workers reuse each other's lookups. Saving or deleting a user drops
+    its entries; other processes see the change within `ttl` seconds.
+    """
+
+    def __init__(self, max_size=1024, ttl=60, shared_alias=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.shared = caches[shared_alias] if shared_alias else None
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+
+    def _shared_key(self, user_id):
+        return f"jwt_user:{user_id}"
+
+    def get(self, user_id, jti):
+        key = (str(user_id), jti)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, user = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    return copy.copy(user)
+                self._discard(key)
+
+        if self.shared is not None:
+            user = self.shared.get(self._shared_key(user_id))
+            if user is not None:
+                self._store(key, user)
+                return copy.copy(user)
+        return None
+
+    def set(self, user_id, jti, user):
+        self._store((str(user_id), jti), user)
+        if self.shared is not None:
+            self.shared.set(self._shared_key(user_id), user, self.ttl)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            for key in list(self._keys_by_user.get(str(user_id), ())):
+                self._discard(key)
+        if self.shared is not None:
+            self.shared.delete(self._shared_key(user_id))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _store(self, key, user):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(key)
+            self._keys_by_user.setdefault(key[0], set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._discard(next(iter(self._entries)))
+
+    def _discard(self, key):
+        self._entries.pop(key, None)
+        keys = self._keys_by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[key[0]]
+
+
+_user_cache = None
+_user_cache_lock = threading.Lock()
+
+def get_user_cache():
+    """Returns the process-wide UserCache, or None when JWT_USER_CACHE is disabled."""
+    global _user_cache
+    options = getattr(settings, 'JWT_USER_CACHE', {})
+    if not options.get('ENABLED', False):
+        return None
+    if _user_cache is None:
+        with _user_cache_lock:
+            if _user_cache is None:
+                _user_cache = UserCache(
+                    max_size=options.get('MAX_SIZE', 1024),
+                    ttl=options.get('TTL', 60),
+                    shared_alias=options.get('SHARED_CACHE_ALIAS'),
+                )
+    return _user_cache
+
+def reset_user_cache():
+    global _user_cache
+    _user_cache = None
+
 class ExemptableJWTAuthentication(JWTAuthentication):
     """
     Custom JWT authentication that can be bypassed for specific endpoints.
     """
-    
+
     def authenticate(self, request):
         # Check if the request is marked as exempt from JWT authentication
         if request.META.get('JWT_AUTH_EXEMPT', False):
             logger.info("Bypassing JWT authentication for exempt endpoint")
             return None
-        
+
         # Proceed with normal JWT authentication
-        return super().authenticate(request) 
\ No newline at end of file
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        # Hot users are served from the cache instead of a SELECT per request
+        user_cache = get_user_cache()
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_cache is None or user_id is None:
+            return super().get_user(validated_token)
+
+        jti = validated_token.get(api_settings.JTI_CLAIM)
+        user = user_cache.get(user_id, jti)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, jti, user)
+        return user
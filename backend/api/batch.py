@@ -0,0 +1,122 @@
+"""
+Batched API requests.
+
+`run_batch` executes several API calls inside one HTTP request. The outer
+request has already been through middleware and authentication; each
+sub-request is dispatched straight to the resolved view with the outer
+user forced onto it, so that work is not repeated per call. Throttling is
+not skipped: every sub-request is charged to the user's rate like a
+separate call. Only the router's resource endpoints can be batched, so a
+batch cannot be used to multiply login or token attempts. Read-only
+batches may run on a small thread pool.
+"""
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.urls import Resolver404, resolve
+from django.utils.http import urlencode
+from rest_framework.response import Response
+from rest_framework.viewsets import ViewSetMixin
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+# Request headers that describe the outer body and must not leak into sub-requests
+OUTER_ONLY_META = ('CONTENT_LENGTH', 'CONTENT_TYPE', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MATCH', 'wsgi.input')
+# The only headers a caller may set on a sub-request
+SUBREQUEST_HEADERS = (
+    'accept', 'accept-language', 'if-match', 'if-none-match', 'if-modified-since', 'if-unmodified-since',
+)
+
+
+class BatchError(ValueError):
+    pass
+
+
+def resolve_api_path(path):
+    """Resolves a sub-request path, refusing anything but the API's router resources."""
+    path_info, _, query = path.partition('?')
+    if not path_info.startswith('/api/'):
+        raise BatchError(f"{path_info} is not an API path.")
+    try:
+        match = resolve(path_info)
+    except Resolver404:
+        raise BatchError(f"{path_info} does not exist.")
+    if match.url_name == 'batch':
+        raise BatchError("Batches cannot be nested.")
+    view_class = getattr(match.func, 'cls', None)
+    if not (isinstance(view_class, type) and issubclass(view_class, ViewSetMixin)):
+        raise BatchError(f"{path_info} cannot be batched.")
+    return path_info, query, match
+
+
+def build_subrequest(request, method, path_info, query, body=None, headers=None):
+    content = b'' if body is None else json.dumps(body).encode('utf-8')
+    environ = {key: value for key, value in request.META.items() if key not in OUTER_ONLY_META}
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path_info,
+        'QUERY_STRING': query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(content)),
+        'wsgi.input': io.BytesIO(content),
+    })
+    for name, value in (headers or {}).items():
+        if name.lower() in SUBREQUEST_HEADERS:
+            environ['HTTP_' + name.upper().replace('-', '_')] = str(value)
+
+    subrequest = WSGIRequest(environ)
+    # Picked up by DRF's Request: authentication is not run again
+    subrequest._force_auth_user = request.user
+    subrequest._force_auth_token = request.auth
+    return subrequest
+
+
+def execute(request, item):
+    method = item['method']
+    try:
+        path_info, query, match = resolve_api_path(item['path'])
+    except BatchError as exc:
+        return {'status': 404, 'headers': {}, 'body': {'detail': str(exc)}}
+    if item.get('params'):
+        query = '&'.join(filter(None, [query, urlencode(item['params'], doseq=True)]))
+
+    subrequest = build_subrequest(request, method, path_info, query, item.get('body'), item.get('headers'))
+    view = match.func
+    if iscoroutinefunction(view):
+        # An async view (ASYNC_VIEWS); the batch itself runs in a sync thread
+        view = async_to_sync(view)
+    response = view(subrequest, *match.args, **match.kwargs)
+
+    headers = {name: response[name] for name in ('ETag', 'Location', 'Cache-Control') if response.has_header(name)}
+    if isinstance(response, Response):
+        body = response.data
+    elif getattr(response, 'streaming', False):
+        return {'status': 400, 'headers': {}, 'body': {'detail': "Streaming responses cannot be batched."}}
+    else:
+        body = response.content.decode(response.charset or 'utf-8')
+    return {'status': response.status_code, 'headers': headers, 'body': body}
+
+
+def _execute_in_thread(request, item):
+    try:
+        return execute(request, item)
+    finally:
+        # Pool threads open their own connections; don't leave them behind
+        connections.close_all()
+
+
+def run_batch(request, items, parallel=False):
+    """
+    Runs the sub-requests in order and returns their results in the same
+    order. With `parallel`, a batch made only of safe methods runs on up to
+    API_BATCH_MAX_WORKERS threads; writes always run sequentially.
+    """
+    workers = getattr(settings, 'API_BATCH_MAX_WORKERS', 4)
+    if parallel and workers > 1 and len(items) > 1 and all(item['method'] in SAFE_METHODS for item in items):
+        with ThreadPoolExecutor(max_workers=min(workers, len(items))) as pool:
+            futures = [pool.submit(_execute_in_thread, request, item) for item in items]
+            return [future.result() for future in futures]
+    return [execute(request, item) for item in items]
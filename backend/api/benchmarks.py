@@ -0,0 +1,195 @@
+"""
+Timed scenarios for the API hot paths, run by `manage.py bench`.
+
+Each scenario drives the full request stack (middleware, authentication,
+throttling, views, serializers) through DRF's APIClient against a user
+created by `manage.py seed_demo_data`. Every iteration runs inside a
+transaction that is rolled back, so repeated runs see the same data.
+"""
+import abc
+import statistics
+import time
+from datetime import date
+from unittest import mock
+from django.conf import settings
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+from rest_framework.throttling import SimpleRateThrottle
+from rest_framework_simplejwt.tokens import RefreshToken
+from .models import Budget, Savings
+
+SCENARIOS = {}
+
+
+def scenario(name, max_queries):
+    """Registers a benchmark; `max_queries` is the per-iteration query budget."""
+    def register(cls):
+        cls.name = name
+        cls.max_queries = max_queries
+        SCENARIOS[name] = cls
+        return cls
+    return register
+
+
+class Scenario(abc.ABC):
+    def __init__(self, user, password):
+        self.user = user
+        self.password = password
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+
+    def setup(self):
+        pass
+
+    @abc.abstractmethod
+    def run(self):
+        """One timed iteration."""
+
+    def check(self, response, status_code=200):
+        if response.status_code != status_code:
+            raise AssertionError(f"{self.name}: expected {status_code}, got {response.status_code}: {response.content[:200]!r}")
+        return response
+
+
+@scenario('login', max_queries=3)
+class Login(Scenario):
+    def run(self):
+        client = APIClient()
+        self.check(client.post('/api/login/', {'email': self.user.email, 'password': self.password}, format='json'))
+
+
+@scenario('token_refresh', max_queries=6)
+class TokenRefresh(Scenario):
+    def setup(self):
+        self.refresh = str(RefreshToken.for_user(self.user))
+
+    def run(self):
+        response = self.check(APIClient().post('/api/token/refresh/', {'refresh': self.refresh}, format='json'))
+        self.refresh = response.data['refresh']
+
+
+@scenario('list_income', max_queries=3)
+class ListIncome(Scenario):
+    def run(self):
+        self.check(self.client.get('/api/income/', {'page_size': 100}))
+
+
+@scenario('paginate_expenses', max_queries=10)
+class PaginateExpenses(Scenario):
+    """Walks the first five keyset pages of the expense history."""
+
+    def run(self):
+        url = '/api/expenses/?pagination=cursor&page_size=100'
+        for _ in range(5):
+            response = self.check(self.client.get(url))
+            url = response.data['next']
+            if url is None:
+                break
+
+
+@scenario('list_budgets', max_queries=4)
+class ListBudgets(Scenario):
+    def run(self):
+        self.check(self.client.get('/api/budgets/', {'page_size': 100}))
+
+
+@scenario('create_expense', max_queries=6)
+class CreateExpense(Scenario):
+    def run(self):
+        self.check(self.client.post('/api/expenses/', {
+            'name': 'Coffee', 'amount': '3.50', 'date': date.today().isoformat(),
+        }, format='json'), 201)
+
+
+@scenario('budget_update', max_queries=10)
+class BudgetUpdate(Scenario):
+    def setup(self):
+        self.budget = Budget.objects.filter(user=self.user).prefetch_related('items').order_by('-start_date').first()
+        if self.budget is None:
+            raise AssertionError("budget_update needs seeded budgets")
+        self.items = [
+            {'id': item.id, 'category': item.category, 'expense_category': item.expense_category_id, 'planned': str(item.planned + 1)}
+            for item in self.budget.items.all()
+        ]
+
+    def run(self):
+        self.check(self.client.put(f'/api/budgets/{self.budget.id}/', {
+            'name': self.budget.name, 'target_amount': str(self.budget.target_amount),
+            'start_date': self.budget.start_date.isoformat(), 'end_date': self.budget.end_date.isoformat(),
+            'items': self.items,
+        }, format='json'))
+
+
+@scenario('savings_recalc', max_queries=5)
+class SavingsRecalc(Scenario):
+    """Full recompute from history, as done for a missing balance row."""
+
+    def run(self):
+        Savings.for_user(self.user).calculate_total()
+
+
+@scenario('dashboard_batch', max_queries=17)
+class DashboardBatch(Scenario):
+    def run(self):
+        self.check(self.client.post('/api/batch/', {'requests': [
+            {'path': path} for path in ('/api/income/', '/api/expenses/', '/api/budgets/', '/api/goals/', '/api/savings/')
+        ]}, format='json'))
+
+
+def _percentile(sorted_values, fraction):
+    index = max(0, min(len(sorted_values) - 1, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_scenario(scenario_class, user, password, iterations=20, warmup=3):
+    """Returns timing and query statistics for one scenario."""
+    bench = scenario_class(user, password)
+    timings = []
+    queries = []
+    # Throttles still run but must not trip; serialized responses are not
+    # served from the response cache, so list scenarios measure the real work
+    unlimited = {scope: '1000000000/day' for scope in SimpleRateThrottle.THROTTLE_RATES}
+    test_settings = override_settings(
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'], API_RESPONSE_CACHE_TIMEOUT=0,
+    )
+    with mock.patch.dict(SimpleRateThrottle.THROTTLE_RATES, unlimited), test_settings:
+        for iteration in range(warmup + iterations):
+            with transaction.atomic():
+                bench.setup()
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    bench.run()
+                    elapsed = time.perf_counter() - started
+                transaction.set_rollback(True)
+            if iteration >= warmup:
+                timings.append(elapsed * 1000)
+                queries.append(len(captured))
+
+    timings.sort()
+    return {
+        'iterations': iterations,
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'p50_ms': round(_percentile(timings, 0.5), 3),
+        'p95_ms': round(_percentile(timings, 0.95), 3),
+        'min_ms': round(timings[0], 3),
+        'queries': max(queries),
+        'max_queries': scenario_class.max_queries,
+    }
+
+
+def compare_to_baseline(results, baseline, tolerance=0.25):
+    """
+    Lists regressions against a previous `bench` output: a p50 slower than
+    the baseline by more than `tolerance`, or more queries than before.
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None:
+            continue
+        if result['p50_ms'] > previous['p50_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {result['p50_ms']}ms vs baseline {previous['p50_ms']}ms")
+        if result['queries'] > previous['queries']:
+            regressions.append(f"{name}: {result['queries']} queries vs baseline {previous['queries']}")
+    return regressions
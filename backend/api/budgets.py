@@ -0,0 +1,76 @@
+from decimal import Decimal
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, DecimalField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from .models import BudgetItem, Expense, UserDataVersion
+
+ZERO = Decimal('0.00')
+
+
+def _cache_key(user_id, version):
+    return f"budget_actuals:{user_id}:{version}"
+
+
+def _spent_in_window(**match):
+    """Correlated SUM of the budget owner's expenses inside the budget window."""
+    expenses = (
+        Expense.objects
+        .filter(
+            user=OuterRef('budget__user'),
+            date__gte=OuterRef('budget__start_date'),
+            date__lte=OuterRef('budget__end_date'),
+            **match
+        )
+        .order_by()
+        .values('user')
+        .annotate(total=Sum('amount'))
+        .values('total')[:1]
+    )
+    return Subquery(expenses, output_field=DecimalField(max_digits=14, decimal_places=2))
+
+
+def compute_budget_actuals(user):
+    """
+    Computes actual spend for every item of every budget the user owns in
+    a single query. Items linked to an expense category match on it,
+    other items match expense categories by name.
+    """
+    rows = (
+        BudgetItem.objects
+        .filter(budget__user=user)
+        .annotate(spent=Coalesce(
+            Case(
+                When(expense_category__isnull=False, then=_spent_in_window(category=OuterRef('expense_category'))),
+                default=_spent_in_window(category__name__iexact=OuterRef('category')),
+            ),
+            Value(ZERO),
+            output_field=DecimalField(max_digits=14, decimal_places=2),
+        ))
+        .values_list('id', 'budget_id', 'spent')
+    )
+
+    items = {}
+    budgets = {}
+    for item_id, budget_id, spent in rows:
+        spent = Decimal(spent).quantize(ZERO)
+        items[item_id] = spent
+        budgets[budget_id] = budgets.get(budget_id, ZERO) + spent
+    return {'items': items, 'budgets': budgets}
+
+
+def get_budget_actuals(user, version=None):
+    """
+    Cached `compute_budget_actuals`, keyed by the user's data version (read
+    unless the caller already has it). Every write to expenses, budgets or
+    categories bumps the version in the database, so no process can serve
+    an entry computed before a write another process made.
+    """
+    if version is None:
+        version = UserDataVersion.current(user.pk)
+    key = _cache_key(user.pk, version)
+    actuals = cache.get(key)
+    if actuals is None:
+        actuals = compute_budget_actuals(user)
+        cache.set(key, actuals, getattr(settings, 'BUDGET_ACTUALS_CACHE_TIMEOUT', 300))
+    return actuals
@@ -0,0 +1,80 @@
+"""
+System checks for the database connection setup (DB_CONNECTION_MODE).
+
+They run with `manage.py check`, `migrate` (so on every deploy, see
+build.sh) and `runserver`, and flag settings that work on a laptop but
+fail under load: persistent connections under ASGI, a pool that hands
+connections to threads it then cannot serve, or server-side cursors
+behind a transaction-pooling PgBouncer.
+"""
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+from django.db import DEFAULT_DB_ALIAS
+from .postgresql_pool.pool import pool_options
+
+POOL_ENGINE = 'api.postgresql_pool'
+
+
+def database_connection_issues(database, mode):
+    """The check messages for one DATABASES entry under connection `mode`."""
+    if mode not in settings.DB_CONNECTION_MODES:
+        return [Error(
+            f"Unknown DB_CONNECTION_MODE {mode!r}.",
+            hint=f"Use one of: {', '.join(settings.DB_CONNECTION_MODES)}.",
+            id='api.E001',
+        )]
+
+    engine = database.get('ENGINE', '')
+    if engine != POOL_ENGINE and 'postgresql' not in engine:
+        if mode == 'persistent':
+            return []
+        return [Warning(
+            f"DB_CONNECTION_MODE {mode!r} only applies to PostgreSQL and is ignored for {engine}.",
+            hint="Set DATABASE_URL to a PostgreSQL (or PgBouncer) URL.",
+            id='api.W001',
+        )]
+
+    issues = []
+    max_age = database.get('CONN_MAX_AGE', 0)
+    if settings.ASYNC_VIEWS and (max_age is None or max_age > 0):
+        issues.append(Warning(
+            "Persistent database connections under ASGI: each request runs in a new thread, "
+            "which keeps its own connection open for CONN_MAX_AGE seconds.",
+            hint="Use DB_CONNECTION_MODE=pool or pgbouncer.",
+            id='api.W002',
+        ))
+    if engine == POOL_ENGINE:
+        if max_age != 0:
+            issues.append(Warning(
+                "Pooled connections are only returned to the pool when Django closes them, "
+                "so CONN_MAX_AGE should be 0.",
+                id='api.W003',
+            ))
+        threads = settings.JOBS.get('THREADS', 1)
+        if pool_options()['MAX_SIZE'] < threads:
+            issues.append(Warning(
+                f"DB_POOL['MAX_SIZE'] is smaller than the {threads} run_jobs threads, "
+                "which will wait on each other for connections.",
+                hint="Raise DB_POOL_MAX_SIZE to at least the worker thread count.",
+                id='api.W004',
+            ))
+    if mode == 'pgbouncer':
+        if not database.get('DISABLE_SERVER_SIDE_CURSORS'):
+            issues.append(Warning(
+                "Server-side cursors (QuerySet.iterator()) break under PgBouncer transaction pooling.",
+                hint="Set DISABLE_SERVER_SIDE_CURSORS to True.",
+                id='api.W005',
+            ))
+        options = database.get('OPTIONS', {})
+        if options.get('prepare_threshold') is not None or options.get('server_side_binding'):
+            issues.append(Warning(
+                "Prepared statements break under PgBouncer transaction pooling.",
+                hint="Remove prepare_threshold and server_side_binding from OPTIONS.",
+                id='api.W006',
+            ))
+    return issues
+
+
+@register()
+def check_database_connections(app_configs, **kwargs):
+    return database_connection_issues(settings.DATABASES[DEFAULT_DB_ALIAS], settings.DB_CONNECTION_MODE)
@@ -0,0 +1,128 @@
+"""
+Per-request connection overhead under each DB_CONNECTION_MODE, run by
+`manage.py bench_connections`.
+
+Each simulated request goes through Django's request lifecycle for
+connections (close_old_connections before and after, as the
+request_started/finished signals do), opens its connection, runs a few
+trivial queries and ends. `threads` such requests run concurrently per
+mode, each thread with its own connection wrapper as under a threaded
+worker. Setup is the time to get a usable connection; teardown the time
+to release it at request end. On PostgreSQL the server process ids seen
+show how many server sessions a mode actually used.
+"""
+import os
+import statistics
+import threading
+import time
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+
+POSTGRES_ONLY_MODES = ('pool', 'pgbouncer')
+
+
+def mode_database(mode, url=None):
+    """
+    The DATABASES entry for `mode`: the configured database (or `url`)
+    with the mode's settings, as config/settings.py applies them. None
+    when the mode needs PostgreSQL and the database is not.
+    """
+    if url or 'DATABASE_URL' in os.environ:
+        import dj_database_url
+        base = dj_database_url.parse(url or os.environ['DATABASE_URL'])
+    else:
+        base = dict(settings.DATABASES[DEFAULT_DB_ALIAS])
+    if 'postgresql' not in base['ENGINE']:
+        if mode in POSTGRES_ONLY_MODES:
+            return None
+        return {**base, 'CONN_MAX_AGE': settings.DB_CONNECTION_MODES[mode]['CONN_MAX_AGE']}
+    return {**base, **settings.DB_CONNECTION_MODES[mode]}
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+def _summary(timings):
+    timings = sorted(timings)
+    return {
+        'mean_ms': _ms(statistics.fmean(timings)),
+        'p50_ms': _ms(timings[len(timings) // 2]),
+        'p95_ms': _ms(timings[max(int(len(timings) * 0.95) - 1, 0)]),
+    }
+
+
+def run_mode(mode, database, threads=4, requests=200, queries=3):
+    """Runs `requests` requests in each of `threads` threads; returns the timings."""
+    alias = f'bench_{mode}'
+    connections.settings[alias] = connections.configure_settings({
+        DEFAULT_DB_ALIAS: dict(settings.DATABASES[DEFAULT_DB_ALIAS]), alias: database,
+    })[alias]
+    setup, teardown, total = [], [], []
+    server_sessions = set()
+    lock = threading.Lock()
+    errors = []
+    postgres = 'postgresql' in database['ENGINE']
+    sql = 'SELECT pg_backend_pid()' if postgres else 'SELECT 1'
+
+    def worker():
+        timings = ([], [], [])
+        sessions = set()
+        connection = connections[alias]
+        try:
+            for _ in range(requests):
+                started = time.perf_counter()
+                close_old_connections()
+                connection.ensure_connection()
+                connected = time.perf_counter()
+                with connection.cursor() as cursor:
+                    for _ in range(queries):
+                        cursor.execute(sql)
+                        sessions.add(cursor.fetchone()[0])
+                queried = time.perf_counter()
+                close_old_connections()
+                finished = time.perf_counter()
+                timings[0].append(connected - started)
+                timings[1].append(finished - queried)
+                timings[2].append(finished - started)
+            connection.close()
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+        finally:
+            del connections[alias]
+        with lock:
+            setup.extend(timings[0])
+            teardown.extend(timings[1])
+            total.extend(timings[2])
+            if postgres:
+                server_sessions.update(sessions)
+
+    try:
+        # Load the backend here so a bad ENGINE fails once; each thread makes its own wrapper
+        connections[alias]
+        del connections[alias]
+        started = time.perf_counter()
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        if database['ENGINE'] == 'api.postgresql_pool':
+            from .postgresql_pool.base import close_pools
+            close_pools(alias)
+        del connections.settings[alias]
+
+    if errors:
+        return {'mode': mode, 'errors': sorted(set(errors))[:5]}
+    return {
+        'mode': mode,
+        'threads': threads,
+        'requests': len(total),
+        'requests_per_second': round(len(total) / elapsed, 1),
+        'server_sessions': len(server_sessions) or None,
+        'setup': _summary(setup),
+        'teardown': _summary(teardown),
+        'request': _summary(total),
+    }
@@ -0,0 +1,150 @@
+"""
+Streaming export of a user's financial history.
+
+Records are read with `.iterator(chunk_size=...)` and written straight
+into the response as they come, so memory use does not grow with the
+size of the history and the first bytes go out before the last query
+has run.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import date
+from decimal import Decimal
+from .budgets import get_budget_actuals
+from .models import Income, Expense, Budget, BudgetItem, Goal
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+CHUNK_SIZE = 2000
+# Flush to the client roughly every 64 KiB
+BUFFER_SIZE = 64 * 1024
+
+# record type -> (queryset builder, [(column, model lookup)])
+EXPORT_SOURCES = {
+    'income': (
+        lambda user: Income.objects.filter(user=user).order_by('date', 'id'),
+        [('id', 'id'), ('name', 'name'), ('category', 'category__name'), ('amount', 'amount'),
+         ('date', 'date'), ('description', 'description')],
+    ),
+    'expense': (
+        lambda user: Expense.objects.filter(user=user).order_by('date', 'id'),
+        [('id', 'id'), ('name', 'name'), ('category', 'category__name'), ('amount', 'amount'),
+         ('date', 'date'), ('description', 'description')],
+    ),
+    'budget': (
+        lambda user: Budget.objects.filter(user=user).order_by('start_date', 'id'),
+        [('id', 'id'), ('name', 'name'), ('target_amount', 'target_amount'), ('current_amount', 'current_amount'),
+         ('start_date', 'start_date'), ('end_date', 'end_date'), ('period', 'period'),
+         ('description', 'description')],
+    ),
+    'budget_item': (
+        lambda user: BudgetItem.objects.filter(budget__user=user).order_by('budget_id', 'id'),
+        [('id', 'id'), ('budget_id', 'budget_id'), ('category', 'category'), ('planned', 'planned'),
+         ('actual', 'actual'), ('color', 'color')],
+    ),
+    'goal': (
+        lambda user: Goal.objects.filter(user=user).order_by('deadline', 'id'),
+        [('id', 'id'), ('name', 'name'), ('target_amount', 'target_amount'), ('current_amount', 'current_amount'),
+         ('deadline', 'deadline'), ('description', 'description')],
+    ),
+}
+
+
+# record type -> (column, key in get_budget_actuals): columns derived from
+# expenses, whose stored values are not kept up to date
+DERIVED_COLUMNS = {
+    'budget': ('current_amount', 'budgets'),
+    'budget_item': ('actual', 'items'),
+}
+
+
+def _csv_columns():
+    # Every column used by any record type, in output order
+    names = ['record_type']
+    for _, columns in EXPORT_SOURCES.values():
+        names.extend(column for column, _ in columns if column not in names)
+    return names
+
+
+CSV_COLUMNS = _csv_columns()
+
+
+def iter_records(user, record_types):
+    """Yields (record_type, {column: value}) for every exported row."""
+    actuals = None
+    for record_type in record_types:
+        build_queryset, columns = EXPORT_SOURCES[record_type]
+        names = [column for column, _ in columns]
+        derived_column, actuals_key = DERIVED_COLUMNS.get(record_type, (None, None))
+        if derived_column and actuals is None:
+            actuals = get_budget_actuals(user)
+        rows = build_queryset(user).values_list(*[lookup for _, lookup in columns])
+        for row in rows.iterator(chunk_size=CHUNK_SIZE):
+            record = dict(zip(names, row))
+            if derived_column:
+                # As the API reports them; budgets without items keep their own amount
+                record[derived_column] = actuals[actuals_key].get(record['id'], record[derived_column])
+            yield record_type, record
+
+
+def _to_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def _to_json(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def iter_csv(records):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for record_type, record in records:
+        record['record_type'] = record_type
+        writer.writerow([_to_text(record.get(column)) for column in CSV_COLUMNS])
+        if buffer.tell() >= BUFFER_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_ndjson(records):
+    parts = []
+    size = 0
+    for record_type, record in records:
+        line = json.dumps({'type': record_type, **{k: _to_json(v) for k, v in record.items()}}) + '\n'
+        parts.append(line)
+        size += len(line)
+        if size >= BUFFER_SIZE:
+            yield ''.join(parts)
+            parts = []
+            size = 0
+    yield ''.join(parts)
+
+
+def iter_gzip(chunks):
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk.encode('utf-8'))
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_stream(user, output='csv', record_types=None, compress=False):
+    """Returns an iterator of response chunks for the requested export."""
+    records = iter_records(user, record_types or list(EXPORT_SOURCES))
+    chunks = iter_csv(records) if output == 'csv' else iter_ndjson(records)
+    if compress:
+        return iter_gzip(chunks)
+    return (chunk.encode('utf-8') for chunk in chunks if chunk)
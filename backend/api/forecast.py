@@ -0,0 +1,218 @@
+"""
+Cash-flow forecasts.
+
+A user's history is loaded as one daily net series (income minus expenses)
+with a single UNION query, then modelled with NumPy:
+
+* a least-squares linear trend, kept only when it is statistically
+  significant and damped as it is extrapolated, so a few good or bad
+  months do not run away over a year;
+* day-of-month seasonal averages of what the trend leaves, which capture
+  pay days and monthly bills;
+* the spread of the remaining residuals, which widens the confidence band
+  with the square root of the horizon.
+
+Rows materialized from active recurring rules are left out of the fit and
+the rules' upcoming occurrences are added as known flows instead. Results
+are cached per user data version and date, so repeat views cost two
+primary-key lookups.
+"""
+import math
+from datetime import timedelta
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Sum
+from django.utils import timezone
+from .models import Category, Expense, Goal, Income, RecurringRule, Savings, UserDataVersion
+from .recurring import project
+
+
+def forecast_options():
+    return {
+        'HISTORY_DAYS': 365,
+        'TREND_DAMPING': 0.995,
+        'CONFIDENCE_Z': 1.645,
+        'CACHE_TIMEOUT': 3600,
+        **getattr(settings, 'FORECAST', {}),
+    }
+
+
+def load_daily_net(user, start, end):
+    """
+    Returns the user's net cash flow for each day from `start` to `end`
+    inclusive as a float array, from one query. Occurrences of active
+    recurring rules are excluded; `forecast` adds those as known flows.
+    """
+    projected_rules = RecurringRule.objects.filter(user=user, is_active=True, next_occurrence__isnull=False)
+
+    def daily(model, sign):
+        return (
+            model.objects.filter(user=user, date__gte=start, date__lte=end)
+            .exclude(recurring_rule__in=projected_rules.values('id'))
+            .values('date')
+            .annotate(total=Sum(F('amount') * sign))
+            .values_list('date', 'total')
+            .order_by()
+        )
+
+    rows = daily(Income, 1).union(daily(Expense, -1), all=True)
+    net = np.zeros((end - start).days + 1)
+    if rows:
+        days, totals = zip(*rows)
+        index = np.fromiter(((day - start).days for day in days), dtype=np.int64, count=len(days))
+        np.add.at(net, index, np.array(totals, dtype=float))
+    return net
+
+
+def day_of_month(start, count):
+    """Day of month (1-31) for `count` consecutive days from `start`."""
+    days = np.arange(np.datetime64(start), np.datetime64(start) + count)
+    return (days - days.astype('datetime64[M]')).astype(np.int64) + 1
+
+
+def fit(net, start):
+    """Fits trend, day-of-month seasonality and residual spread to a daily series."""
+    count = len(net)
+    t = np.arange(count)
+    mean = float(net.mean()) if count else 0.0
+    slope, intercept = 0.0, mean
+    if count > 2:
+        centered = t - t.mean()
+        spread = float(centered @ centered)
+        fitted_slope = float(centered @ (net - mean)) / spread
+        fitted_intercept = mean - fitted_slope * t.mean()
+        standard_error = (net - (fitted_intercept + fitted_slope * t)).std(ddof=2) / np.sqrt(spread)
+        # Daily series are noisy; only a clearly significant trend is extrapolated
+        if abs(fitted_slope) > 2 * standard_error:
+            slope, intercept = fitted_slope, fitted_intercept
+    detrended = net - (intercept + slope * t)
+
+    dom = day_of_month(start, count)
+    counts = np.bincount(dom, minlength=32)
+    seasonal = np.divide(
+        np.bincount(dom, weights=detrended, minlength=32), counts,
+        out=np.zeros(32), where=counts > 0,
+    )
+    residuals = detrended - seasonal[dom]
+    sigma = float(residuals.std(ddof=1)) if count > 2 else 0.0
+    return {
+        'level': intercept + slope * (count - 1),
+        'slope': slope,
+        'seasonal': seasonal,
+        'sigma': sigma,
+    }
+
+
+def _normal_cdf(z):
+    return 0.5 * (1 + math.erf(z / math.sqrt(2)))
+
+
+def _month_end(day, months):
+    """Last day of the month `months` after the one containing `day`."""
+    year, month = divmod(day.month + months, 12)
+    return day.replace(year=day.year + year, month=month + 1, day=1) - timedelta(days=1)
+
+
+def forecast(user, months=6, today=None):
+    """
+    Projects the user's balance to the end of each of the next `months`
+    months (`net` is the change since the previous point, or since today
+    for the first) and checks every goal against its deadline. Cached per
+    data version and date.
+    """
+    today = today or timezone.localdate()
+    options = forecast_options()
+    # Creating a missing balance row bumps the version; settle it before keying
+    balance = float(Savings.for_user(user).total)
+    key = f"forecast:{user.pk}:{UserDataVersion.current(user.pk)}:{today.isoformat()}:{months}"
+    result = cache.get(key)
+    if result is None:
+        result = _forecast(user, months, today, balance, options)
+        cache.set(key, result, options['CACHE_TIMEOUT'])
+    return result
+
+
+def _forecast(user, months, today, balance, options):
+    history_start = today - timedelta(days=options['HISTORY_DAYS'] - 1)
+    model = fit(load_daily_net(user, history_start, today), history_start)
+
+    goals = list(Goal.objects.filter(user=user).order_by('deadline', 'id'))
+    month_ends = [_month_end(today, offset) for offset in range(1, months + 1)]
+    # Goals are checked against the same projection, up to five years out
+    horizon_end = min(max([month_ends[-1], *(goal.deadline for goal in goals)]), today + timedelta(days=5 * 366))
+    horizon = (horizon_end - today).days
+
+    # Element i is the projection for today + i + 1
+    h = np.arange(1, horizon + 1)
+    expected = model['level'] + model['slope'] * np.cumsum(options['TREND_DAMPING'] ** h)
+    expected += model['seasonal'][day_of_month(today + timedelta(days=1), horizon)]
+
+    occurrences = list(project(user, today + timedelta(days=1), horizon_end))
+    if occurrences:
+        index = np.array([(occurrence.date - today).days - 1 for occurrence in occurrences])
+        amounts = np.array([
+            float(occurrence.amount) * (1 if occurrence.rule.kind == Category.INCOME else -1)
+            for occurrence in occurrences
+        ])
+        np.add.at(expected, index, amounts)
+
+    saved = np.cumsum(expected)
+    spread = options['CONFIDENCE_Z'] * model['sigma'] * np.sqrt(h)
+
+    index = np.array([(day - today).days - 1 for day in month_ends])
+    month_saved = saved[index]
+    monthly = [
+        {
+            'month': day.strftime('%Y-%m'),
+            'net': round(float(net), 2),
+            'expected': round(balance + float(total), 2),
+            'low': round(balance + float(total - band), 2),
+            'high': round(balance + float(total + band), 2),
+        }
+        for day, net, total, band in zip(month_ends, np.diff(month_saved, prepend=0.0), month_saved, spread[index])
+    ]
+
+    return {
+        'as_of': today,
+        'balance': round(balance, 2),
+        'history_days': options['HISTORY_DAYS'],
+        'trend_per_day': round(float(model['slope']), 4),
+        'months': monthly,
+        'goals': check_goals(goals, today, saved, model['sigma']),
+    }
+
+
+def check_goals(goals, today, saved, sigma):
+    """
+    Funds goals in deadline order from projected savings: a goal is on
+    track if the savings expected by its deadline cover what it and every
+    earlier goal still need. `probability` is the chance of that under the
+    forecast's residual spread. Goals past their deadline are on track only
+    if already funded; those beyond the projection are not assessed.
+    """
+    results = []
+    needed = 0.0
+    for goal in goals:
+        remaining = max(float(goal.target_amount - goal.current_amount), 0.0)
+        needed += remaining
+        days = (goal.deadline - today).days
+        projected = on_track = probability = None
+        if days <= 0:
+            on_track = remaining == 0
+            probability = float(on_track)
+        elif days <= len(saved):
+            projected = float(saved[days - 1])
+            on_track = bool(projected >= needed)
+            spread = sigma * math.sqrt(days)
+            probability = _normal_cdf((projected - needed) / spread) if spread else float(on_track)
+        results.append({
+            'id': goal.id,
+            'name': goal.name,
+            'deadline': goal.deadline,
+            'remaining': round(remaining, 2),
+            'projected_savings': None if projected is None else round(projected, 2),
+            'on_track': on_track,
+            'probability': None if probability is None else round(probability, 3),
+        })
+    return results
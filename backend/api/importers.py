@@ -0,0 +1,415 @@
+"""
+Streaming bank statement import.
+
+Parsers turn a text stream into plain row dicts one line at a time, and
+`StatementImporter` maps those rows onto Income/Expense objects, resolves
+categories through a per-import cache and inserts them in batches. Rows
+carry a content hash, so importing an overlapping or identical statement
+again only adds what is new.
+"""
+import csv
+import hashlib
+import io
+import logging
+import re
+from collections import Counter
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from django.db import IntegrityError, transaction
+from .models import Category, Income, Expense, Savings, StatementImport
+from .signals import transactions_changed
+
+logger = logging.getLogger(__name__)
+
+FILE_TYPES = ('csv', 'ofx', 'qif')
+DEFAULT_DATE_FORMATS = ('%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%Y/%m/%d', '%Y%m%d', '%m/%d/%y')
+
+# Header names we recognise for each target field, in order of preference
+CSV_COLUMN_ALIASES = {
+    'date': ('date', 'transaction date', 'posted date', 'posting date', 'booking date', 'value date'),
+    'amount': ('amount', 'value', 'transaction amount'),
+    'debit': ('debit', 'withdrawal', 'withdrawals', 'money out'),
+    'credit': ('credit', 'deposit', 'deposits', 'money in'),
+    'name': ('name', 'payee', 'merchant', 'title', 'counterparty'),
+    'description': ('description', 'memo', 'details', 'narrative', 'reference'),
+    'category': ('category', 'type of transaction'),
+}
+
+MAX_REPORTED_ERRORS = 100
+# Runs of an import that collided with concurrent imports before giving up
+IMPORT_ATTEMPTS = 3
+
+
+class StatementParseError(ValueError):
+    pass
+
+
+class StatementImportConflict(Exception):
+    """Concurrent imports of overlapping statements kept colliding; retry later."""
+
+
+def detect_file_type(filename):
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    return extension if extension in FILE_TYPES else 'csv'
+
+
+def file_sha256(chunks):
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_date(value, date_format=None):
+    value = value.strip()
+    formats = (date_format,) if date_format else DEFAULT_DATE_FORMATS
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise StatementParseError(f"Unrecognised date: {value!r}")
+
+
+def parse_amount(value):
+    value = (value or '').strip()
+    negative = value.startswith('(') and value.endswith(')')
+    cleaned = re.sub(r'[^0-9.\-]', '', value)
+    if not cleaned:
+        return None
+    try:
+        amount = Decimal(cleaned)
+    except InvalidOperation:
+        raise StatementParseError(f"Unrecognised amount: {value!r}")
+    return -abs(amount) if negative else amount
+
+
+def parse_csv(stream, columns=None, date_format=None):
+    """
+    Yields one row dict per CSV line. `columns` maps target fields to
+    header names and overrides the built-in aliases. Rows that cannot be
+    parsed are yielded as StatementParseError instances.
+    """
+    reader = csv.reader(stream)
+    try:
+        header = [name.strip() for name in next(reader)]
+    except StopIteration:
+        return
+    lookup = {name.lower(): index for index, name in enumerate(header)}
+
+    positions = {}
+    for field, aliases in CSV_COLUMN_ALIASES.items():
+        wanted = (columns or {}).get(field)
+        candidates = (wanted,) if wanted else aliases
+        for candidate in candidates:
+            if candidate.lower() in lookup:
+                positions[field] = lookup[candidate.lower()]
+                break
+        if wanted and field not in positions:
+            raise StatementParseError(f"Column {wanted!r} not found in header")
+
+    if 'date' not in positions:
+        raise StatementParseError("Could not find a date column")
+    if 'amount' not in positions and not ('debit' in positions or 'credit' in positions):
+        raise StatementParseError("Could not find an amount column")
+
+    def cell(row, field):
+        index = positions.get(field)
+        return row[index].strip() if index is not None and index < len(row) else ''
+
+    for row in reader:
+        if not any(value.strip() for value in row):
+            continue
+        try:
+            if 'amount' in positions:
+                amount = parse_amount(cell(row, 'amount'))
+            else:
+                credit = parse_amount(cell(row, 'credit')) or Decimal('0')
+                debit = parse_amount(cell(row, 'debit')) or Decimal('0')
+                amount = abs(credit) - abs(debit)
+            yield {
+                'date': parse_date(cell(row, 'date'), date_format),
+                'amount': amount,
+                'name': cell(row, 'name'),
+                'description': cell(row, 'description'),
+                'category': cell(row, 'category'),
+            }
+        except StatementParseError as e:
+            yield e
+
+
+OFX_TAG = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<\r\n]*)')
+
+
+def parse_ofx(stream, date_format=None):
+    """
+    Yields one row per <STMTTRN> block. Works for both SGML (unclosed tags)
+    and XML flavoured OFX, reading the stream line by line.
+    """
+    current = None
+    for line in stream:
+        for closing, tag, value in OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == 'STMTTRN':
+                if closing and current is not None:
+                    yield _safe_row(_ofx_row, current)
+                    current = None
+                elif not closing:
+                    current = {}
+            elif current is not None and not closing:
+                current[tag] = value.strip()
+    if current:
+        yield _safe_row(_ofx_row, current)
+
+
+def _ofx_row(fields):
+    if 'DTPOSTED' not in fields or 'TRNAMT' not in fields:
+        raise StatementParseError("Transaction without DTPOSTED/TRNAMT")
+    return {
+        'date': parse_date(fields['DTPOSTED'][:8], '%Y%m%d'),
+        'amount': parse_amount(fields['TRNAMT']),
+        'name': fields.get('NAME', ''),
+        'description': fields.get('MEMO', ''),
+        'category': '',
+    }
+
+
+def parse_qif(stream, date_format=None):
+    """Yields one row per QIF record (records are terminated by '^')."""
+    fields = {}
+    for line in stream:
+        line = line.rstrip('\r\n')
+        if not line or line.startswith('!'):
+            continue
+        code, value = line[0], line[1:].strip()
+        if code == '^':
+            if fields:
+                yield _safe_row(_qif_row, fields, date_format)
+            fields = {}
+        else:
+            fields.setdefault(code, value)
+    if fields:
+        yield _safe_row(_qif_row, fields, date_format)
+
+
+def _qif_row(fields, date_format):
+    if 'D' not in fields or 'T' not in fields:
+        raise StatementParseError("Record without date or amount")
+    # Quicken writes years after 2000 as 1/31'25
+    raw_date = re.sub(r"'\s*(\d{2})$", r'/20\1', fields['D'])
+    return {
+        'date': parse_date(raw_date, date_format),
+        'amount': parse_amount(fields['T']),
+        'name': fields.get('P', ''),
+        'description': fields.get('M', ''),
+        'category': fields.get('L', ''),
+    }
+
+
+def _safe_row(build, *args):
+    try:
+        return build(*args)
+    except StatementParseError as e:
+        return e
+
+
+PARSERS = {
+    'csv': parse_csv,
+    'ofx': parse_ofx,
+    'qif': parse_qif,
+}
+
+
+def iter_statement_rows(binary_file, file_type, columns=None, date_format=None):
+    """
+    Yields (row_number, row) pairs from a binary file object without
+    reading it into memory. `row` is a StatementParseError for bad rows.
+    """
+    stream = io.TextIOWrapper(binary_file, encoding='utf-8-sig', errors='replace', newline='')
+    try:
+        if file_type == 'csv':
+            rows = parse_csv(stream, columns=columns, date_format=date_format)
+        else:
+            rows = PARSERS[file_type](stream, date_format=date_format)
+        yield from enumerate(rows, start=1)
+    finally:
+        # Leave the underlying file open for the caller
+        stream.detach()
+
+
+class StatementImporter:
+    """
+    Maps parsed statement rows onto Income/Expense objects for one user.
+
+    Positive amounts become income and negative amounts become expenses
+    unless `kind` forces every row into one of them.
+    """
+
+    def __init__(self, user, kind=None, batch_size=500):
+        self.user = user
+        self.kind = kind
+        self.batch_size = batch_size
+        self.categories = {
+            (category.cat_type, category.name.strip().lower()): category
+            for category in Category.objects.filter(user=user)
+        }
+        self.occurrences = Counter()
+        self.pending = {Income: [], Expense: []}
+        self.created = {Income: 0, Expense: 0}
+        self.totals = {Income: Decimal('0'), Expense: Decimal('0')}
+        # Ledger entries for the created rows, sent with the totals
+        self.entries = {Income: [], Expense: []}
+        self.duplicates = 0
+        self.errors = []
+        self.error_count = 0
+
+    def add_error(self, row_number, error):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row_number, 'error': str(error)})
+
+    def resolve_category(self, name, cat_type):
+        name = name.strip()
+        if not name:
+            return None
+        key = (cat_type, name.lower())
+        category = self.categories.get(key)
+        if category is None:
+            category = Category.objects.create(name=name[:100], cat_type=cat_type, user=self.user)
+            self.categories[key] = category
+        return category
+
+    def add(self, row_number, row):
+        amount = row['amount']
+        if amount is None or amount == 0:
+            self.add_error(row_number, "Missing or zero amount")
+            return
+
+        if self.kind == 'income' or (self.kind is None and amount > 0):
+            model, cat_type = Income, Category.INCOME
+        else:
+            model, cat_type = Expense, Category.EXPENSE
+        amount = abs(amount)
+
+        description = row['description']
+        name = (row['name'] or description or 'Imported transaction')[:100]
+
+        # Identical rows within one statement are told apart by occurrence,
+        # so two same-day coffees both import but re-imports still match.
+        identity = f"{model.__name__}|{row['date'].isoformat()}|{amount}|{name}|{description}"
+        self.occurrences[identity] += 1
+        import_hash = hashlib.sha256(f"{identity}|{self.occurrences[identity]}".encode('utf-8')).hexdigest()
+
+        self.pending[model].append(model(
+            name=name,
+            amount=amount,
+            date=row['date'],
+            description=description,
+            category=self.resolve_category(row['category'], cat_type),
+            import_hash=import_hash,
+            user=self.user,
+        ))
+        if len(self.pending[model]) >= self.batch_size:
+            self.flush(model)
+
+    def flush(self, model):
+        batch = self.pending[model]
+        if not batch:
+            return
+        self.pending[model] = []
+
+        existing = set(
+            model.objects.filter(user=self.user, import_hash__in=[obj.import_hash for obj in batch])
+            .values_list('import_hash', flat=True)
+        )
+        new_rows = [obj for obj in batch if obj.import_hash not in existing]
+        self.duplicates += len(batch) - len(new_rows)
+        if new_rows:
+            model.objects.bulk_create(new_rows, batch_size=self.batch_size)
+            self.created[model] += len(new_rows)
+            self.totals[model] += sum(obj.amount for obj in new_rows)
+            sign = 1 if model is Income else -1
+            self.entries[model].extend((obj.pk, obj.date, sign * obj.amount) for obj in new_rows)
+
+    def run(self, rows):
+        with transaction.atomic():
+            # Settle the balance row before inserting, so the deltas sent
+            # below are not double counted by a first-time recompute
+            Savings.for_user(self.user)
+            for row_number, row in rows:
+                if isinstance(row, Exception):
+                    self.add_error(row_number, row)
+                else:
+                    self.add(row_number, row)
+            for model in (Income, Expense):
+                self.flush(model)
+
+            if self.entries[Income]:
+                transactions_changed.send(
+                    sender=Income, user=self.user, delta=self.totals[Income], entries=self.entries[Income],
+                )
+            if self.entries[Expense]:
+                transactions_changed.send(
+                    sender=Expense, user=self.user, delta=-self.totals[Expense], entries=self.entries[Expense],
+                )
+        return self.summary()
+
+    def summary(self):
+        return {
+            'created': {'income': self.created[Income], 'expense': self.created[Expense]},
+            'duplicates': self.duplicates,
+            'error_count': self.error_count,
+            'errors': self.errors,
+        }
+
+
+def import_statement(user, binary_file, filename='', file_type=None, kind=None, columns=None, date_format=None):
+    """
+    Imports a statement file object opened in binary mode. Files that were
+    imported before (same SHA-256) return the earlier summary right away.
+
+    Only the file's content identifies it: uploading it again with other
+    parse options (file_type, kind, columns, date_format) still returns the
+    earlier summary rather than importing it a second way.
+    """
+    file_type = file_type or detect_file_type(filename)
+    if file_type not in PARSERS:
+        raise StatementParseError(f"Unsupported file type: {file_type}")
+
+    binary_file.seek(0)
+    file_hash = file_sha256(iter(lambda: binary_file.read(64 * 1024), b''))
+    previous = previous_import(user, file_hash)
+    if previous is not None:
+        logger.info(f"Statement {filename!r} already imported for user {user.pk}")
+        return {**previous.summary, 'file_hash': file_hash, 'already_imported': True}
+
+    for attempt in range(1, IMPORT_ATTEMPTS + 1):
+        binary_file.seek(0)
+        rows = iter_statement_rows(binary_file, file_type, columns=columns, date_format=date_format)
+        try:
+            # The rows and the record of the file commit together, so a failed
+            # record cannot leave rows behind that a retry would not dedupe
+            with transaction.atomic():
+                summary = StatementImporter(user, kind=kind).run(rows)
+                StatementImport.objects.create(
+                    user=user, file_hash=file_hash, filename=filename[:255], summary=summary,
+                )
+            break
+        except IntegrityError:
+            previous = previous_import(user, file_hash)
+            if previous is not None:
+                # A concurrent upload of the same file committed first
+                logger.info(f"Statement {filename!r} was imported concurrently for user {user.pk}")
+                return {**previous.summary, 'file_hash': file_hash, 'already_imported': True}
+            # A concurrent import of another file committed some of the same
+            # rows; running again counts them as duplicates
+            logger.info(f"Statement {filename!r} overlapped a concurrent import for user {user.pk} (attempt {attempt})")
+    else:
+        raise StatementImportConflict(f"Statement {filename!r} overlaps imports still in progress; try again.")
+
+    logger.info(f"Imported statement {filename!r} for user {user.pk}: {summary['created']}")
+    return {**summary, 'file_hash': file_hash, 'already_imported': False}
+
+
+def previous_import(user, file_hash):
+    return StatementImport.objects.filter(user=user, file_hash=file_hash).first()
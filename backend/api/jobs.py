@@ -0,0 +1,276 @@
+"""
+Database-backed background jobs.
+
+Slow per-user work is queued as `Job` rows and picked up by
+`manage.py run_jobs` workers, so requests can answer 202 right away.
+
+* Claiming is a conditional UPDATE (queued -> running), so any number of
+  worker threads and processes can poll the same table; on PostgreSQL the
+  candidates are read with SKIP LOCKED so workers do not queue behind each
+  other.
+* A partial unique index allows one running job per user: a worker that
+  loses that race leaves the job queued and moves on to another user.
+* A handler that raises is retried after RETRY_BACKOFF * 2^(attempt - 1)
+  seconds (capped at MAX_BACKOFF, with jitter) until the job's attempts
+  run out; `JobFailed` fails it at once.
+* While a handler runs, its attempt refreshes the job's `heartbeat_at`
+  every HEARTBEAT seconds. Jobs whose heartbeat is STALE_AFTER seconds
+  old were left by a worker that died and are retried; however long a
+  live job runs, it is not. Outcomes are only recorded while the attempt
+  still holds the job, so an attempt that was presumed lost cannot
+  overwrite the one that replaced it.
+
+Handlers are registered with `@handler(kind)` and receive the job; what
+they return is stored as its `result`.
+"""
+import logging
+import random
+import threading
+from contextlib import contextmanager
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import DatabaseError, IntegrityError, connection, connections, transaction
+from django.utils import timezone
+from .importers import StatementParseError, import_statement
+from .models import Job, Savings
+from .recurring import materialize_due
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+
+class JobFailed(Exception):
+    """Raised by a handler for errors that retrying cannot fix."""
+
+
+def job_options():
+    return {
+        'MAX_ATTEMPTS': 3,
+        'RETRY_BACKOFF': 30,
+        'MAX_BACKOFF': 3600,
+        'HEARTBEAT': 60,
+        'STALE_AFTER': 300,
+        'POLL_INTERVAL': 1.0,
+        'THREADS': 2,
+        **getattr(settings, 'JOBS', {}),
+    }
+
+
+def handler(kind, coalesce=False):
+    """
+    Registers the function that runs jobs of `kind`. With `coalesce`, an
+    enqueue while the user already has one of these queued returns that
+    job instead of adding another.
+    """
+    def register(func):
+        func.kind = kind
+        func.coalesce = coalesce
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(user, kind, payload=None, delay=0):
+    """Queues a job of a registered `kind` for `user` and returns it."""
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    if HANDLERS[kind].coalesce:
+        queued = Job.objects.filter(user=user, kind=kind, status=Job.QUEUED).order_by('id').first()
+        if queued is not None:
+            return queued
+    return Job.objects.create(
+        user=user, kind=kind, payload=payload or {}, max_attempts=job_options()['MAX_ATTEMPTS'],
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def claim_job(batch_size=10):
+    """
+    Marks the next due job whose user has nothing running as running and
+    returns it, or None when there is nothing to do.
+    """
+    now = timezone.now()
+    candidates = (
+        Job.objects.filter(status=Job.QUEUED, run_after__lte=now)
+        .exclude(user__in=Job.objects.filter(status=Job.RUNNING).values('user'))
+        .order_by('run_after', 'id')
+    )
+    skipped_users = set()
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        for job in candidates[:batch_size]:
+            if job.user_id in skipped_users:
+                continue
+            try:
+                with transaction.atomic():
+                    claimed = Job.objects.filter(pk=job.pk, status=Job.QUEUED).update(
+                        status=Job.RUNNING, attempts=job.attempts + 1, started_at=now, heartbeat_at=now,
+                    )
+            except IntegrityError:
+                # Another worker started one of this user's jobs first
+                skipped_users.add(job.user_id)
+                continue
+            if claimed:
+                job.status, job.attempts, job.started_at, job.heartbeat_at = Job.RUNNING, job.attempts + 1, now, now
+                return job
+    return None
+
+
+def backoff(attempts, options=None):
+    options = options or job_options()
+    delay = min(options['RETRY_BACKOFF'] * 2 ** (attempts - 1), options['MAX_BACKOFF'])
+    return timedelta(seconds=delay * random.uniform(1, 1.1))
+
+
+def attempt_rows(job):
+    """The job's row, while the attempt that claimed it still holds it."""
+    return Job.objects.filter(pk=job.pk, status=Job.RUNNING, attempts=job.attempts)
+
+
+@contextmanager
+def heartbeat(job, interval):
+    """Refreshes the job's heartbeat from a background thread until exited."""
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(interval):
+                try:
+                    if not attempt_rows(job).update(heartbeat_at=timezone.now()):
+                        break
+                except DatabaseError:
+                    logger.warning(f"Job {job.pk} heartbeat failed", exc_info=True)
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=beat, name=f'job-{job.pk}-heartbeat', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_job(job):
+    """Runs a claimed job and records its outcome. Returns the new status."""
+    func = HANDLERS.get(job.kind)
+    try:
+        if func is None:
+            raise JobFailed(f"Unknown job kind: {job.kind}")
+        with heartbeat(job, job_options()['HEARTBEAT']):
+            result = func(job)
+    except Exception as e:
+        logger.exception(f"Job {job.pk} ({job.kind}) failed on attempt {job.attempts}")
+        return record_failure(job, e)
+
+    record_outcome(
+        job, attempt_rows(job), status=Job.SUCCEEDED, result=result, error='', finished_at=timezone.now(),
+    )
+    return job.status
+
+
+def record_failure(job, error):
+    record_outcome(job, attempt_rows(job), **failure_changes(job, error))
+    return job.status
+
+
+def failure_changes(job, error):
+    now = timezone.now()
+    changes = {'error': f"{type(error).__name__}: {error}"[:2000]}
+    if isinstance(error, JobFailed) or job.attempts >= job.max_attempts:
+        changes.update(status=Job.FAILED, finished_at=now)
+    else:
+        changes.update(status=Job.QUEUED, run_after=now + backoff(job.attempts))
+    return changes
+
+
+def record_outcome(job, rows, **changes):
+    """Applies `changes` to the job through `rows`; False if none matched."""
+    if not rows.update(**changes):
+        logger.warning(f"Job {job.pk} attempt {job.attempts} no longer holds the job; outcome dropped")
+        job.refresh_from_db()
+        return False
+    for field, value in changes.items():
+        setattr(job, field, value)
+    return True
+
+
+def requeue_stale():
+    """Fails over jobs whose worker stopped sending heartbeats; returns how many."""
+    options = job_options()
+    cutoff = timezone.now() - timedelta(seconds=options['STALE_AFTER'])
+    count = 0
+    for job in Job.objects.filter(status=Job.RUNNING, heartbeat_at__lt=cutoff):
+        error = TimeoutError(f"No heartbeat for {options['STALE_AFTER']} seconds")
+        # Unless a heartbeat arrived since the job was read
+        rows = attempt_rows(job).filter(heartbeat_at__lt=cutoff)
+        count += record_outcome(job, rows, **failure_changes(job, error))
+    return count
+
+
+def run_pending(limit=None):
+    """Runs due jobs in this thread until none are left (or `limit` ran)."""
+    count = 0
+    while limit is None or count < limit:
+        job = claim_job()
+        if job is None:
+            break
+        run_job(job)
+        count += 1
+    return count
+
+
+@handler('recalculate_savings', coalesce=True)
+def recalculate_savings(job):
+    savings = Savings.for_user(job.user)
+    savings.calculate_total()
+    return {'total': f'{savings.total:.2f}'}
+
+
+@handler('materialize_recurring', coalesce=True)
+def materialize_recurring(job):
+    return materialize_due(user=job.user)
+
+
+def enqueue_statement_import(user, uploaded, **options):
+    """
+    Saves an uploaded statement to the default storage and queues its
+    import; the job's payload holds the stored name, not the content.
+    """
+    path = default_storage.save(f'statement_imports/{user.pk}/{uuid.uuid4().hex}', uploaded)
+    return enqueue(user, 'import_statement', {'path': path, 'filename': uploaded.name, **options})
+
+
+@handler('import_statement')
+def import_statement_job(job):
+    # Imports are keyed by file hash, so a retried attempt is not doubled
+    payload = job.payload
+    finished = False
+    try:
+        with default_storage.open(payload['path'], 'rb') as statement:
+            result = import_statement(
+                job.user,
+                statement,
+                filename=payload.get('filename', ''),
+                file_type=payload.get('file_type'),
+                kind=payload.get('kind'),
+                columns=payload.get('columns'),
+                date_format=payload.get('date_format'),
+            )
+        finished = True
+        return result
+    except FileNotFoundError:
+        finished = True
+        raise JobFailed("The uploaded statement is no longer stored")
+    except StatementParseError as e:
+        finished = True
+        raise JobFailed(str(e))
+    finally:
+        # Kept for retries until the last attempt
+        if finished or job.attempts >= job.max_attempts:
+            default_storage.delete(payload['path'])
@@ -0,0 +1,114 @@
+"""
+Balance ledger.
+
+Every write to income or expenses appends `LedgerEntry` rows (through
+`transactions_changed`) with the signed change to the balance and the date
+of the transaction it applies to. `compact` folds them into month-end
+`LedgerSnapshot`s, so the balance on any date is one snapshot lookup plus
+a short range scan of the entries the snapshot does not cover:
+
+* entries dated after the snapshot's month, up to the requested date;
+* entries dated within it but appended after it was taken (back-dated
+  writes), i.e. with an id above its `through_id`.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from .models import LedgerEntry, LedgerSnapshot
+
+
+def ledger_changes(changes):
+    """
+    Merges (object id, date, delta) changes to the same row and date and
+    drops those that cancel out, e.g. an update that only renames a row.
+    """
+    merged = defaultdict(Decimal)
+    for object_id, date, delta in changes:
+        merged[object_id, date] += delta
+    return [(object_id, date, delta) for (object_id, date), delta in merged.items() if delta]
+
+
+def month_end(day):
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+
+def balance_as_of(user, day, through_id=None):
+    """
+    The user's balance from all transactions dated on or before `day`,
+    optionally counting only the entries up to `through_id`.
+    """
+    snapshot = (
+        LedgerSnapshot.objects.filter(user=user, period_end__lte=day)
+        .order_by('-period_end').only('period_end', 'balance', 'through_id').first()
+    )
+    entries = LedgerEntry.objects.filter(user=user)
+    if through_id is not None:
+        entries = entries.filter(id__lte=through_id)
+    if snapshot is None:
+        entries = entries.filter(date__lte=day)
+        base = Decimal('0.00')
+    else:
+        entries = entries.filter(
+            Q(date__gt=snapshot.period_end, date__lte=day)
+            | Q(date__lte=snapshot.period_end, id__gt=snapshot.through_id)
+        )
+        base = snapshot.balance
+    return base + (entries.aggregate(total=Sum('delta'))['total'] or 0)
+
+
+def compact():
+    """
+    Brings the month-end snapshots up to date with the entries appended
+    since the last run (an id range scan), rewriting each affected user's
+    months from the earliest date those entries touch. Entries younger than
+    LEDGER['COMPACTION_LAG'] seconds are left for the next run, so rows from
+    transactions still open are not skipped over. Returns the number of
+    users updated.
+    """
+    lag = timedelta(seconds=getattr(settings, 'LEDGER', {}).get('COMPACTION_LAG', 300))
+    # Every run covers all users, so the newest snapshot marks where it stopped
+    watermark = LedgerSnapshot.objects.aggregate(through=Max('through_id'))['through'] or 0
+    new_entries = LedgerEntry.objects.filter(id__gt=watermark)
+    through_id = new_entries.filter(created_at__lte=timezone.now() - lag).aggregate(through=Max('id'))['through']
+    if through_id is None:
+        return 0
+
+    pending = (
+        new_entries.filter(id__lte=through_id)
+        .values('user').annotate(first_date=Min('date')).order_by('user')
+        .values_list('user', 'first_date')
+    )
+    updated = 0
+    for user_id, first_date in pending:
+        compact_user(user_id, first_date, through_id)
+        updated += 1
+    return updated
+
+
+def compact_user(user_id, first_date, through_id):
+    start = first_date.replace(day=1)
+    with transaction.atomic():
+        balance = balance_as_of(user_id, start - timedelta(days=1), through_id)
+        months = (
+            LedgerEntry.objects.filter(user_id=user_id, date__gte=start, id__lte=through_id)
+            .annotate(month=TruncMonth('date')).values('month').annotate(total=Sum('delta'))
+            .order_by('month').values_list('month', 'total')
+        )
+        snapshots = []
+        for month, total in months:
+            balance += total
+            snapshots.append(LedgerSnapshot(
+                user_id=user_id, month=month, period_end=month_end(month), balance=balance, through_id=through_id,
+            ))
+        LedgerSnapshot.objects.bulk_create(
+            snapshots, update_conflicts=True, unique_fields=['user', 'month'],
+            update_fields=['period_end', 'balance', 'through_id'],
+        )
+        # Earlier months have no new entries; advancing their watermark keeps
+        # the back-dated-entry scan in balance_as_of short
+        LedgerSnapshot.objects.filter(user_id=user_id, month__lt=start).update(through_id=through_id)
@@ -0,0 +1,193 @@
+"""
+Closed-loop HTTP load generator, run by `manage.py loadtest`.
+
+`concurrency` clients each hold one keep-alive connection to a running
+server and issue GETs back to back for `duration` seconds, so the request
+rate a server sustains at a given concurrency, and its latency under that
+load, can be compared between deployments (e.g. gunicorn sync workers on
+config.wsgi against uvicorn workers on config.asgi). The resident memory
+of the server's processes is sampled alongside.
+
+Uses only asyncio streams, so the generator itself is cheap enough to
+drive hundreds of connections from one process.
+"""
+import asyncio
+import json
+import os
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+class LoadTestError(Exception):
+    pass
+
+
+async def _read_response(reader):
+    """Reads one HTTP/1.1 response; returns (status, headers, body)."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("Connection closed by server")
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            if not size:
+                await reader.readline()
+                break
+            chunks.append(await reader.readexactly(size + 2))
+        body = b''.join(chunk[:-2] for chunk in chunks)
+    elif 'content-length' in headers:
+        body = await reader.readexactly(int(headers['content-length']))
+    else:
+        body = await reader.read()
+    return status, headers, body
+
+
+class Client:
+    def __init__(self, url, headers=None):
+        parts = urlsplit(url)
+        if parts.scheme != 'http':
+            raise LoadTestError("Only plain http:// servers can be load tested")
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.headers = {'Host': parts.netloc, 'Accept': 'application/json', **(headers or {})}
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        headers = dict(self.headers)
+        payload = b''
+        if body is not None:
+            payload = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        headers['Content-Length'] = str(len(payload))
+        head = f"{method} {path} HTTP/1.1\r\n" + ''.join(f"{name}: {value}\r\n" for name, value in headers.items())
+        self.writer.write(head.encode('latin-1') + b'\r\n' + payload)
+        await self.writer.drain()
+        try:
+            status, response_headers, body = await _read_response(self.reader)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            await self.close()
+            raise
+        if response_headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, body
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+        self.reader = self.writer = None
+
+
+def process_tree_rss(pids):
+    """Resident memory in bytes of `pids` and all their descendants (Linux)."""
+    seen = set()
+    total = 0
+    stack = list(pids)
+    while stack:
+        pid = stack.pop()
+        if pid in seen:
+            continue
+        seen.add(pid)
+        try:
+            with open(f'/proc/{pid}/status') as status_file:
+                for line in status_file:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+            for task in os.listdir(f'/proc/{pid}/task'):
+                with open(f'/proc/{pid}/task/{task}/children') as children:
+                    stack.extend(int(child) for child in children.read().split())
+        except (FileNotFoundError, ProcessLookupError, PermissionError):
+            continue
+    return total
+
+
+async def login(url, email, password):
+    client = Client(url)
+    try:
+        status, body = await client.request('POST', '/api/login/', {'email': email, 'password': password})
+    finally:
+        await client.close()
+    if status != 200:
+        raise LoadTestError(f"Login as {email} failed with {status}: {body[:200]!r}")
+    return json.loads(body)['access']
+
+
+async def run_load(url, paths, token, concurrency=50, duration=10.0, pids=()):
+    """
+    Runs the load and returns throughput, latency percentiles (ms), status
+    counts and the peak RSS of `pids` (when given).
+    """
+    latencies = []
+    statuses = {}
+    errors = []
+    deadline = time.perf_counter() + duration
+    peak_rss = process_tree_rss(pids) if pids else None
+
+    async def worker(index):
+        client = Client(url, {'Authorization': f'Bearer {token}'})
+        request_number = index
+        try:
+            while time.perf_counter() < deadline:
+                path = paths[request_number % len(paths)]
+                request_number += 1
+                started = time.perf_counter()
+                try:
+                    status, _ = await client.request('GET', path)
+                except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+                    errors.append(f"{type(e).__name__}: {e}")
+                    await asyncio.sleep(0.05)
+                    continue
+                latencies.append(time.perf_counter() - started)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            await client.close()
+
+    async def sample_memory():
+        nonlocal peak_rss
+        while time.perf_counter() < deadline:
+            peak_rss = max(peak_rss, process_tree_rss(pids))
+            await asyncio.sleep(0.25)
+
+    started = time.perf_counter()
+    tasks = [worker(index) for index in range(concurrency)]
+    if pids:
+        tasks.append(sample_memory())
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    result = {
+        'concurrency': concurrency,
+        'duration': round(elapsed, 2),
+        'requests': len(latencies),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'errors': len(errors),
+        'error_samples': sorted(set(errors))[:5],
+        'peak_rss_mb': None if peak_rss is None else round(peak_rss / 2 ** 20, 1),
+    }
+    if latencies:
+        ms = sorted(latency * 1000 for latency in latencies)
+        quantiles = statistics.quantiles(ms, n=100) if len(ms) > 1 else ms * 99
+        result.update({
+            'p50_ms': round(quantiles[49], 2),
+            'p95_ms': round(quantiles[94], 2),
+            'p99_ms': round(quantiles[98], 2),
+            'max_ms': round(ms[-1], 2),
+        })
+    return result
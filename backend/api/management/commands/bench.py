@@ -0,0 +1,75 @@
+import json
+import platform
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from api.benchmarks import SCENARIOS, compare_to_baseline, run_scenario
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the API benchmark scenarios against a user seeded with seed_demo_data and "
+        "prints JSON results; optionally compares them with a stored baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenarios', help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--email', default='bench-0@example.com', help="Seeded user to run as.")
+        parser.add_argument('--password', default='bench-password')
+        parser.add_argument('--output', help="Also write the results to this file.")
+        parser.add_argument('--baseline', help="Results file from an earlier run to compare against.")
+        parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed p50 slowdown (0.25 = 25%%).")
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        names = list(SCENARIOS)
+        if options['scenarios']:
+            names = [name.strip() for name in options['scenarios'].split(',') if name.strip()]
+            unknown = set(names) - set(SCENARIOS)
+            if unknown:
+                raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+        user = User.objects.filter(email=options['email']).first()
+        if user is None:
+            raise CommandError(f"No user {options['email']}; run `manage.py seed_demo_data` first")
+
+        results = {}
+        for name in names:
+            self.stderr.write(f"running {name}...")
+            results[name] = run_scenario(
+                SCENARIOS[name], user, options['password'],
+                iterations=options['iterations'], warmup=options['warmup'],
+            )
+
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'scenarios': results,
+        }
+        failures = [
+            f"{name}: {result['queries']} queries, budget is {result['max_queries']}"
+            for name, result in results.items() if result['queries'] > result['max_queries']
+        ]
+        if options['baseline']:
+            with open(options['baseline']) as baseline_file:
+                failures += compare_to_baseline(results, json.load(baseline_file), options['tolerance'])
+        report['regressions'] = failures
+
+        output = json.dumps(report, indent=2)
+        self.stdout.write(output)
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                output_file.write(output + '\n')
+
+        for failure in failures:
+            self.stderr.write(self.style.ERROR(failure))
+        if failures and options['fail_on_regression']:
+            raise CommandError(f"{len(failures)} regression(s)")
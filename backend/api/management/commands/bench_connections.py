@@ -0,0 +1,46 @@
+import json
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from api.connection_bench import mode_database, run_mode
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares per-request connection setup and teardown time across DB_CONNECTION_MODEs "
+        "against the configured database and prints JSON results."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modes', default=','.join(settings.DB_CONNECTION_MODES),
+                            help="Comma-separated modes to run.")
+        parser.add_argument('--threads', type=int, default=4, help="Concurrent request threads, as in one worker.")
+        parser.add_argument('--requests', type=int, default=200, help="Requests per thread.")
+        parser.add_argument('--queries', type=int, default=3, help="Queries per request.")
+        parser.add_argument('--pgbouncer-url',
+                            help="PgBouncer URL for the pgbouncer mode; without it that mode connects directly.")
+        parser.add_argument('--output', help="Also write the results to this file.")
+
+    def handle(self, *args, **options):
+        modes = [mode.strip() for mode in options['modes'].split(',') if mode.strip()]
+        unknown = [mode for mode in modes if mode not in settings.DB_CONNECTION_MODES]
+        if unknown:
+            raise CommandError(f"Unknown modes: {', '.join(unknown)}")
+        if min(options['threads'], options['requests'], options['queries']) < 1:
+            raise CommandError("--threads, --requests and --queries must be at least 1")
+
+        runs = []
+        for mode in modes:
+            database = mode_database(mode, options['pgbouncer_url'] if mode == 'pgbouncer' else None)
+            if database is None:
+                self.stderr.write(f"{mode}: needs PostgreSQL, skipped")
+                continue
+            self.stderr.write(f"{mode}: {options['threads']} threads x {options['requests']} requests...")
+            runs.append(run_mode(
+                mode, database, threads=options['threads'], requests=options['requests'], queries=options['queries'],
+            ))
+
+        output = json.dumps({'engine': settings.DATABASES['default']['ENGINE'], 'runs': runs}, indent=2)
+        self.stdout.write(output)
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                output_file.write(output + '\n')
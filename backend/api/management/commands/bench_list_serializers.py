@@ -0,0 +1,67 @@
+import json
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from api.models import Expense
+from api.serializers import ExpenseSerializer, values_columns, values_rows
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares listing N expenses through ExpenseSerializer with the values() "
+        "fast path. Runs inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            result = self._run(options['rows'], options['repeat'])
+            transaction.set_rollback(True)
+        self.stdout.write(json.dumps(result, indent=2))
+
+    def _run(self, rows, repeat):
+        user = User.objects.create_user(
+            email='bench-list@example.com', username='bench-list', full_name='Bench', password=None
+        )
+        start = date(2020, 1, 1)
+        Expense.objects.bulk_create([
+            Expense(name=f'Expense {i}', amount=Decimal(i % 500) + Decimal('0.99'), date=start + timedelta(days=i % 1500),
+                    description='x' * 200, user=user)
+            for i in range(rows)
+        ], batch_size=2000)
+        queryset = Expense.objects.filter(user=user).order_by('-date', '-id')
+        fields = list(ExpenseSerializer.Meta.fields)
+
+        def serializer_path():
+            return ExpenseSerializer(list(queryset.all()), many=True).data
+
+        def values_path():
+            return values_rows(queryset.values_list(*values_columns(fields)), fields)
+
+        if serializer_path() != values_path():
+            raise AssertionError("Fast path output differs from the serializer")
+
+        timings = {}
+        for name, run in (('serializer', serializer_path), ('values', values_path)):
+            best = None
+            for _ in range(repeat):
+                started = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = best
+
+        return {
+            'rows': rows,
+            'serializer_rows_per_s': round(rows / timings['serializer']),
+            'values_rows_per_s': round(rows / timings['values']),
+            'speedup': round(timings['serializer'] / timings['values'], 2),
+        }
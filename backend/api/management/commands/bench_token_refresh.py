@@ -0,0 +1,74 @@
+import json
+import statistics
+import time
+import uuid
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from api.token_blacklist import FastBlacklistTokenRefreshSerializer, FastBlacklistRefreshToken, get_revocation_list
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds issued/blacklisted refresh tokens and measures refresh latency. "
+        "Run against a scratch database: seeded rows are not removed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tokens', type=int, default=100_000, help="Outstanding tokens to seed.")
+        parser.add_argument('--blacklisted', type=float, default=0.5, help="Fraction of seeded tokens to blacklist.")
+        parser.add_argument('--refreshes', type=int, default=500, help="Refreshes to time.")
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--email', default='bench-refresh@example.com')
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(
+            email=options['email'], defaults={'username': options['email'].split('@')[0]},
+        )
+        self._seed(user, options['tokens'], options['blacklisted'], options['batch_size'])
+
+        started = time.perf_counter()
+        get_revocation_list().load()
+        load_ms = (time.perf_counter() - started) * 1000
+
+        token = str(FastBlacklistRefreshToken.for_user(user))
+        timings = []
+        for _ in range(options['refreshes']):
+            started = time.perf_counter()
+            serializer = FastBlacklistTokenRefreshSerializer(data={'refresh': token})
+            serializer.is_valid(raise_exception=True)
+            timings.append((time.perf_counter() - started) * 1000)
+            token = serializer.validated_data['refresh']
+
+        timings.sort()
+        result = {
+            'outstanding_tokens': OutstandingToken.objects.count(),
+            'revoked_in_memory': len(get_revocation_list()),
+            'load_ms': round(load_ms, 2),
+            'refreshes': len(timings),
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(timings[int(len(timings) * 0.95) - 1], 3),
+            'p99_ms': round(timings[int(len(timings) * 0.99) - 1], 3),
+        }
+        self.stdout.write(json.dumps(result, indent=2))
+
+    def _seed(self, user, count, blacklisted, batch_size):
+        now = timezone.now()
+        expires_at = now + timedelta(days=7)
+        every = round(1 / blacklisted) if blacklisted else 0
+        for offset in range(0, count, batch_size):
+            size = min(batch_size, count - offset)
+            with transaction.atomic():
+                tokens = OutstandingToken.objects.bulk_create([
+                    OutstandingToken(user=user, jti=uuid.uuid4().hex, token='', created_at=now, expires_at=expires_at)
+                    for _ in range(size)
+                ])
+                if every:
+                    BlacklistedToken.objects.bulk_create([BlacklistedToken(token=token) for token in tokens[::every]])
+            self.stdout.write(f"seeded {offset + size}/{count}", ending='\r')
+        self.stdout.write('')
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from api.ledger import compact
+
+
+class Command(BaseCommand):
+    help = "Folds new balance ledger entries into per-user month-end snapshots."
+
+    def handle(self, *args, **options):
+        updated = compact()
+        self.stdout.write(self.style.SUCCESS(f"Updated snapshots for {updated} user(s)"))
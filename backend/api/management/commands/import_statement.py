@@ -0,0 +1,56 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from api.importers import FILE_TYPES, StatementParseError, import_statement
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Imports a CSV, OFX or QIF bank statement into a user's income and expenses."
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help="Email of the user to import for.")
+        parser.add_argument('path', help="Path to the statement file.")
+        parser.add_argument('--file-type', choices=FILE_TYPES, help="Defaults to the file extension.")
+        parser.add_argument('--kind', choices=['income', 'expense'], help="Import every row as this type.")
+        parser.add_argument('--date-format', help="strptime format of the date column, e.g. %%d/%%m/%%Y.")
+        parser.add_argument(
+            '--column', action='append', default=[], metavar='FIELD=HEADER',
+            help="Map a field (date, amount, debit, credit, name, description, category) to a CSV header.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(email=options['email'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user with email {options['email']}")
+
+        columns = {}
+        for mapping in options['column']:
+            field, sep, header = mapping.partition('=')
+            if not sep:
+                raise CommandError(f"Invalid --column {mapping!r}, expected FIELD=HEADER")
+            columns[field.strip()] = header.strip()
+
+        try:
+            with open(options['path'], 'rb') as statement:
+                summary = import_statement(
+                    user,
+                    statement,
+                    filename=options['path'],
+                    file_type=options['file_type'],
+                    kind=options['kind'],
+                    columns=columns or None,
+                    date_format=options['date_format'],
+                )
+        except (OSError, StatementParseError) as e:
+            raise CommandError(str(e))
+
+        if summary['already_imported']:
+            self.stdout.write("This statement was already imported; nothing to do.")
+        for error in summary['errors']:
+            self.stderr.write(f"row {error['row']}: {error['error']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {summary['created']['income']} income and {summary['created']['expense']} expense rows, "
+            f"skipped {summary['duplicates']} duplicates, {summary['error_count']} errors"
+        ))
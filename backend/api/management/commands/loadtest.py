@@ -0,0 +1,51 @@
+import asyncio
+import json
+from django.core.management.base import BaseCommand, CommandError
+from api.loadtest import LoadTestError, login, run_load
+
+DEFAULT_PATHS = '/api/income/,/api/expenses/?count=false,/api/user/,/api/dashboard/summary/?period=month'
+
+
+class Command(BaseCommand):
+    help = (
+        "Drives a running server with concurrent keep-alive GET requests and prints JSON throughput, "
+        "latency and memory figures. Run the server with a high API_USER_THROTTLE_RATE."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help="Server base URL (http only).")
+        parser.add_argument('--paths', default=DEFAULT_PATHS, help="Comma-separated paths, requested in turn.")
+        parser.add_argument('--concurrency', default='50', help="Concurrent connections; a comma-separated list runs each level.")
+        parser.add_argument('--duration', type=float, default=10.0, help="Seconds per concurrency level.")
+        parser.add_argument('--email', default='bench-0@example.com', help="User to log in as (see seed_demo_data).")
+        parser.add_argument('--password', default='bench-password')
+        parser.add_argument('--pid', type=int, action='append', default=[],
+                            help="Server process to sample memory of, with its children; may be repeated.")
+        parser.add_argument('--label', default='', help="Name of the deployment under test, e.g. asgi.")
+        parser.add_argument('--output', help="Also write the results to this file.")
+
+    def handle(self, *args, **options):
+        paths = [path.strip() for path in options['paths'].split(',') if path.strip()]
+        try:
+            levels = [int(level) for level in options['concurrency'].split(',')]
+        except ValueError:
+            raise CommandError(f"Invalid --concurrency: {options['concurrency']}")
+        if not paths or min(levels) < 1:
+            raise CommandError("Need at least one path and a concurrency of at least 1")
+
+        try:
+            token = asyncio.run(login(options['url'], options['email'], options['password']))
+            runs = []
+            for level in levels:
+                self.stderr.write(f"{level} connections for {options['duration']:g}s...")
+                runs.append(asyncio.run(run_load(
+                    options['url'], paths, token, concurrency=level, duration=options['duration'], pids=options['pid'],
+                )))
+        except (LoadTestError, OSError) as e:
+            raise CommandError(str(e))
+
+        output = json.dumps({'label': options['label'], 'url': options['url'], 'paths': paths, 'runs': runs}, indent=2)
+        self.stdout.write(output)
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                output_file.write(output + '\n')
@@ -0,0 +1,23 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from api.recurring import materialize_due
+
+
+class Command(BaseCommand):
+    help = "Records every due occurrence of the active recurring rules as income or expense rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help="Materialize occurrences up to this date (YYYY-MM-DD; default today).")
+        parser.add_argument('--chunk-size', type=int, default=500, help="Rules written per transaction.")
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"Invalid --date: {options['date']}")
+        summary = materialize_due(today, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {summary['rules']} rule(s): {summary['income']} income and {summary['expense']} expense row(s) created"
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from api.token_blacklist import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = "Deletes expired outstanding/blacklisted refresh tokens and reloads the revocation filter."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10_000, help="Rows deleted per statement.")
+
+    def handle(self, *args, **options):
+        deleted = prune_expired_tokens(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} expired token row(s)"))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from api.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = "Deletes sync tombstones older than SYNC['TOMBSTONE_RETENTION_DAYS']."
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones()
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} tombstone(s)"))
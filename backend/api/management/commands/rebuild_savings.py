@@ -0,0 +1,61 @@
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Sum
+from api.models import Income, Expense, Savings
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Rebuilds (or verifies) the maintained savings balance from income and expense history."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', dest='email', help="Only process the user with this email.")
+        parser.add_argument(
+            '--verify', action='store_true',
+            help="Report drifted balances without changing them; exits non-zero on drift.",
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['email']:
+            users = users.filter(email=options['email'])
+            if not users.exists():
+                raise CommandError(f"No user with email {options['email']}")
+
+        # Two grouped aggregates for every user instead of two scans per user
+        income = self._totals_by_user(Income, users)
+        expense = self._totals_by_user(Expense, users)
+        stored = {s.user_id: s for s in Savings.objects.filter(user__in=users)}
+
+        drifted = []
+        for user_id in users.values_list('id', flat=True).iterator():
+            expected = income.get(user_id, Decimal('0')) - expense.get(user_id, Decimal('0'))
+            savings = stored.get(user_id)
+            if savings is None or savings.total != expected:
+                drifted.append((user_id, savings, expected))
+
+        for user_id, savings, expected in drifted:
+            current = 'missing' if savings is None else savings.total
+            self.stdout.write(f"user {user_id}: stored {current}, expected {expected}")
+
+        if options['verify']:
+            if drifted:
+                raise CommandError(f"{len(drifted)} savings balance(s) drifted")
+            self.stdout.write(self.style.SUCCESS("All savings balances match history"))
+            return
+
+        with transaction.atomic():
+            for user_id, savings, expected in drifted:
+                if savings is None:
+                    Savings.objects.create(user_id=user_id, total=expected)
+                else:
+                    Savings.objects.filter(user_id=user_id).update(total=expected)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(drifted)} savings balance(s)"))
+
+    def _totals_by_user(self, model, users):
+        rows = model.objects.filter(user__in=users).values('user').annotate(total=Sum('amount'))
+        return {row['user']: row['total'] for row in rows}
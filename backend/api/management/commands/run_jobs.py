@@ -0,0 +1,59 @@
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from api.jobs import claim_job, job_options, requeue_stale, run_job
+
+
+class Command(BaseCommand):
+    help = "Runs queued background jobs until stopped, or with --once until none are due."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, help="Jobs run at the same time (default JOBS['THREADS']).")
+        parser.add_argument('--once', action='store_true', help="Exit when no job is due instead of polling.")
+
+    def handle(self, *args, **options):
+        settings = job_options()
+        threads = options['threads'] or settings['THREADS']
+        if threads < 1:
+            raise CommandError("--threads must be at least 1")
+
+        stop = threading.Event()
+        if not options['once']:
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                # Jobs in progress are finished before the worker exits
+                signal.signal(signum, lambda *_: stop.set())
+
+        requeue_stale()
+        if threads == 1:
+            processed = self.work(stop, options['once'], settings['POLL_INTERVAL'])
+        else:
+            with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='job-worker') as pool:
+                futures = [
+                    pool.submit(self.work_in_thread, stop, options['once'], settings['POLL_INTERVAL'])
+                    for _ in range(threads)
+                ]
+                processed = sum(future.result() for future in futures)
+        self.stdout.write(self.style.SUCCESS(f"Ran {processed} job(s)"))
+
+    def work(self, stop, once, poll_interval):
+        processed = 0
+        while not stop.is_set():
+            job = claim_job()
+            if job is None:
+                if once:
+                    break
+                requeue_stale()
+                stop.wait(poll_interval)
+                continue
+            status = run_job(job)
+            self.stdout.write(f"Job {job.pk} ({job.kind}) for user {job.user_id}: {status}")
+            processed += 1
+        return processed
+
+    def work_in_thread(self, *args):
+        try:
+            return self.work(*args)
+        finally:
+            connections.close_all()
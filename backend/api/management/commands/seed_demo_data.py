@@ -0,0 +1,112 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from api.models import Budget, BudgetItem, Category, Expense, Goal, Income, Savings
+from api.signals import transactions_changed
+
+User = get_user_model()
+
+INCOME_CATEGORIES = ['Salary', 'Freelance', 'Interest', 'Gifts']
+EXPENSE_CATEGORIES = ['Food', 'Rent', 'Transport', 'Utilities', 'Fun', 'Health', 'Shopping', 'Travel']
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates synthetic users with income, expenses, budgets and goals for "
+        "benchmarks. Users are named <prefix>-<n>@example.com and share --password."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1)
+        parser.add_argument('--income', type=int, default=1000, help="Income rows per user.")
+        parser.add_argument('--expenses', type=int, default=5000, help="Expense rows per user.")
+        parser.add_argument('--budgets', type=int, default=24, help="Monthly budgets per user.")
+        parser.add_argument('--items', type=int, default=8, help="Items per budget.")
+        parser.add_argument('--goals', type=int, default=5, help="Goals per user.")
+        parser.add_argument('--days', type=int, default=730, help="History length in days.")
+        parser.add_argument('--prefix', default='bench')
+        parser.add_argument('--password', default='bench-password')
+        parser.add_argument('--seed', type=int, default=42, help="Random seed, for reproducible data.")
+        parser.add_argument('--reset', action='store_true', help="Delete existing users with this prefix first.")
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        existing = User.objects.filter(email__startswith=f'{prefix}-', email__endswith='@example.com')
+        if existing.exists():
+            if not options['reset']:
+                raise CommandError(f"Users with prefix '{prefix}' already exist; pass --reset to replace them")
+            existing.delete()
+
+        rng = random.Random(options['seed'])
+        # Hashing once keeps seeding fast; every user gets the same password
+        password = make_password(options['password'])
+        today = date.today()
+
+        for index in range(options['users']):
+            with transaction.atomic():
+                user = User.objects.create(
+                    email=f'{prefix}-{index}@example.com', username=f'{prefix}-{index}',
+                    full_name=f'Bench User {index}', password=password,
+                )
+                self._seed_user(user, rng, today, options)
+            self.stdout.write(f"seeded {user.email}")
+
+        self.stdout.write(self.style.SUCCESS(f"Seeded {options['users']} user(s)"))
+
+    def _seed_user(self, user, rng, today, options):
+        categories = Category.objects.bulk_create(
+            [Category(name=name, cat_type=Category.INCOME, user=user) for name in INCOME_CATEGORIES]
+            + [Category(name=name, cat_type=Category.EXPENSE, user=user) for name in EXPENSE_CATEGORIES]
+        )
+        income_categories = categories[:len(INCOME_CATEGORIES)]
+        expense_categories = categories[len(INCOME_CATEGORIES):]
+
+        def some_day():
+            return today - timedelta(days=rng.randrange(options['days']))
+
+        def amount(low, high):
+            return Decimal(rng.randrange(low * 100, high * 100)) / 100
+
+        # Created first, at zero, so the balance follows the deltas sent below
+        Savings.for_user(user)
+        incomes = Income.objects.bulk_create([
+            Income(name=f'Income {i}', amount=amount(50, 3000), date=some_day(),
+                   category=rng.choice(income_categories), user=user)
+            for i in range(options['income'])
+        ], batch_size=2000)
+        expenses = Expense.objects.bulk_create([
+            Expense(name=f'Expense {i}', amount=amount(1, 400), date=some_day(), category=rng.choice(expense_categories),
+                    description=rng.choice(['', 'Paid by card', 'Split with friends']), user=user)
+            for i in range(options['expenses'])
+        ], batch_size=2000)
+        # bulk_create sends no per-row signals (see models.TransactionRow)
+        for model, rows in ((Income, incomes), (Expense, expenses)):
+            entries = [(row.pk, row.date, model.balance_sign * row.amount) for row in rows]
+            if entries:
+                transactions_changed.send(
+                    sender=model, user=user, delta=sum(delta for _, _, delta in entries), entries=entries,
+                )
+
+        budgets = []
+        month_start = today.replace(day=1)
+        for _ in range(options['budgets']):
+            month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+            budgets.append(Budget(name=month_start.strftime('%B %Y'), target_amount=amount(1000, 5000),
+                                  start_date=month_start, end_date=month_end, user=user))
+            month_start = (month_start - timedelta(days=1)).replace(day=1)
+        budgets = Budget.objects.bulk_create(budgets)
+        BudgetItem.objects.bulk_create([
+            BudgetItem(budget=budget, category=category.name, expense_category=category, planned=amount(50, 800))
+            for budget in budgets
+            for category in rng.sample(expense_categories, min(options['items'], len(expense_categories)))
+        ], batch_size=2000)
+
+        Goal.objects.bulk_create([
+            Goal(name=f'Goal {i}', target_amount=amount(1000, 20000), current_amount=amount(0, 1000),
+                 deadline=today + timedelta(days=rng.randrange(30, 1500)), user=user)
+            for i in range(options['goals'])
+        ])
@@ -0,0 +1,154 @@
+"""
+Per-request cost accounting.
+
+`RequestMetricsMiddleware` opens a `RequestMetrics` for every request and
+collects query counts, SQL time and serializer time into it; finished
+requests are folded into the process-wide `registry`, which the
+`/metrics` view renders in the Prometheus text format.
+"""
+import heapq
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current = ContextVar('request_metrics', default=None)
+
+# Upper bounds (seconds) of the request duration histogram
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOWEST_QUERIES_KEPT = 3
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+        # Min-heap of (duration, sql) holding the slowest statements
+        self.slowest_queries = []
+
+    def record_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.query_count += 1
+            self.sql_time += duration
+            entry = (duration, sql)
+            if len(self.slowest_queries) < SLOWEST_QUERIES_KEPT:
+                heapq.heappush(self.slowest_queries, entry)
+            elif duration > self.slowest_queries[0][0]:
+                heapq.heapreplace(self.slowest_queries, entry)
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def current_metrics():
+    return _current.get()
+
+
+@contextmanager
+def collect_metrics():
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def serializer_timer():
+    """Adds the enclosed time to the request's serializer time (outermost call only)."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    metrics.serializer_depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_depth -= 1
+        if metrics.serializer_depth == 0:
+            metrics.serializer_time += time.perf_counter() - start
+
+
+class MetricsRegistry:
+    """Thread-safe running totals per (view, method)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, view, method, status_code, metrics, wall_time):
+        key = (view, method)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    'requests': 0,
+                    'errors': 0,
+                    'wall': 0.0,
+                    'sql': 0.0,
+                    'queries': 0,
+                    'serializer': 0.0,
+                    'buckets': [0] * len(DURATION_BUCKETS),
+                }
+            series['requests'] += 1
+            if status_code >= 500:
+                series['errors'] += 1
+            series['wall'] += wall_time
+            series['sql'] += metrics.sql_time
+            series['queries'] += metrics.query_count
+            series['serializer'] += metrics.serializer_time
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if wall_time <= bound:
+                    series['buckets'][index] += 1
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render_prometheus(self):
+        with self._lock:
+            snapshot = {key: {**series, 'buckets': list(series['buckets'])} for key, series in self._series.items()}
+
+        lines = []
+
+        def family(name, kind, help_text, value_of):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (view, method), series in sorted(snapshot.items()):
+                lines.append(f'{name}{{view="{_escape(view)}",method="{method}"}} {value_of(series)}')
+
+        family('api_requests_total', 'counter', "Requests handled.", lambda s: s['requests'])
+        family('api_request_errors_total', 'counter', "Requests that ended in a 5xx response.", lambda s: s['errors'])
+        family('api_db_queries_total', 'counter', "Database queries issued.", lambda s: s['queries'])
+        family('api_db_seconds_total', 'counter', "Time spent executing SQL.", lambda s: f"{s['sql']:.6f}")
+        family('api_serializer_seconds_total', 'counter', "Time spent in serializers.", lambda s: f"{s['serializer']:.6f}")
+
+        name = 'api_request_duration_seconds'
+        lines.append(f"# HELP {name} Wall time per request.")
+        lines.append(f"# TYPE {name} histogram")
+        for (view, method), series in sorted(snapshot.items()):
+            labels = f'view="{_escape(view)}",method="{method}"'
+            for bound, count in zip(DURATION_BUCKETS, series['buckets']):
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {series["requests"]}')
+            lines.append(f'{name}_sum{{{labels}}} {series["wall"]:.6f}')
+            lines.append(f'{name}_count{{{labels}}} {series["requests"]}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = MetricsRegistry()
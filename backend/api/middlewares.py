@@ -1,6 +1,10 @@
 import logging
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from contextlib import ExitStack
 from django.conf import settings
+from django.db import connections
 from django.http import HttpRequest
+from .metrics import collect_metrics, registry
 
 logger = logging.getLogger(__name__)
 
@@ -8,14 +12,28 @@ class ExemptJWTAuthenticationMiddleware:
     """
     Custom middleware to exempt specific endpoints from JWT authentication.
     """
-    
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
         # Endpoints that should bypass authentication
         self.exempt_urls = getattr(settings, 'REST_FRAMEWORK_EXEMPT_ENDPOINTS', [])
         logger.info(f"JWT authentication exemption middleware initialized with exempt URLs: {self.exempt_urls}")
-    
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
     def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.mark_exempt(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request: HttpRequest):
+        self.mark_exempt(request)
+        return await self.get_response(request)
+
+    def mark_exempt(self, request: HttpRequest):
         # Check if the current path matches any exempt URL
         path = request.path.strip('/')
         
@@ -29,6 +47,72 @@ class ExemptJWTAuthenticationMiddleware:
             logger.info(f"Path {path} is exempt from JWT authentication")
             # Mark this request as not requiring authentication
             request.META['JWT_AUTH_EXEMPT'] = True
-        
-        response = self.get_response(request)
-        return response 
\ No newline at end of file
+
+
+class RequestMetricsMiddleware:
+    """
+    Records DB query count, SQL time, serializer time and wall time for
+    each request, aggregated by resolved view name for `/metrics`.
+
+    Also adds a `Server-Timing` header when API_SERVER_TIMING is on, and
+    logs requests slower than API_SLOW_REQUEST_MS with their slowest SQL.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'API_SERVER_TIMING', False)
+        self.slow_request_ms = getattr(settings, 'API_SLOW_REQUEST_MS', 0)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with collect_metrics() as metrics, ExitStack() as stack:
+            self.wrap_connections(stack, metrics)
+            response = self.get_response(request)
+        return self.record(request, response, metrics)
+
+    async def __acall__(self, request: HttpRequest):
+        # Connections are per thread: the wrappers go on the ones of the
+        # request's sync thread, where the async ORM runs its queries
+        with collect_metrics() as metrics:
+            stack = ExitStack()
+            await sync_to_async(self.wrap_connections)(stack, metrics)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+        return self.record(request, response, metrics)
+
+    def wrap_connections(self, stack, metrics):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(metrics.record_query))
+
+    def record(self, request, response, metrics):
+        wall_time = metrics.elapsed
+
+        match = request.resolver_match
+        view_name = (match.view_name or match._func_path) if match else 'unresolved'
+        registry.observe(view_name, request.method, response.status_code, metrics, wall_time)
+
+        if self.server_timing:
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={metrics.sql_time * 1000:.1f};desc="{metrics.query_count} queries"',
+                f'ser;dur={metrics.serializer_time * 1000:.1f}',
+                f'total;dur={wall_time * 1000:.1f}',
+            ])
+
+        if self.slow_request_ms and wall_time * 1000 >= self.slow_request_ms:
+            slowest = sorted(metrics.slowest_queries, reverse=True)
+            details = ''.join(f"\n  {duration * 1000:.1f}ms {sql[:500]}" for duration, sql in slowest)
+            logger.warning(
+                f"Slow request {request.method} {request.path} ({view_name}): {wall_time * 1000:.0f}ms, "
+                f"{metrics.query_count} queries in {metrics.sql_time * 1000:.0f}ms{details}"
+            )
+
+        return response
+
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.1 on 2026-10-18 02:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_passwordresetcode'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='savings',
+            name='total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.1 on 2026-10-18 02:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_transaction_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='expense',
+            name='api_expense_user_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='income',
+            name='api_income_user_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'date', 'id'], name='api_expense_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='income',
+            index=models.Index(fields=['user', 'date', 'id'], name='api_income_user_date_idx'),
+        ),
+    ]
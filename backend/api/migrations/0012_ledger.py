@@ -0,0 +1,71 @@
+# Generated by Django 4.2.1 on 2026-10-18 03:09
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def backfill_ledger(apps, schema_editor):
+    # Existing rows become one entry each, so the ledger sums to the balance
+    LedgerEntry = apps.get_model('api', 'LedgerEntry')
+    for model_name, sign in (('income', 1), ('expense', -1)):
+        model = apps.get_model('api', model_name)
+        rows = model.objects.order_by('id').values_list('id', 'user_id', 'date', 'amount')
+        batch = []
+        for object_id, user_id, date, amount in rows.iterator(chunk_size=2000):
+            batch.append(LedgerEntry(user_id=user_id, model=model_name, object_id=object_id, date=date, delta=sign * amount))
+            if len(batch) >= 2000:
+                LedgerEntry.objects.bulk_create(batch)
+                batch = []
+        LedgerEntry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_recurring_rules'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('date', models.DateField()),
+                ('delta', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LedgerSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('period_end', models.DateField()),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('through_id', models.BigIntegerField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='ledgersnapshot',
+            index=models.Index(fields=['user', 'period_end'], name='api_ledgersnapshot_end_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='ledgersnapshot',
+            constraint=models.UniqueConstraint(fields=('user', 'month'), name='api_ledgersnapshot_unique_month'),
+        ),
+        migrations.AddIndex(
+            model_name='ledgerentry',
+            index=models.Index(fields=['user', 'date'], name='api_ledger_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ledgerentry',
+            index=models.Index(fields=['user', 'id'], name='api_ledger_user_id_idx'),
+        ),
+        migrations.RunPython(backfill_ledger, migrations.RunPython.noop),
+    ]
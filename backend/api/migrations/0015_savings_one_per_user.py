@@ -0,0 +1,37 @@
+# Generated by Django 4.2.1 on 2026-10-18 04:18
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def merge_duplicate_savings(apps, schema_editor):
+    # Which duplicate held the right total is unknown, so keep the oldest
+    # row and recompute it
+    Savings = apps.get_model('api', 'Savings')
+    Income = apps.get_model('api', 'Income')
+    Expense = apps.get_model('api', 'Expense')
+    duplicated = (
+        Savings.objects.values('user').annotate(rows=Count('id')).filter(rows__gt=1).values_list('user', flat=True)
+    )
+    for user_id in list(duplicated):
+        keep = Savings.objects.filter(user_id=user_id).order_by('id').first()
+        Savings.objects.filter(user_id=user_id).exclude(pk=keep.pk).delete()
+        income = Income.objects.filter(user_id=user_id).aggregate(total=Sum('amount'))['total'] or 0
+        expense = Expense.objects.filter(user_id=user_id).aggregate(total=Sum('amount'))['total'] or 0
+        keep.total = income - expense
+        keep.save(update_fields=['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_job_heartbeat'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_savings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='savings',
+            constraint=models.UniqueConstraint(fields=('user',), name='api_savings_one_per_user'),
+        ),
+    ]
@@ -1,8 +1,8 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth import get_user_model
 from django.dispatch import receiver
-from django.db.models import Sum
+from django.db.models import F, Sum
 from django.utils import timezone
 from django.conf import settings
 
@@ -32,39 +32,158 @@ class Category(models.Model):
     name = models.CharField(max_length=100)
     cat_type = models.CharField(max_length=2, choices=CATEGORY_TYPES)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'updated_at'], name='api_category_user_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_cat_type_display()}: {self.name}"
 
-class Income(models.Model):
+class TransactionRow:
+    """
+    Shared bookkeeping for Income and Expense.
+
+    Invariant: every write to these tables must reach `transactions_changed`
+    (api/signals.py), which keeps the savings balance, budget actuals, the
+    user's data version, tombstones and the balance ledger in step.
+
+    * Single-row save() and delete(), from any caller (views, admin, shell,
+      commands), are reported by post_save/post_delete receivers, using the
+      date and amount the row was loaded with.
+    * Bulk statements (bulk_create, bulk_update, QuerySet.update and
+      `delete_rows`) send no per-row signals; their callers must send
+      `transactions_changed` themselves.
+
+    Rows deleted along with their user are not reported.
+    """
+    # +1 for money coming in, -1 for money going out
+    balance_sign = 1
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_stored()
+        return instance
+
+    def balance_values(self):
+        """The row's date and amount as date and Decimal (they may be set as strings)."""
+        return (
+            self._meta.get_field('date').to_python(self.date),
+            self._meta.get_field('amount').to_python(self.amount),
+        )
+
+    def remember_stored(self):
+        """Notes the row's date and amount as saved (None while either is deferred)."""
+        values = self.__dict__
+        self.stored = self.balance_values() if 'date' in values and 'amount' in values else None
+
+    @classmethod
+    def delete_rows(cls, queryset):
+        """
+        Deletes the rows in one statement without per-row signals; the
+        caller sends `transactions_changed`. Nothing references these rows
+        by foreign key, so there is no cascade to collect.
+        """
+        return queryset._raw_delete(queryset.db)
+
+
+class Income(TransactionRow, models.Model):
     name = models.CharField(max_length=100)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     date = models.DateField(default=timezone.now)  # Added default
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True)
     description = models.TextField(blank=True)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    # Content hash of the statement row this was imported from, if any
+    import_hash = models.CharField(max_length=64, null=True, blank=True, editable=False)
+    # The rule and scheduled date this row was materialized from, if any
+    recurring_rule = models.ForeignKey('RecurringRule', on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='+')
+    occurrence_date = models.DateField(null=True, blank=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'date', 'id'], name='api_income_user_date_idx'),
+            models.Index(fields=['user', 'category', 'date'], name='api_income_user_cat_date_idx'),
+            models.Index(fields=['user', 'updated_at'], name='api_income_user_updated_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'import_hash'], name='api_income_unique_import_hash'),
+            models.UniqueConstraint(fields=['recurring_rule', 'occurrence_date'], name='api_income_unique_occurrence'),
+        ]
 
     def __str__(self):
         return f"{self.name}: ₱{self.amount}"
 
-class Expense(models.Model):
+class Expense(TransactionRow, models.Model):
     name = models.CharField(max_length=100)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     date = models.DateField(default=timezone.now)  # Added default
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True)
     description = models.TextField(blank=True)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    # Content hash of the statement row this was imported from, if any
+    import_hash = models.CharField(max_length=64, null=True, blank=True, editable=False)
+    # The rule and scheduled date this row was materialized from, if any
+    recurring_rule = models.ForeignKey('RecurringRule', on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='+')
+    occurrence_date = models.DateField(null=True, blank=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'date', 'id'], name='api_expense_user_date_idx'),
+            models.Index(fields=['user', 'category', 'date'], name='api_expense_user_cat_date_idx'),
+            models.Index(fields=['user', 'updated_at'], name='api_expense_user_updated_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'import_hash'], name='api_expense_unique_import_hash'),
+            models.UniqueConstraint(fields=['recurring_rule', 'occurrence_date'], name='api_expense_unique_occurrence'),
+        ]
+
+    balance_sign = -1
 
     def __str__(self):
         return f"{self.name}: ₱{self.amount}"
     
 class Savings(models.Model):
-    total = models.IntegerField(default=0)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
 
+    class Meta:
+        constraints = [
+            # First-time writers racing to create the row get the same one
+            models.UniqueConstraint(fields=['user'], name='api_savings_one_per_user'),
+        ]
+
+    @classmethod
+    def for_user(cls, user):
+        """Returns the user's savings row, creating it from a full recompute if missing."""
+        savings, created = cls.objects.get_or_create(user=user)
+        if created:
+            savings.calculate_total()
+        return savings
+
+    @classmethod
+    def apply_delta(cls, user, delta):
+        """Adjusts the stored balance in place instead of re-aggregating history."""
+        if not delta:
+            return
+        if cls.objects.filter(user=user).update(total=F('total') + delta):
+            return
+        savings, created = cls.objects.get_or_create(user=user)
+        if created:
+            # The recompute includes this write
+            savings.calculate_total()
+        else:
+            # Another writer created the row first, without seeing this write
+            cls.objects.filter(pk=savings.pk).update(total=F('total') + delta)
+
     def calculate_total(self):
-        total_income = Income.objects.filter(user=self.user).aggregate(Sum('amount'))['amount__sum'] or 0
-        total_expense = Expense.objects.filter(user=self.user).aggregate(Sum('amount'))['amount__sum'] or 0
+        total_income = Income.objects.filter(user_id=self.user_id).aggregate(Sum('amount'))['amount__sum'] or 0
+        total_expense = Expense.objects.filter(user_id=self.user_id).aggregate(Sum('amount'))['amount__sum'] or 0
         self.total = total_income - total_expense
         self.save()
 
@@ -80,6 +199,13 @@ class Budget(models.Model):
     description = models.TextField(blank=True)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     period = models.CharField(max_length=10, choices=[('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly')], default='monthly')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'start_date', 'end_date'], name='api_budget_user_period_idx'),
+            models.Index(fields=['user', 'updated_at'], name='api_budget_user_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} (₱{self.current_amount}/₱{self.target_amount})"
@@ -87,9 +213,15 @@ class Budget(models.Model):
 class BudgetItem(models.Model):
     budget = models.ForeignKey(Budget, related_name='items', on_delete=models.CASCADE)
     category = models.CharField(max_length=100)
+    # Expenses in this category count towards the item; when unset the
+    # item matches expense categories by name instead
+    expense_category = models.ForeignKey(
+        Category, related_name='budget_items', on_delete=models.SET_NULL, null=True, blank=True
+    )
     planned = models.DecimalField(max_digits=10, decimal_places=2)
     actual = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     color = models.CharField(max_length=20, blank=True, null=True)  # For storing color code
+    updated_at = models.DateTimeField(auto_now=True)
 
     @property
     def remaining(self):
@@ -111,10 +243,231 @@ class Goal(models.Model):
     deadline = models.DateField()
     description = models.TextField(blank=True)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'deadline'], name='api_goal_user_deadline_idx'),
+            models.Index(fields=['user', 'updated_at'], name='api_goal_user_updated_idx'),
+        ]
 
     @property
     def progress(self):
         return (self.current_amount / self.target_amount) * 100 if self.target_amount else 0
 
     def __str__(self):
-        return f"{self.name} ({self.progress:.0f}%)"
\ No newline at end of file
+        return f"{self.name} ({self.progress:.0f}%)"
+
+class StatementImport(models.Model):
+    """A statement file that has been imported, keyed by its SHA-256."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    file_hash = models.CharField(max_length=64)
+    filename = models.CharField(max_length=255, blank=True)
+    summary = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'file_hash'], name='api_statementimport_unique_file'),
+        ]
+
+    def __str__(self):
+        return f"{self.filename or self.file_hash[:12]} ({self.user_id})"
+
+class UserDataVersion(models.Model):
+    """
+    Counter bumped on every write to a user's financial data. List and
+    detail responses carry it in their ETag, so an unchanged client copy
+    is confirmed with this one primary-key lookup.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='data_version')
+    version = models.PositiveBigIntegerField(default=0)
+
+    @classmethod
+    def current(cls, user_id):
+        return cls.objects.filter(user_id=user_id).values_list('version', flat=True).first() or 0
+
+    @classmethod
+    async def acurrent(cls, user_id):
+        return await cls.objects.filter(user_id=user_id).values_list('version', flat=True).afirst() or 0
+
+    @classmethod
+    def bump(cls, user_id):
+        # Runs inside the writer's transaction, so the new version becomes
+        # visible together with the data it describes
+        if cls.objects.filter(user_id=user_id).update(version=F('version') + 1):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(user_id=user_id, version=1)
+        except IntegrityError:
+            cls.objects.filter(user_id=user_id).update(version=F('version') + 1)
+
+    def __str__(self):
+        return f"Data version {self.version} for {self.user_id}"
+
+class Tombstone(models.Model):
+    """Record of a deleted row, kept so delta sync can report the deletion."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    model = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'deleted_at'], name='api_tombstone_user_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} deleted at {self.deleted_at}"
+
+class RecurringRule(models.Model):
+    """
+    A repeating income or expense: every `interval` days, weeks, months or
+    years from `start_date` until `end_date`. Due occurrences are written
+    as Income/Expense rows by `manage.py materialize_recurring`;
+    `next_occurrence` is the first one not yet written (None once the rule
+    has run out).
+    """
+    DAILY = 'daily'
+    WEEKLY = 'weekly'
+    MONTHLY = 'monthly'
+    YEARLY = 'yearly'
+    FREQUENCIES = [
+        (DAILY, 'Daily'),
+        (WEEKLY, 'Weekly'),
+        (MONTHLY, 'Monthly'),
+        (YEARLY, 'Yearly'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=2, choices=Category.CATEGORY_TYPES)
+    name = models.CharField(max_length=100)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True)
+    description = models.TextField(blank=True)
+    frequency = models.CharField(max_length=10, choices=FREQUENCIES, default=MONTHLY)
+    interval = models.PositiveSmallIntegerField(default=1)
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+    next_occurrence = models.DateField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_active', 'next_occurrence'], name='api_recurring_due_idx'),
+        ]
+
+    @property
+    def model(self):
+        return Income if self.kind == Category.INCOME else Expense
+
+    def __str__(self):
+        return f"{self.name}: ₱{self.amount} every {self.interval} {self.frequency}"
+
+class RecurringAmountChange(models.Model):
+    """A new amount for a recurring rule's occurrences from `effective_date` on."""
+    rule = models.ForeignKey(RecurringRule, on_delete=models.CASCADE, related_name='amount_changes')
+    effective_date = models.DateField()
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+
+    class Meta:
+        ordering = ['effective_date']
+        constraints = [
+            models.UniqueConstraint(fields=['rule', 'effective_date'], name='api_recurringamount_unique_date'),
+        ]
+
+    def __str__(self):
+        return f"₱{self.amount} from {self.effective_date}"
+
+class LedgerEntry(models.Model):
+    """
+    Append-only record of one change to a user's balance: the signed
+    effect of creating, updating or deleting an income or expense row,
+    dated with the transaction it applies to.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    model = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    date = models.DateField()
+    delta = models.DecimalField(max_digits=14, decimal_places=2)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'date'], name='api_ledger_user_date_idx'),
+            models.Index(fields=['user', 'id'], name='api_ledger_user_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id}: {self.delta:+} on {self.date}"
+
+class LedgerSnapshot(models.Model):
+    """
+    A user's balance at the end of a month, from the ledger entries up to
+    `through_id` dated on or before `period_end`.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    month = models.DateField()
+    period_end = models.DateField()
+    balance = models.DecimalField(max_digits=14, decimal_places=2)
+    through_id = models.BigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'month'], name='api_ledgersnapshot_unique_month'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'period_end'], name='api_ledgersnapshot_end_idx'),
+        ]
+
+    def __str__(self):
+        return f"Balance {self.balance} at {self.period_end} for {self.user_id}"
+
+class Job(models.Model):
+    """
+    A unit of background work for one user, run by `manage.py run_jobs`.
+    At most one job per user runs at a time; failed attempts are retried
+    with exponential backoff up to `max_attempts`.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUSES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUSES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Refreshed by the running attempt; a stale one means its worker died
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # Serializes each user's jobs, however many workers are polling
+            models.UniqueConstraint(
+                fields=['user'], condition=models.Q(status='running'), name='api_job_one_running_per_user',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='api_job_due_idx'),
+            models.Index(fields=['user', 'status'], name='api_job_user_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} job {self.pk} for {self.user_id}: {self.status}"
@@ -0,0 +1,219 @@
+import base64
+from collections import OrderedDict
+from datetime import date
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from .search import search_active
+
+
+class SizedPageNumberPagination(PageNumberPagination):
+    """
+    Page-number pagination with a client-selectable page size and an
+    optional `count=false` flag that skips the COUNT(*) over the queryset.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.skip_count = request.query_params.get(self.count_query_param, '').lower() in ('0', 'false', 'no')
+        if not self.skip_count:
+            return super().paginate_queryset(queryset, request, view)
+        offset, page_size = self.get_uncounted_window(request)
+        return self.get_uncounted_page(list(queryset[offset:offset + page_size + 1]), page_size)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """`paginate_queryset` with the reads done through the async ORM."""
+        self.skip_count = request.query_params.get(self.count_query_param, '').lower() in ('0', 'false', 'no')
+        if self.skip_count:
+            offset, page_size = self.get_uncounted_window(request)
+            return self.get_uncounted_page([row async for row in queryset[offset:offset + page_size + 1]], page_size)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Seeding the cached count keeps page() from querying synchronously
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        self.page.object_list = [row async for row in self.page.object_list]
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.request = request
+        return list(self.page)
+
+    def get_uncounted_window(self, request):
+        self.request = request
+        page_size = self.get_page_size(request)
+        try:
+            self.page_number = _positive_int(request.query_params.get(self.page_query_param, 1), strict=True)
+        except ValueError:
+            raise NotFound(self.invalid_page_message.format(page_number=request.query_params.get(self.page_query_param)))
+        return (self.page_number - 1) * page_size, page_size
+
+    def get_uncounted_page(self, rows, page_size):
+        # One extra row was fetched to know whether there is a next page
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_paginated_response(self, data):
+        if not self.skip_count:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('count', None),
+            ('next', self.get_uncounted_link(self.page_number + 1) if self.has_next else None),
+            ('previous', self.get_uncounted_link(self.page_number - 1) if self.page_number > 1 else None),
+            ('results', data),
+        ]))
+
+    def get_uncounted_link(self, page_number):
+        url = self.request.build_absolute_uri()
+        if page_number == 1:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, page_number)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over (date, id), newest first. Each page is a
+    range seek on the (user, date, id) index, so the cost of a page does
+    not depend on how deep into the history it is, and no count is run.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = SizedPageNumberPagination.page_size
+    max_page_size = SizedPageNumberPagination.max_page_size
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, page_size = self.seek(queryset, request)
+        return self.get_page(list(queryset[:page_size + 1]), page_size)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """`paginate_queryset` with the reads done through the async ORM."""
+        queryset, page_size = self.seek(queryset, request)
+        return self.get_page([row async for row in queryset[:page_size + 1]], page_size)
+
+    def seek(self, queryset, request):
+        self.request = request
+        page_size = self.get_page_size(request)
+        self.position = position = self.decode_cursor(request)
+
+        if position is None:
+            queryset = queryset.order_by('-date', '-id')
+        else:
+            reverse, cursor_date, cursor_id = position
+            if reverse:
+                # Walking back towards newer rows
+                queryset = queryset.filter(
+                    Q(date__gt=cursor_date) | Q(date=cursor_date, id__gt=cursor_id),
+                    date__gte=cursor_date,
+                ).order_by('date', 'id')
+            else:
+                # The redundant date bound lets the database seek the index
+                queryset = queryset.filter(
+                    Q(date__lt=cursor_date) | Q(date=cursor_date, id__lt=cursor_id),
+                    date__lte=cursor_date,
+                ).order_by('-date', '-id')
+        return queryset, page_size
+
+    def get_page(self, rows, page_size):
+        # One extra row was fetched to know whether there is another page
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        if self.position is not None and self.position[0]:
+            rows.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        next_link = None
+        previous_link = None
+        if self.page and self.has_next:
+            next_link = self.encode_cursor(False, self.page[-1])
+        if self.page and self.has_previous:
+            previous_link = self.encode_cursor(True, self.page[0])
+
+        return Response(OrderedDict([
+            ('next', next_link),
+            ('previous', previous_link),
+            ('results', data),
+        ]))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            direction, cursor_date, cursor_id = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii').split('|')
+            if direction not in ('n', 'p'):
+                raise ValueError(direction)
+            return direction == 'p', date.fromisoformat(cursor_date), int(cursor_id)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, reverse, row):
+        value = f"{'p' if reverse else 'n'}|{row.date.isoformat()}|{row.id}"
+        encoded = base64.urlsafe_b64encode(value.encode('ascii')).decode('ascii')
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, encoded)
+
+
+class TransactionPagination(BasePagination):
+    """
+    Pagination for income and expense listings.
+
+    Defaults to page numbers (`?page=`, `?page_size=`, `?count=false`).
+    Passing `?pagination=cursor` or a `?cursor=` switches to keyset mode,
+    except for searches, which are ordered by rank rather than date.
+    """
+    mode_query_param = 'pagination'
+
+    def get_delegate(self, request):
+        if search_active(request):
+            return SizedPageNumberPagination()
+        if request.query_params.get(self.mode_query_param) == 'cursor' or KeysetPagination.cursor_query_param in request.query_params:
+            return KeysetPagination()
+        return SizedPageNumberPagination()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.delegate = self.get_delegate(request)
+        return self.delegate.paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.delegate = self.get_delegate(request)
+        return await self.delegate.apaginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.delegate.get_paginated_response(data)
+
+    def to_html(self):
+        return self.delegate.to_html()
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.delegate, 'display_page_controls', False)
@@ -0,0 +1,9 @@
+"""
+PostgreSQL database backend that pools connections per worker process,
+used when DB_CONNECTION_MODE is `pool` (ENGINE 'api.postgresql_pool').
+
+Django 4.2 has no built-in pool: with CONN_MAX_AGE > 0 every thread keeps
+its own connection, so a threaded or ASGI worker holds as many connections
+as it has ever had threads, and with CONN_MAX_AGE 0 every request pays for
+a new connection. Borrowing from a bounded pool per process avoids both.
+"""
@@ -0,0 +1,115 @@
+import os
+import threading
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgresDatabaseWrapper
+from django.db.backends.postgresql.creation import DatabaseCreation as PostgresDatabaseCreation
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from django.utils.asyncio import async_unsafe
+from .pool import ConnectionPool, PoolTimeout, pool_options
+
+# libpq transaction statuses (the same values in psycopg2 and psycopg 3)
+TRANSACTION_IDLE, TRANSACTION_ACTIVE, TRANSACTION_IDLE_IN, TRANSACTION_IN_ERROR, TRANSACTION_UNKNOWN = 0, 1, 2, 3, 4
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, conn_params):
+    """
+    The pool for a database alias in this process. Keyed by the process id
+    as well, so workers forked from a process that already connected start
+    their own pools, and by the connection parameters, so a test database
+    does not inherit connections to the real one.
+    """
+    key = (os.getpid(), alias, repr(sorted(conn_params.items())))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            options = pool_options()
+            pool = _pools[key] = ConnectionPool(
+                max_size=options['MAX_SIZE'], timeout=options['TIMEOUT'],
+                max_idle=options['MAX_IDLE'], max_lifetime=options['MAX_LIFETIME'],
+                check_after=options['CHECK_AFTER'],
+            )
+    return pool
+
+
+def close_pools(alias=None):
+    """Closes the idle connections of this process's pools (for `alias` only, if given)."""
+    with _pools_lock:
+        pools = [pool for (pid, pool_alias, _), pool in _pools.items()
+                 if pid == os.getpid() and alias in (None, pool_alias)]
+    for pool in pools:
+        pool.close()
+
+
+class DatabaseCreation(PostgresDatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections would keep the test database in use
+        close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(PostgresDatabaseWrapper):
+    """
+    PostgreSQL with connections borrowed from a per-process pool.
+
+    Django opens and closes connections as usual (with CONN_MAX_AGE 0, once
+    per request); here opening borrows from the pool and closing hands the
+    connection back, rolled back if it was left in a transaction, so each
+    worker keeps at most DB_POOL['MAX_SIZE'] connections however many
+    threads it serves requests from.
+    """
+    creation_class = DatabaseCreation
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool = None
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        self.pool = get_pool(self.alias, conn_params)
+        try:
+            connection = self.pool.getconn(
+                lambda: super(DatabaseWrapper, self).get_new_connection(conn_params), check=self._is_alive,
+            )
+        except PoolTimeout as e:
+            raise self.Database.OperationalError(str(e)) from e
+        # Set when the connection was opened; a reused one skipped that
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        connection, pool = self.connection, self.pool
+        pool.putconn(connection, discard=not self._reset(connection))
+
+    def _is_alive(self, connection):
+        """Round-trips to the server; False if the connection has gone away."""
+        if connection.closed:
+            return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if connection.info.transaction_status != TRANSACTION_IDLE:
+                # Not in autocommit; do not hand out an open transaction
+                connection.rollback()
+        except self.Database.Error:
+            return False
+        return True
+
+    def _reset(self, connection):
+        """Readies a connection for the next borrower; False if it should be discarded."""
+        if connection.closed:
+            return False
+        status = connection.info.transaction_status
+        if status in (TRANSACTION_ACTIVE, TRANSACTION_UNKNOWN):
+            return False
+        if status in (TRANSACTION_IDLE_IN, TRANSACTION_IN_ERROR):
+            try:
+                connection.rollback()
+            except self.Database.Error:
+                return False
+        return True
@@ -0,0 +1,155 @@
+import threading
+import time
+from collections import deque
+from django.conf import settings
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+def pool_options():
+    return {
+        'MAX_SIZE': 4,
+        'TIMEOUT': 10.0,
+        'MAX_IDLE': 300.0,
+        'CHECK_AFTER': 30.0,
+        'MAX_LIFETIME': 3600.0,
+        **getattr(settings, 'DB_POOL', {}),
+    }
+
+
+class ConnectionPool:
+    """
+    A bounded, thread-safe pool of open DB-API connections.
+
+    At most `max_size` connections are open at once; a borrower that finds
+    none free waits up to `timeout` seconds for one to be returned. Idle
+    connections are reused newest first, so a quiet pool lets its surplus
+    age past `max_idle` and be closed. Connections are also closed once
+    they are `max_lifetime` seconds old, when they are next returned or
+    taken. A connection idle for more than `check_after` seconds is passed
+    to the borrower's `check` before it is handed out, since the server or
+    a proxy may have dropped it meanwhile; one that fails is closed and the
+    next is tried.
+    """
+
+    def __init__(self, max_size=4, timeout=10.0, max_idle=300.0, max_lifetime=3600.0, check_after=30.0):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check_after = check_after
+        self._condition = threading.Condition()
+        self._idle = deque()  # (connection, returned at), newest last
+        self._opened_at = {}  # id(connection) -> opened at, for every open connection
+        self._reserved = 0  # connections being opened
+        self.stats = {'opened': 0, 'closed': 0, 'borrowed': 0, 'waited': 0, 'timeouts': 0, 'failed_checks': 0}
+
+    @property
+    def size(self):
+        return len(self._opened_at) + self._reserved
+
+    def _expired(self, connection, returned_at, now):
+        return (
+            now - returned_at > self.max_idle
+            or now - self._opened_at[id(connection)] > self.max_lifetime
+        )
+
+    def getconn(self, connect, check=None):
+        """
+        Borrows an idle connection, or opens one with `connect()` while the
+        pool is below max_size. Raises PoolTimeout when none frees up in time.
+        `check(connection)` returns whether a long-idle connection still works.
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            connection, idle_for = self._take(connect, deadline)
+            if check is None or idle_for <= self.check_after:
+                return connection
+            try:
+                alive = check(connection)
+            except Exception:
+                alive = False
+            if alive:
+                return connection
+            with self._condition:
+                self.stats['failed_checks'] += 1
+            self.putconn(connection, discard=True)
+
+    def _take(self, connect, deadline):
+        """Returns a connection and how long it was idle (0 for a new one)."""
+        stale = []
+        waited = False
+        try:
+            with self._condition:
+                while True:
+                    now = time.monotonic()
+                    while self._idle:
+                        connection, returned_at = self._idle.pop()
+                        if self._expired(connection, returned_at, now):
+                            stale.append(connection)
+                            del self._opened_at[id(connection)]
+                            continue
+                        self.stats['borrowed'] += 1
+                        return connection, now - returned_at
+                    if self.size < self.max_size:
+                        self._reserved += 1
+                        break
+                    if now >= deadline:
+                        self.stats['timeouts'] += 1
+                        raise PoolTimeout(
+                            f"No database connection free after {self.timeout:g}s (pool of {self.max_size})"
+                        )
+                    if not waited:
+                        self.stats['waited'] += 1
+                        waited = True
+                    self._condition.wait(deadline - now)
+        finally:
+            self._close_all(stale)
+
+        try:
+            connection = connect()
+        except BaseException:
+            with self._condition:
+                self._reserved -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._reserved -= 1
+            self._opened_at[id(connection)] = time.monotonic()
+            self.stats['opened'] += 1
+            self.stats['borrowed'] += 1
+        return connection, 0
+
+    def putconn(self, connection, discard=False):
+        """Returns a borrowed connection; `discard` closes it instead (e.g. it broke)."""
+        now = time.monotonic()
+        with self._condition:
+            opened_at = self._opened_at.get(id(connection))
+            if discard or opened_at is None or now - opened_at > self.max_lifetime:
+                self._opened_at.pop(id(connection), None)
+                stale = [connection]
+            else:
+                self._idle.append((connection, now))
+                stale = []
+            self._condition.notify()
+        self._close_all(stale)
+
+    def close(self):
+        """Closes the idle connections, e.g. before the database is dropped."""
+        with self._condition:
+            stale = [connection for connection, _ in self._idle]
+            self._idle.clear()
+            for connection in stale:
+                del self._opened_at[id(connection)]
+            self._condition.notify_all()
+        self._close_all(stale)
+
+    def _close_all(self, connections):
+        for connection in connections:
+            self.stats['closed'] += 1
+            try:
+                connection.close()
+            except Exception:
+                pass
@@ -0,0 +1,193 @@
+"""
+Recurring income and expenses.
+
+Occurrence dates are computed from the rule's anchor (`start_date`) rather
+than from the previous occurrence, so a monthly rule starting on the 31st
+falls on the last day of shorter months and returns to the 31st after.
+
+`materialize_due` writes every due occurrence across all users in one
+pass over the rules index: rules are read in chunks, the rows for a chunk
+are inserted with one bulk_create per model, and each rule's
+`next_occurrence` moves past the run date. The (rule, occurrence_date)
+unique constraint makes re-running it harmless. `project` expands the
+occurrences that have not been written yet, lazily and without writing,
+for forecasts.
+"""
+import calendar
+import heapq
+from bisect import bisect_right
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from .models import Expense, Income, RecurringRule, Savings, UserDataVersion
+from .signals import transactions_changed
+
+Occurrence = namedtuple('Occurrence', ['rule', 'date', 'amount'])
+
+
+def add_months(day, months):
+    year, month = divmod(day.month - 1 + months, 12)
+    year += day.year
+    month += 1
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def nth_occurrence(rule, n):
+    step = n * rule.interval
+    if rule.frequency == RecurringRule.DAILY:
+        return rule.start_date + timedelta(days=step)
+    if rule.frequency == RecurringRule.WEEKLY:
+        return rule.start_date + timedelta(weeks=step)
+    if rule.frequency == RecurringRule.MONTHLY:
+        return add_months(rule.start_date, step)
+    return add_months(rule.start_date, 12 * step)
+
+
+def first_index_on_or_after(rule, day):
+    """Index of the first occurrence on or after `day`."""
+    if day <= rule.start_date:
+        return 0
+    if rule.frequency in (RecurringRule.DAILY, RecurringRule.WEEKLY):
+        period = rule.interval * (7 if rule.frequency == RecurringRule.WEEKLY else 1)
+        return -(-(day - rule.start_date).days // period)
+    months = (day.year - rule.start_date.year) * 12 + day.month - rule.start_date.month
+    n = months // (rule.interval * (12 if rule.frequency == RecurringRule.YEARLY else 1))
+    while nth_occurrence(rule, n) < day:
+        n += 1
+    return n
+
+
+def first_occurrence(rule, on_or_after):
+    """The rule's first occurrence on or after the given date, or None past `end_date`."""
+    day = nth_occurrence(rule, first_index_on_or_after(rule, on_or_after))
+    if rule.end_date is not None and day > rule.end_date:
+        return None
+    return day
+
+
+def occurrences(rule, start, end):
+    """
+    Yields the rule's occurrences from `start` to `end` inclusive, each with
+    the amount in effect on its date. Uses `rule.amount_changes.all()`, so
+    prefetch it when expanding many rules.
+    """
+    if rule.end_date is not None:
+        end = min(end, rule.end_date)
+    changes = list(rule.amount_changes.all())
+    change_dates = [change.effective_date for change in changes]
+    n = first_index_on_or_after(rule, start)
+    while True:
+        day = nth_occurrence(rule, n)
+        if day > end:
+            return
+        position = bisect_right(change_dates, day)
+        yield Occurrence(rule, day, changes[position - 1].amount if position else rule.amount)
+        n += 1
+
+
+def project(user, start, end):
+    """
+    Yields, in date order, the occurrences of the user's active rules between
+    `start` and `end` that have not been materialized yet. Nothing is written.
+    """
+    rules = (
+        RecurringRule.objects.filter(user=user, is_active=True, next_occurrence__lte=end)
+        .prefetch_related('amount_changes')
+    )
+    return heapq.merge(
+        *(occurrences(rule, max(start, rule.next_occurrence), end) for rule in rules),
+        key=lambda occurrence: occurrence.date,
+    )
+
+
+def reschedule(rule, today=None):
+    """
+    Sets `next_occurrence` to the first occurrence after the last one
+    written, and not before `today` if given (e.g. when resuming a paused
+    rule). Call after changing a saved rule's schedule.
+    """
+    after = rule.start_date
+    if rule.pk is not None:
+        last = rule.model.objects.filter(recurring_rule=rule).aggregate(last=Max('occurrence_date'))['last']
+        if last is not None:
+            after = max(after, last + timedelta(days=1))
+    if today is not None:
+        after = max(after, today)
+    rule.next_occurrence = first_occurrence(rule, after)
+
+
+def due_rules(today, user=None):
+    rules = RecurringRule.objects.filter(is_active=True, next_occurrence__lte=today)
+    return rules if user is None else rules.filter(user=user)
+
+
+def materialize_due(today=None, chunk_size=500, user=None):
+    """
+    Writes the Income/Expense rows for every occurrence due on or before
+    `today` (default: the current date), optionally for one user's rules
+    only; returns counts of rules processed and rows created.
+    """
+    today = today or timezone.localdate()
+    summary = {'rules': 0, 'income': 0, 'expense': 0}
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            # Concurrent runs skip rules another run is already writing
+            chunk = list(
+                due_rules(today, user).filter(id__gt=last_id).order_by('id')
+                .select_related('user').prefetch_related('amount_changes')
+                .select_for_update(skip_locked=True, of=('self',))[:chunk_size]
+            )
+            if not chunk:
+                return summary
+            last_id = chunk[-1].id
+            _materialize_chunk(chunk, today, summary)
+
+
+def _materialize_chunk(rules, today, summary):
+    rows = {Income: [], Expense: []}
+    for rule in rules:
+        for occurrence in occurrences(rule, rule.next_occurrence, today):
+            rows[rule.model].append(rule.model(
+                name=rule.name, amount=occurrence.amount, date=occurrence.date, category_id=rule.category_id,
+                description=rule.description, user_id=rule.user_id,
+                recurring_rule=rule, occurrence_date=occurrence.date,
+            ))
+        rule.next_occurrence = first_occurrence(rule, today + timedelta(days=1))
+
+    users = {rule.user_id: rule.user for rule in rules}
+    # Settle missing balance rows first, so the deltas sent below are not
+    # double counted by a first-time recompute
+    settled = set(Savings.objects.filter(user_id__in=users).values_list('user_id', flat=True))
+    for user_id in users.keys() - settled:
+        Savings.for_user(users[user_id])
+
+    entries = defaultdict(list)
+    for model, batch in rows.items():
+        if not batch:
+            continue
+        # Rows already written for a rule whose schedule was moved back
+        existing = set(
+            model.objects.filter(recurring_rule_id__in={obj.recurring_rule_id for obj in batch}, occurrence_date__lte=today)
+            .values_list('recurring_rule_id', 'occurrence_date')
+        )
+        new_rows = [obj for obj in batch if (obj.recurring_rule_id, obj.occurrence_date) not in existing]
+        model.objects.bulk_create(new_rows, batch_size=500)
+        summary[model._meta.model_name] += len(new_rows)
+        sign = 1 if model is Income else -1
+        for obj in new_rows:
+            entries[model, obj.user_id].append((obj.pk, obj.date, sign * obj.amount))
+
+    RecurringRule.objects.bulk_update(rules, ['next_occurrence'])
+    summary['rules'] += len(rules)
+
+    for (model, user_id), changes in entries.items():
+        transactions_changed.send(
+            sender=model, user=users[user_id], delta=sum(delta for _, _, delta in changes), entries=changes,
+        )
+    # Rules are served with their next occurrence; rules that wrote nothing
+    # still changed
+    for user_id in users.keys() - {user_id for _, user_id in entries}:
+        UserDataVersion.bump(user_id)
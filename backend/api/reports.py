@@ -0,0 +1,73 @@
+from decimal import Decimal
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from .models import Income, Expense
+
+# Bucket functions used to group transactions by period
+PERIOD_TRUNCATORS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+TRANSACTION_MODELS = (
+    ('income', Income),
+    ('expense', Expense),
+)
+
+
+def summarize_transactions(user, period='month', start=None, end=None):
+    """
+    Returns per-period totals for a user's income and expenses, grouped by
+    category. All bucketing and summing happens in the database, so the
+    cost of the response does not depend on how many rows the user has.
+    """
+    return _build_summary({
+        tx_type: list(_summary_rows(model, user, period, start, end))
+        for tx_type, model in TRANSACTION_MODELS
+    })
+
+
+async def asummarize_transactions(user, period='month', start=None, end=None):
+    """`summarize_transactions` through the async ORM."""
+    rows_by_type = {}
+    for tx_type, model in TRANSACTION_MODELS:
+        rows_by_type[tx_type] = [row async for row in _summary_rows(model, user, period, start, end)]
+    return _build_summary(rows_by_type)
+
+
+def _summary_rows(model, user, period, start, end):
+    queryset = model.objects.filter(user=user)
+    if start:
+        queryset = queryset.filter(date__gte=start)
+    if end:
+        queryset = queryset.filter(date__lte=end)
+    return (
+        queryset
+        .annotate(bucket=PERIOD_TRUNCATORS[period]('date'))
+        .values('bucket', 'category', 'category__name')
+        .annotate(total=Sum('amount'), count=Count('id'))
+        .order_by('bucket', 'category')
+    )
+
+
+def _build_summary(rows_by_type):
+    results = []
+    totals = {}
+    for tx_type, rows in rows_by_type.items():
+        type_total = Decimal('0')
+        for row in rows:
+            type_total += row['total']
+            results.append({
+                'period': row['bucket'],
+                'type': tx_type,
+                'category': row['category'],
+                'category_name': row['category__name'],
+                'total': row['total'],
+                'count': row['count'],
+            })
+        totals[tx_type] = type_total
+
+    results.sort(key=lambda row: (row['period'], row['type']))
+    totals['net'] = totals['income'] - totals['expense']
+    return {'results': results, 'totals': totals}
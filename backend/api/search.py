@@ -0,0 +1,132 @@
+"""
+Full-text search over names and descriptions (`?q=`).
+
+The index lives in the database and is kept in step with the rows by the
+database itself, so bulk writes, queryset updates and deletes that skip
+model signals are covered too:
+
+* PostgreSQL: a stored generated `search_vector` tsvector column (name
+  weighted above description) with a GIN index;
+* SQLite: an external-content FTS5 table per model, `<table>_fts`, synced
+  by insert/update/delete triggers.
+
+Neither is expressible as a model field on this Django version, so
+`install_search_indexes` creates them after every migrate. It is
+idempotent, and also restores the SQLite triggers when a migration has
+rebuilt the table underneath them.
+
+Queries match every word as a prefix and are ranked by relevance (bm25 /
+ts_rank_cd); the matching ids come from the inverted index, so the cost
+follows the number of matches rather than the size of the table.
+"""
+import re
+from django.db import connections
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+from .models import Budget, Expense, Goal, Income
+
+SEARCHABLE_MODELS = (Income, Expense, Budget, Goal)
+
+SEARCH_QUERY_PARAM = 'q'
+MAX_SEARCH_TERMS = 8
+
+
+def search_terms(text):
+    """Lower-cased words of a query, at most MAX_SEARCH_TERMS of them."""
+    return re.findall(r'[^\W_]+', text.lower())[:MAX_SEARCH_TERMS]
+
+
+def search_active(request):
+    return bool(request.query_params.get(SEARCH_QUERY_PARAM, '').strip())
+
+
+def search(queryset, text):
+    """
+    Restricts `queryset` to rows whose name or description contains every
+    word of `text` (as a prefix), best matches first.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return queryset.none()
+    table = queryset.model._meta.db_table
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        matches = RawSQL(
+            f'SELECT "id" FROM "{table}" WHERE "search_vector" @@ to_tsquery(\'simple\', %s)', [tsquery]
+        )
+        rank = RawSQL(
+            f'ts_rank_cd("{table}"."search_vector", to_tsquery(\'simple\', %s))', [tsquery],
+            output_field=FloatField(),
+        )
+    elif vendor == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        matches = RawSQL(f'SELECT "rowid" FROM "{table}_fts" WHERE "{table}_fts" MATCH %s', [match])
+        # FTS5 ranks are negative bm25 scores, lower is better
+        rank = RawSQL(
+            f'SELECT -"rank" FROM "{table}_fts" WHERE "{table}_fts" MATCH %s AND "rowid" = "{table}"."id"',
+            [match], output_field=FloatField(),
+        )
+    else:
+        raise NotImplementedError(f'Full-text search is not supported on {vendor}')
+    return queryset.filter(id__in=matches).alias(search_rank=rank).order_by('-search_rank', '-id')
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """Applies `search` to list views given a non-empty `?q=`."""
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(SEARCH_QUERY_PARAM, '').strip()
+        if not text:
+            return queryset
+        return search(queryset, text)
+
+
+def _sqlite_statements(table):
+    fts = f'{table}_fts'
+    old_row = f"INSERT INTO \"{fts}\" (\"{fts}\", rowid, name, description) VALUES ('delete', old.id, old.name, old.description);"
+    new_row = f'INSERT INTO "{fts}" (rowid, name, description) VALUES (new.id, new.name, new.description);'
+    return {
+        fts: (
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS "{fts}" USING fts5('
+            f"name, description, content='{table}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        ),
+        f'{fts}_ai': f'CREATE TRIGGER IF NOT EXISTS "{fts}_ai" AFTER INSERT ON "{table}" BEGIN {new_row} END',
+        f'{fts}_ad': f'CREATE TRIGGER IF NOT EXISTS "{fts}_ad" AFTER DELETE ON "{table}" BEGIN {old_row} END',
+        f'{fts}_au': (
+            f'CREATE TRIGGER IF NOT EXISTS "{fts}_au" AFTER UPDATE OF name, description ON "{table}" '
+            f'BEGIN {old_row} {new_row} END'
+        ),
+    }
+
+
+def install_search_indexes(using='default'):
+    """Creates any missing search columns, tables, triggers and indexes."""
+    connection = connections[using]
+    tables = [model._meta.db_table for model in SEARCHABLE_MODELS]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            for table in tables:
+                cursor.execute(
+                    f'ALTER TABLE "{table}" ADD COLUMN IF NOT EXISTS "search_vector" tsvector GENERATED ALWAYS AS ('
+                    f"setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+                    f"setweight(to_tsvector('simple', coalesce(description, '')), 'B')) STORED"
+                )
+                cursor.execute(f'CREATE INDEX IF NOT EXISTS "{table}_search_idx" ON "{table}" USING GIN ("search_vector")')
+        elif connection.vendor == 'sqlite':
+            cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+            existing = {name for name, in cursor.fetchall()}
+            for table in tables:
+                statements = _sqlite_statements(table)
+                missing = [name for name in statements if name not in existing]
+                if not missing:
+                    continue
+                for name in missing:
+                    cursor.execute(statements[name])
+                fts = f'{table}_fts'
+                # Weight name matches above description matches
+                cursor.execute(f'INSERT INTO "{fts}" ("{fts}", rank) VALUES (\'rank\', \'bm25(10.0, 1.0)\')')
+                # Rows written while the triggers were missing are reindexed
+                cursor.execute(f'INSERT INTO "{fts}" ("{fts}") VALUES (\'rebuild\')')
@@ -1,14 +1,68 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth.models import update_last_login
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
-from .models import Category, Income, Expense, Savings, Budget, BudgetItem, Goal
+from datetime import timedelta
+from decimal import Decimal
+from .models import (
+    Category, Income, Expense, Savings, Budget, BudgetItem, Goal, Job, RecurringAmountChange, RecurringRule, Tombstone,
+)
+from django.db import transaction
+from django.utils import timezone
+from .batch import SUBREQUEST_HEADERS
+from .budgets import get_budget_actuals
+from .metrics import serializer_timer
+from .recurring import reschedule
 
 User = get_user_model()
 
 
+class TimedSerializerMixin:
+    """Counts representation time towards the request's serializer metrics."""
+
+    def to_representation(self, instance):
+        with serializer_timer():
+            return super().to_representation(instance)
+
+
+def select_field_names(request, names):
+    """
+    Applies the request's `?fields=` and `?exclude=` (comma-separated) to
+    `names`, keeping their order. Unknown names in `fields` are a
+    validation error (400), so a typo does not return empty rows; unknown
+    names in `exclude` are ignored.
+    """
+    if request is None or request.method not in ('GET', 'HEAD'):
+        return list(names)
+    params = request.query_params if hasattr(request, 'query_params') else request.GET
+    only = {name.strip() for name in params.get('fields', '').split(',') if name.strip()}
+    exclude = {name.strip() for name in params.get('exclude', '').split(',') if name.strip()}
+    unknown = only.difference(names)
+    if unknown:
+        raise serializers.ValidationError({'fields': [f"Unknown fields: {', '.join(sorted(unknown))}."]})
+    return [name for name in names if (not only or name in only) and name not in exclude]
+
+
+class DynamicFieldsMixin:
+    """
+    Sparse fieldsets for top-level serializers: `?fields=id,amount` or
+    `?exclude=description` on a GET drops the other fields from the output
+    (and from the work of producing it). Nested serializers are unaffected.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if 'context' not in kwargs:
+            return
+        selected = set(select_field_names(self.context.get('request'), self.fields))
+        for name in list(self.fields):
+            if name not in selected:
+                self.fields.pop(name)
+
+
 # ====================== AUTHENTICATION SERIALIZERS ======================
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True, validators=[validate_password])
@@ -52,7 +106,7 @@ class LoginSerializer(serializers.Serializer):
         return {"user": user}  # ✅ Return a User instance, NOT a dictionary
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(DynamicFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'email', 'username', 'full_name')
@@ -65,90 +119,436 @@ class CustomUserSerializer(serializers.ModelSerializer):
 
 
 # ====================== MODEL SERIALIZERS ======================
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(DynamicFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ['id', 'name', 'cat_type', 'user']
         read_only_fields = ['user']
 
 
-class IncomeSerializer(serializers.ModelSerializer):
+class UserCategoryField(serializers.PrimaryKeyRelatedField):
+    """
+    Category reference restricted to the requesting user's categories.
+
+    Bulk writes put a `category_cache` ({id: Category}) in the serializer
+    context so validating thousands of rows does not cost a query each.
+    """
+
+    def get_queryset(self):
+        request = self.context.get('request')
+        queryset = Category.objects.all()
+        if request is not None and request.user.is_authenticated:
+            queryset = queryset.filter(user=request.user)
+        return queryset
+
+    def to_internal_value(self, data):
+        cache = self.context.get('category_cache')
+        if cache is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in cache:
+            self.fail('does_not_exist', pk_value=data)
+        return cache[pk]
+
+
+class IncomeSerializer(DynamicFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer):
+    category = UserCategoryField(allow_null=True, required=False)
+
     class Meta:
         model = Income
         fields = ['id', 'name', 'amount', 'date', 'category', 'description', 'user']
         read_only_fields = ['user']
 
 
-class ExpenseSerializer(serializers.ModelSerializer):
+class ExpenseSerializer(DynamicFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer):
+    category = UserCategoryField(allow_null=True, required=False)
+
     class Meta:
         model = Expense
         fields = ['id', 'name', 'amount', 'date', 'category', 'description', 'user']
         read_only_fields = ['user']
 
 
-class SavingsSerializer(serializers.ModelSerializer):
+# Output field -> (values() column, formatter) for the fast list path
+TRANSACTION_VALUES_FIELDS = {
+    'id': ('id', None),
+    'name': ('name', None),
+    'amount': ('amount', lambda value: format(value, 'f')),
+    'date': ('date', lambda value: value.isoformat()),
+    'category': ('category_id', None),
+    'description': ('description', None),
+    'user': ('user_id', None),
+}
+
+
+def values_columns(fields, spec=TRANSACTION_VALUES_FIELDS, extra=()):
+    """values_list() columns for `values_rows`: the fields' columns in order, then `extra`."""
+    columns = [spec[name][0] for name in fields]
+    return columns + [column for column in extra if column not in columns]
+
+
+def values_rows(rows, fields, spec=TRANSACTION_VALUES_FIELDS):
+    """
+    Builds list rows straight from values_list() tuples selected with
+    `values_columns`, with the same output as the model serializer for
+    read-only listings but without model instances or per-field
+    serializer machinery.
+    """
+    names = tuple(fields)
+    formatters = [(name, spec[name][1]) for name in names if spec[name][1] is not None]
+    data = []
+    with serializer_timer():
+        for row in rows:
+            # zip() stops at the field columns, ignoring any trailing extras
+            item = dict(zip(names, row))
+            for name, format_value in formatters:
+                value = item[name]
+                if value is not None:
+                    item[name] = format_value(value)
+            data.append(item)
+    return data
+
+
+class SavingsSerializer(DynamicFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Savings
         fields = ['id', 'total', 'user']
         read_only_fields = ['user', 'total']
 
 
-class BudgetItemSerializer(serializers.ModelSerializer):
+class BudgetItemSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     remaining = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     progress = serializers.FloatField(read_only=True)
+    # Writable so nested updates can match items to existing rows
+    id = serializers.IntegerField(required=False)
+    expense_category = UserCategoryField(allow_null=True, required=False)
     
     class Meta:
         model = BudgetItem
-        fields = ['id', 'category', 'planned', 'actual', 'color', 'remaining', 'progress']
+        fields = ['id', 'category', 'expense_category', 'planned', 'actual', 'color', 'remaining', 'progress']
+        # Actual spend is derived from expenses on the server
+        read_only_fields = ['actual']
+
+    def to_representation(self, instance):
+        actuals = self.context.get('budget_actuals')
+        if actuals is not None:
+            instance.actual = actuals['items'].get(instance.id, Decimal('0.00'))
+        return super().to_representation(instance)
 
 
-class BudgetSerializer(serializers.ModelSerializer):
+class BudgetSerializer(DynamicFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer):
     items = BudgetItemSerializer(many=True, read_only=False, required=False)
     
     class Meta:
         model = Budget
         fields = ['id', 'name', 'target_amount', 'current_amount', 'start_date', 'end_date', 'description', 'period', 'user', 'items']
         read_only_fields = ['user']
+
+    def to_representation(self, instance):
+        actuals = self.get_budget_actuals()
+        if actuals is not None and instance.id in actuals['budgets']:
+            # Budgets with items track the sum of their items' spend
+            instance.current_amount = actuals['budgets'][instance.id]
+        return super().to_representation(instance)
+
+    def get_budget_actuals(self):
+        # Computed once per response and shared with the nested item serializers
+        if 'budget_actuals' not in self.context:
+            request = self.context.get('request')
+            if request is None or not request.user.is_authenticated:
+                return None
+            self.context['budget_actuals'] = get_budget_actuals(request.user, getattr(request, 'data_version', None))
+        return self.context['budget_actuals']
     
     def create(self, validated_data):
         items_data = validated_data.pop('items', [])
-        budget = Budget.objects.create(**validated_data)
-        
-        for item_data in items_data:
-            BudgetItem.objects.create(budget=budget, **item_data)
-            
+        with transaction.atomic():
+            budget = Budget.objects.create(**validated_data)
+            for item_data in items_data:
+                item_data.pop('id', None)
+            BudgetItem.objects.bulk_create([BudgetItem(budget=budget, **item_data) for item_data in items_data])
         return budget
     
     def update(self, instance, validated_data):
-        items_data = validated_data.pop('items', [])
-        
-        # Update budget fields
-        instance.name = validated_data.get('name', instance.name)
-        instance.target_amount = validated_data.get('target_amount', instance.target_amount)
-        instance.current_amount = validated_data.get('current_amount', instance.current_amount)
-        instance.start_date = validated_data.get('start_date', instance.start_date)
-        instance.end_date = validated_data.get('end_date', instance.end_date)
-        instance.description = validated_data.get('description', instance.description)
-        instance.period = validated_data.get('period', instance.period)
-        instance.save()
-        
-        # Handle budget items - if we receive a list of items, replace existing ones
-        if items_data:
-            # Delete existing items and create new ones
-            instance.items.all().delete()
-            for item_data in items_data:
-                BudgetItem.objects.create(budget=instance, **item_data)
-        
+        items_data = validated_data.pop('items', None)
+
+        with transaction.atomic():
+            # Update budget fields
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save()
+
+            # A list of items replaces the existing ones, so an empty list removes
+            # them all (e.g. deleting the last item); omit it to leave them alone
+            if items_data is not None:
+                self.sync_items(instance, items_data)
+
         return instance
 
+    def sync_items(self, budget, items_data):
+        """
+        Upserts budget items by diffing against what is stored: changed items
+        are updated in one statement, new ones inserted in one statement and
+        missing ones deleted in one statement.
+        """
+        existing = {item.id: item for item in budget.items.all()}
+        kept = set()
+        changed_fields = set()
+        to_update = []
+        to_create = []
 
-class GoalSerializer(serializers.ModelSerializer):
-    progress = serializers.SerializerMethodField()
+        for item_data in items_data:
+            item = existing.get(item_data.pop('id', None))
+            if item is None or item.id in kept:
+                # Unknown ids (e.g. generated by the client) become new rows
+                to_create.append(BudgetItem(budget=budget, **item_data))
+                continue
+
+            kept.add(item.id)
+            fields = []
+            for field, value in item_data.items():
+                if field == 'expense_category':
+                    # Compared by id so unchanged items don't load their category
+                    differs = item.expense_category_id != (value.pk if value else None)
+                else:
+                    differs = getattr(item, field) != value
+                if differs:
+                    fields.append(field)
+            for field in fields:
+                setattr(item, field, item_data[field])
+            if fields:
+                changed_fields.update(fields)
+                to_update.append(item)
+
+        removed = [item_id for item_id in existing if item_id not in kept]
+        if removed:
+            BudgetItem.objects.filter(id__in=removed).delete()
+            Tombstone.objects.bulk_create([
+                Tombstone(user_id=budget.user_id, model='budgetitem', object_id=item_id) for item_id in removed
+            ])
+        if to_update:
+            # bulk_update() does not apply auto_now
+            now = timezone.now()
+            for item in to_update:
+                item.updated_at = now
+            BudgetItem.objects.bulk_update(to_update, sorted(changed_fields | {'updated_at'}))
+        if to_create:
+            BudgetItem.objects.bulk_create(to_create)
+
+
+class GoalSerializer(DynamicFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer):
+    progress = serializers.FloatField(read_only=True)
 
     class Meta:
         model = Goal
         fields = ['id', 'name', 'target_amount', 'current_amount', 'deadline', 'description', 'progress', 'user']
         read_only_fields = ['user', 'progress']
 
-    def get_progress(self, obj):
-        return obj.progress
+
+class RecurringAmountChangeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RecurringAmountChange
+        fields = ['effective_date', 'amount']
+
+
+class RecurringRuleSerializer(DynamicFieldsMixin, TimedSerializerMixin, serializers.ModelSerializer):
+    category = UserCategoryField(allow_null=True, required=False)
+    amount_changes = RecurringAmountChangeSerializer(many=True, required=False)
+    interval = serializers.IntegerField(min_value=1, max_value=366, default=1)
+
+    # Changing any of these moves the next occurrence
+    SCHEDULE_FIELDS = ('frequency', 'interval', 'start_date', 'end_date', 'is_active')
+
+    class Meta:
+        model = RecurringRule
+        fields = [
+            'id', 'kind', 'name', 'amount', 'category', 'description', 'frequency', 'interval',
+            'start_date', 'end_date', 'next_occurrence', 'is_active', 'amount_changes', 'user',
+        ]
+        read_only_fields = ['user', 'next_occurrence']
+
+    def validate(self, attrs):
+        kind = attrs.get('kind', getattr(self.instance, 'kind', None))
+        if self.instance is not None and kind != self.instance.kind:
+            raise serializers.ValidationError({"kind": "The kind of an existing rule cannot change."})
+        category = attrs.get('category', getattr(self.instance, 'category', None))
+        if category is not None and category.cat_type != kind:
+            raise serializers.ValidationError({"category": "Category type does not match the rule's kind."})
+        start_date = attrs.get('start_date', getattr(self.instance, 'start_date', None))
+        end_date = attrs.get('end_date', getattr(self.instance, 'end_date', None))
+        if end_date is not None and start_date is not None and end_date < start_date:
+            raise serializers.ValidationError({"end_date": "End date must not be before the start date."})
+        changes = [change['effective_date'] for change in attrs.get('amount_changes', [])]
+        if len(changes) != len(set(changes)):
+            raise serializers.ValidationError({"amount_changes": "Effective dates must be unique."})
+        return attrs
+
+    def create(self, validated_data):
+        changes = validated_data.pop('amount_changes', [])
+        rule = RecurringRule(**validated_data)
+        reschedule(rule)
+        with transaction.atomic():
+            rule.save()
+            RecurringAmountChange.objects.bulk_create([RecurringAmountChange(rule=rule, **change) for change in changes])
+        return rule
+
+    def update(self, instance, validated_data):
+        changes = validated_data.pop('amount_changes', None)
+        resumed = validated_data.get('is_active') and not instance.is_active
+        schedule_changed = any(
+            field in validated_data and validated_data[field] != getattr(instance, field)
+            for field in self.SCHEDULE_FIELDS
+        )
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        with transaction.atomic():
+            if schedule_changed:
+                # A resumed rule picks up from today instead of backfilling the pause
+                reschedule(instance, timezone.localdate() if resumed else None)
+            instance.save()
+            # A list of changes replaces the existing ones; omit it to leave them alone
+            if changes is not None:
+                instance.amount_changes.all().delete()
+                RecurringAmountChange.objects.bulk_create([
+                    RecurringAmountChange(rule=instance, **change) for change in changes
+                ])
+        return instance
+
+
+class ProjectionQuerySerializer(serializers.Serializer):
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        start = attrs.setdefault('start', timezone.localdate())
+        end = attrs.setdefault('end', start + timedelta(days=90))
+        if end < start:
+            raise serializers.ValidationError({"end": "End must not be before start."})
+        if (end - start).days > 366 * 5:
+            raise serializers.ValidationError({"end": "Projections cover at most five years."})
+        return attrs
+
+
+class JobSerializer(serializers.ModelSerializer):
+    # Statement imports carry a file and are queued through the import endpoint
+    kind = serializers.ChoiceField(choices=['recalculate_savings', 'materialize_recurring'])
+
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'kind', 'status', 'attempts', 'max_attempts', 'run_after', 'result', 'error',
+            'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = [
+            'status', 'attempts', 'max_attempts', 'run_after', 'result', 'error',
+            'created_at', 'started_at', 'finished_at',
+        ]
+
+
+# ====================== REPORT SERIALIZERS ======================
+class BalanceQuerySerializer(serializers.Serializer):
+    date = serializers.DateField(required=False)
+
+
+class ForecastQuerySerializer(serializers.Serializer):
+    months = serializers.IntegerField(min_value=3, max_value=12, default=6)
+
+
+class DashboardSummaryQuerySerializer(serializers.Serializer):
+    period = serializers.ChoiceField(choices=['day', 'week', 'month'], default='month')
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        start = attrs.get('start')
+        end = attrs.get('end')
+        if start and end and start > end:
+            raise serializers.ValidationError({"end": "End date must be on or after start date."})
+        return attrs
+
+
+class SummaryRowSerializer(serializers.Serializer):
+    period = serializers.DateField()
+    type = serializers.CharField()
+    category = serializers.IntegerField(allow_null=True)
+    category_name = serializers.CharField(allow_null=True)
+    total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    count = serializers.IntegerField()
+
+
+class DashboardSummarySerializer(serializers.Serializer):
+    period = serializers.CharField()
+    start = serializers.DateField(allow_null=True)
+    end = serializers.DateField(allow_null=True)
+    results = SummaryRowSerializer(many=True)
+    totals = serializers.DictField(child=serializers.DecimalField(max_digits=14, decimal_places=2))
+
+
+# ====================== IMPORT SERIALIZERS ======================
+class StatementImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    file_type = serializers.ChoiceField(choices=['csv', 'ofx', 'qif'], required=False)
+    kind = serializers.ChoiceField(choices=['income', 'expense'], required=False)
+    date_format = serializers.CharField(required=False)
+    columns = serializers.JSONField(required=False, binary=True)
+
+    def validate_columns(self, value):
+        if not isinstance(value, dict) or not all(isinstance(v, str) for v in value.values()):
+            raise serializers.ValidationError("Expected an object mapping field names to column headers.")
+        return value
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    RECORD_TYPES = ['income', 'expense', 'budget', 'budget_item', 'goal']
+
+    output = serializers.ChoiceField(choices=['csv', 'ndjson'], default='csv')
+    gzip = serializers.BooleanField(default=False)
+    types = serializers.CharField(required=False)
+
+    def validate_types(self, value):
+        types = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = set(types) - set(self.RECORD_TYPES)
+        if unknown:
+            raise serializers.ValidationError(f"Unknown record types: {', '.join(sorted(unknown))}")
+        return types
+
+
+# ====================== SYNC SERIALIZERS ======================
+class SyncQuerySerializer(serializers.Serializer):
+    since = serializers.DateTimeField(required=False)
+
+
+# ====================== BATCH SERIALIZERS ======================
+class BatchItemSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'HEAD', 'OPTIONS'], default='GET')
+    path = serializers.CharField()
+    params = serializers.DictField(required=False)
+    headers = serializers.DictField(child=serializers.CharField(), required=False)
+    body = serializers.JSONField(required=False)
+
+    def validate_headers(self, value):
+        refused = sorted(name for name in value if name.lower() not in SUBREQUEST_HEADERS)
+        if refused:
+            raise serializers.ValidationError(f"Headers cannot be set on batched requests: {', '.join(refused)}.")
+        return value
+
+    def to_internal_value(self, data):
+        if isinstance(data, dict) and isinstance(data.get('method'), str):
+            data = {**data, 'method': data['method'].upper()}
+        return super().to_internal_value(data)
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = BatchItemSerializer(many=True, allow_empty=False)
+    parallel = serializers.BooleanField(default=False)
+
+    def validate_requests(self, value):
+        max_requests = getattr(settings, 'API_BATCH_MAX_REQUESTS', 20)
+        if len(value) > max_requests:
+            raise serializers.ValidationError(f"At most {max_requests} requests can be batched.")
+        return value
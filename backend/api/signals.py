@@ -0,0 +1,150 @@
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_delete, pre_save
+from django.utils import timezone
+from django.dispatch import Signal, receiver
+from .authentication import get_user_cache
+from .models import (
+    Budget, BudgetItem, Category, CustomUser, Expense, Goal, Income, LedgerEntry, RecurringRule, Savings, Tombstone,
+    UserDataVersion,
+)
+from .ledger import ledger_changes
+from .search import install_search_indexes
+
+# Sent whenever income or expense rows are written: by the per-row receivers
+# below for single-row saves and deletes, and by the callers of bulk
+# statements, which send no per-row signals (see models.TransactionRow).
+# Everything that tracks income and expenses listens here.
+# sender: the model class (Income or Expense)
+# user: the owner of the rows
+# delta: signed change to the user's balance (income positive, expense negative)
+# deleted: ids of removed rows, if any
+# entries: (object id, transaction date, signed delta) per changed row, for
+#   the ledger; they sum to `delta`
+transactions_changed = Signal()
+
+
+def deleted_with_user(origin):
+    """Whether a pre/post_delete `origin` is the deletion of the row's user."""
+    return (origin.model if isinstance(origin, QuerySet) else type(origin)) is CustomUser
+
+
+@receiver(pre_save, sender=Income)
+@receiver(pre_save, sender=Expense)
+def transaction_saving(sender, instance, raw=False, **kwargs):
+    # Rows built by hand rather than loaded (or loaded with date or amount
+    # deferred) need their stored values read before they are overwritten
+    if not raw and not instance._state.adding and getattr(instance, 'stored', None) is None:
+        instance.stored = sender.objects.filter(pk=instance.pk).values_list('date', 'amount').first()
+
+
+@receiver(post_save, sender=Income)
+@receiver(post_save, sender=Expense)
+def transaction_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    sign = sender.balance_sign
+    previous = None if created else getattr(instance, 'stored', None)
+    changes = [] if previous is None else [(instance.pk, previous[0], -sign * previous[1])]
+    instance.remember_stored()
+    date, amount = instance.stored
+    changes.append((instance.pk, date, sign * amount))
+    entries = ledger_changes(changes)
+    transactions_changed.send(
+        sender=sender, user=instance.user, delta=sum(delta for _, _, delta in entries), entries=entries,
+    )
+
+
+@receiver(post_delete, sender=Income)
+@receiver(post_delete, sender=Expense)
+def transaction_deleted(sender, instance, origin=None, **kwargs):
+    if deleted_with_user(origin):
+        # Deleted along with their user; there is nothing left to keep in step
+        return
+    date, amount = getattr(instance, 'stored', None) or instance.balance_values()
+    delta = -sender.balance_sign * amount
+    transactions_changed.send(
+        sender=sender, user=instance.user, delta=delta, deleted=[instance.pk], entries=[(instance.pk, date, delta)],
+    )
+
+
+@receiver(transactions_changed)
+def update_savings_balance(sender, user, delta, **kwargs):
+    Savings.apply_delta(user, delta)
+
+
+@receiver(transactions_changed)
+@receiver([post_save, post_delete], sender=Savings)
+@receiver([post_save, post_delete], sender=Budget)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Goal)
+@receiver([post_save, post_delete], sender=RecurringRule)
+def user_data_changed(sender, instance=None, user=None, origin=None, **kwargs):
+    if deleted_with_user(origin):
+        return
+    # Budget item writes always save their budget, which bumps the version
+    UserDataVersion.bump(user.pk if user is not None else instance.user_id)
+
+
+@receiver(transactions_changed)
+def record_transaction_tombstones(sender, user, deleted=(), **kwargs):
+    if deleted:
+        model = sender._meta.model_name
+        Tombstone.objects.bulk_create([Tombstone(user=user, model=model, object_id=pk) for pk in deleted])
+
+
+@receiver(transactions_changed)
+def record_ledger_entries(sender, user, entries=(), **kwargs):
+    model = sender._meta.model_name
+    LedgerEntry.objects.bulk_create([
+        LedgerEntry(user=user, model=model, object_id=object_id, date=date, delta=delta)
+        for object_id, date, delta in entries if delta
+    ], batch_size=500)
+
+
+@receiver(post_delete, sender=Budget)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Goal)
+def record_tombstone(sender, instance, origin=None, **kwargs):
+    if deleted_with_user(origin):
+        return
+    Tombstone.objects.create(user_id=instance.user_id, model=sender._meta.model_name, object_id=instance.pk)
+
+
+@receiver(pre_delete, sender=Budget)
+def budget_deleting(sender, instance, origin=None, **kwargs):
+    if deleted_with_user(origin):
+        return
+    # Items go with their budget in one cascade statement; record them first
+    Tombstone.objects.bulk_create([
+        Tombstone(user_id=instance.user_id, model='budgetitem', object_id=pk)
+        for pk in instance.items.values_list('id', flat=True)
+    ])
+
+
+@receiver(pre_delete, sender=Category)
+def category_deleting(sender, instance, origin=None, **kwargs):
+    if deleted_with_user(origin):
+        return
+    # SET_NULL is a plain UPDATE that skips auto_now; mark the rows changed
+    now = timezone.now()
+    Income.objects.filter(category=instance).update(updated_at=now)
+    Expense.objects.filter(category=instance).update(updated_at=now)
+    BudgetItem.objects.filter(expense_category=instance).update(updated_at=now)
+    Budget.objects.filter(items__expense_category=instance).update(updated_at=now)
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def user_changed(sender, instance, **kwargs):
+    # Deactivations and profile edits must not be served from the auth cache
+    user_cache = get_user_cache()
+    if user_cache is not None:
+        user_cache.invalidate(instance.pk)
+        transaction.on_commit(lambda: user_cache.invalidate(instance.pk))
+
+
+@receiver(post_migrate)
+def search_indexes_migrated(sender, using, **kwargs):
+    # The search columns and triggers sit outside the models; (re)create them
+    if sender.name == 'api':
+        install_search_indexes(using)
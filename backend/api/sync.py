@@ -0,0 +1,75 @@
+"""
+Delta sync for client-side replicas.
+
+Every synced model carries an `updated_at` stamp and deletions leave a
+`Tombstone`, so "what changed since T" is one indexed range scan per
+model. The returned watermark lags the server clock slightly: rows written
+by transactions that were still open when the previous sync ran are sent
+again rather than missed, and clients apply changes idempotently.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from .models import Budget, Category, Expense, Goal, Income, Tombstone
+from .serializers import BudgetSerializer, CategorySerializer, ExpenseSerializer, GoalSerializer, IncomeSerializer
+
+# response key -> (queryset builder, serializer, tombstone model name)
+SYNC_SOURCES = {
+    'categories': (lambda user: Category.objects.filter(user=user), CategorySerializer, 'category'),
+    'income': (lambda user: Income.objects.filter(user=user), IncomeSerializer, 'income'),
+    'expenses': (lambda user: Expense.objects.filter(user=user), ExpenseSerializer, 'expense'),
+    'budgets': (lambda user: Budget.objects.filter(user=user).prefetch_related('items'), BudgetSerializer, 'budget'),
+    'goals': (lambda user: Goal.objects.filter(user=user), GoalSerializer, 'goal'),
+}
+# Items are sent nested in their budget; only their deletions are listed
+DELETED_ONLY = {'budget_items': 'budgetitem'}
+
+
+def collect_changes(user, since=None, context=None):
+    """
+    Returns the user's records created or updated after `since`, the ids
+    deleted after it and the watermark for the next call. Without `since`,
+    or when it predates the tombstone retention window, every record is
+    returned with `reset` set so the client replaces its replica.
+    """
+    now = timezone.now()
+    options = getattr(settings, 'SYNC', {})
+    watermark = now - timedelta(seconds=options.get('WATERMARK_LAG', 5))
+    retention = timedelta(days=options.get('TOMBSTONE_RETENTION_DAYS', 90))
+    reset = since is None or since < now - retention
+
+    changes = {}
+    for key, (build_queryset, serializer_class, _) in SYNC_SOURCES.items():
+        queryset = build_queryset(user)
+        if not reset:
+            queryset = queryset.filter(updated_at__gt=since)
+        changes[key] = queryset.order_by('id')
+
+    deleted = {key: [] for key in [*SYNC_SOURCES, *DELETED_ONLY]}
+    if not reset:
+        keys = {model: key for key, (_, _, model) in SYNC_SOURCES.items()}
+        keys.update({model: key for key, model in DELETED_ONLY.items()})
+        rows = Tombstone.objects.filter(user=user, deleted_at__gt=since).values_list('model', 'object_id')
+        for model, object_id in rows.order_by('id'):
+            deleted[keys[model]].append(object_id)
+
+        # Budget progress is derived from expenses, so expense changes resend budgets
+        if deleted['expenses'] or changes['expenses'].exists():
+            changes['budgets'] = SYNC_SOURCES['budgets'][0](user).order_by('id')
+
+    return {
+        'watermark': watermark,
+        'reset': reset,
+        'changes': {
+            key: SYNC_SOURCES[key][1](queryset, many=True, context=context or {}).data
+            for key, queryset in changes.items()
+        },
+        'deleted': deleted,
+    }
+
+
+def prune_tombstones():
+    """Deletes tombstones older than the retention window; returns the count."""
+    retention = timedelta(days=getattr(settings, 'SYNC', {}).get('TOMBSTONE_RETENTION_DAYS', 90))
+    count, _ = Tombstone.objects.filter(deleted_at__lt=timezone.now() - retention).delete()
+    return count
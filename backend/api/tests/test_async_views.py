@@ -0,0 +1,109 @@
+from datetime import date
+from decimal import Decimal
+from django.test import TestCase, override_settings
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.contrib.auth import get_user_model
+from api.async_views import AsyncDashboardSummaryView, AsyncExpenseViewSet, AsyncIncomeViewSet, AsyncUserAPIView
+from api.models import Category, Expense, Income, Savings
+from api.views import BatchView
+
+User = get_user_model()
+
+# The API as served with ASYNC_VIEWS on
+router = DefaultRouter()
+router.register(r'income', AsyncIncomeViewSet, basename='income')
+router.register(r'expenses', AsyncExpenseViewSet, basename='expense')
+urlpatterns = [
+    path('api/', include(router.urls)),
+    path('api/user/', AsyncUserAPIView.as_view(), name='user'),
+    path('api/dashboard/summary/', AsyncDashboardSummaryView.as_view(), name='dashboard-summary'),
+    path('api/batch/', BatchView.as_view(), name='batch'),
+]
+
+
+@override_settings(API_RESPONSE_CACHE_TIMEOUT=0)
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='async@example.com', username='async', full_name='Async', password='securepassword123'
+        )
+        self.other = User.objects.create_user(
+            email='asyncother@example.com', username='asyncother', full_name='Other', password='securepassword123'
+        )
+        food = Category.objects.create(name='Food', cat_type=Category.EXPENSE, user=self.user)
+        Income.objects.bulk_create([
+            Income(name=f'Pay {i}', amount=Decimal('100.00'), date=date(2025, 1, 1 + i), user=self.user) for i in range(12)
+        ])
+        Expense.objects.bulk_create([
+            Expense(name=f'Lunch {i}', description='cafe', amount=Decimal('9.50'), date=date(2025, 1 + i % 3, 5),
+                    category=food, user=self.user)
+            for i in range(7)
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.token = RefreshToken.for_user(self.user).access_token
+
+    def assert_same_responses(self, url, params=None):
+        sync_response = self.client.get(url, params)
+        with override_settings(ROOT_URLCONF=__name__):
+            async_response = self.client.get(url, params)
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(async_response.json(), sync_response.json())
+        self.assertEqual(async_response.get('ETag'), sync_response.get('ETag'))
+        return async_response
+
+    def test_reads_match_sync_views(self):
+        income_id = Income.objects.filter(user=self.user).values_list('id', flat=True).first()
+        for url, params in [
+            ('/api/income/', None),
+            ('/api/income/', {'page': 2}),
+            ('/api/income/', {'page': 2, 'count': 'false', 'fields': 'id,amount'}),
+            ('/api/income/', {'page': 9}),
+            ('/api/income/', {'fields': 'id,amout'}),
+            ('/api/income/', {'pagination': 'cursor', 'page_size': 5}),
+            ('/api/expenses/', {'q': 'cafe'}),
+            (f'/api/income/{income_id}/', None),
+            ('/api/income/999999/', None),
+            ('/api/user/', None),
+            ('/api/dashboard/summary/', {'period': 'month'}),
+            ('/api/dashboard/summary/', {'period': 'year'}),
+        ]:
+            with self.subTest(url=url, params=params):
+                self.assert_same_responses(url, params)
+
+        cursor = self.assert_same_responses('/api/income/', {'pagination': 'cursor', 'page_size': 5}).json()['next']
+        self.assert_same_responses(cursor)
+
+    @override_settings(ROOT_URLCONF=__name__)
+    def test_writes_and_permissions(self):
+        response = self.client.post('/api/income/', {'name': 'Bonus', 'amount': '50.00', 'date': '2025-03-01'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Savings.objects.get(user=self.user).total, Decimal('1183.50'))
+
+        etag = self.client.get('/api/income/')['ETag']
+        self.assertEqual(self.client.get('/api/income/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Batches dispatch to the async views from their sync thread
+        batch = self.client.post('/api/batch/', {'requests': [
+            {'method': 'GET', 'path': '/api/income/', 'params': {'page_size': 2}},
+            {'method': 'GET', 'path': '/api/expenses/'},
+        ]}, format='json')
+        self.assertEqual([result['status'] for result in batch.data['responses']], [200, 200])
+
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.client.get(f"/api/income/{response.data['id']}/").status_code, 404)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get('/api/income/').status_code, 401)
+
+    @override_settings(ROOT_URLCONF=__name__, API_SERVER_TIMING=True)
+    async def test_served_through_async_handler(self):
+        response = await self.async_client.get(
+            '/api/income/', {'page_size': 3}, headers={'Authorization': f'Bearer {self.token}'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 3)
+        # Queries made on the request's sync thread are still counted
+        self.assertRegex(response['Server-Timing'], r'desc="[1-9]\d* queries"')
@@ -0,0 +1,93 @@
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from django.contrib.auth import get_user_model
+from api.models import Goal, Income
+from api.throttling import UserCounterThrottle
+
+User = get_user_model()
+
+class BatchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='batch@example.com', username='batch', full_name='Batch', password='securepassword123'
+        )
+        Income.objects.create(name='Pay', amount='100.00', date='2025-01-01', user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def batch(self, requests, **extra):
+        return self.client.post('/api/batch/', {'requests': requests, **extra}, format='json')
+
+    def test_dashboard_reads_in_one_request(self):
+        response = self.batch([
+            {'path': '/api/income/'},
+            {'path': '/api/expenses/'},
+            {'path': '/api/goals/', 'params': {'page': 1}},
+            {'path': '/api/savings/'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        statuses = [item['status'] for item in response.data['responses']]
+        self.assertEqual(statuses, [200, 200, 200, 200])
+        self.assertEqual(response.data['responses'][0]['body']['results'][0]['name'], 'Pay')
+        self.assertIn('ETag', response.data['responses'][0]['headers'])
+
+    def test_writes_run_in_order_as_the_outer_user(self):
+        response = self.batch([
+            {'method': 'post', 'path': '/api/goals/', 'body': {'name': 'Car', 'target_amount': '100.00', 'deadline': '2030-01-01'}},
+            {'path': '/api/goals/'},
+        ])
+        created, listed = response.data['responses']
+        self.assertEqual(created['status'], 201)
+        self.assertEqual(listed['body']['results'][0]['name'], 'Car')
+        self.assertEqual(Goal.objects.get().user, self.user)
+
+    def test_sub_request_conditional_get(self):
+        etag = self.batch([{'path': '/api/income/'}]).data['responses'][0]['headers']['ETag']
+        response = self.batch([{'path': '/api/income/', 'headers': {'If-None-Match': etag}}])
+        self.assertEqual(response.data['responses'][0]['status'], 304)
+
+    def test_rejects_nested_and_non_api_paths(self):
+        response = self.batch([{'path': '/api/batch/'}, {'path': '/admin/'}, {'path': '/api/nope/'}])
+        self.assertEqual([item['status'] for item in response.data['responses']], [404, 404, 404])
+
+    def test_only_resources_can_be_batched(self):
+        response = self.batch([
+            {'method': 'POST', 'path': '/api/login/', 'body': {'email': 'batch@example.com', 'password': 'guess'}},
+            {'method': 'POST', 'path': '/api/token/refresh/', 'body': {'refresh': 'x'}},
+            {'path': '/api/user/'},
+        ])
+        self.assertEqual([item['status'] for item in response.data['responses']], [404, 404, 404])
+
+        self.assertEqual(self.batch([{'path': '/api/income/', 'headers': {'Host': 'evil.example.com'}}]).status_code, 400)
+
+    @mock.patch.object(UserCounterThrottle, 'THROTTLE_RATES', {'anon': '100/day', 'user': '3/day'})
+    def test_sub_requests_are_throttled(self):
+        # Throttle counters live in the default cache
+        cache.clear()
+        response = self.batch([{'path': '/api/income/'}] * 3)
+        # The batch itself is the first request of the day
+        self.assertEqual([item['status'] for item in response.data['responses']], [200, 200, 429])
+
+    def test_size_limit_and_authentication(self):
+        self.assertEqual(self.batch([{'path': '/api/income/'}] * 21).status_code, 400)
+        self.client.credentials()
+        self.assertEqual(self.batch([{'path': '/api/income/'}]).status_code, 401)
+
+
+class ParallelBatchTests(TransactionTestCase):
+    def test_parallel_reads(self):
+        user = User.objects.create_user(
+            email='parallel@example.com', username='parallel', full_name='Parallel', password='securepassword123'
+        )
+        Income.objects.create(name='Pay', amount='100.00', date='2025-01-01', user=user)
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post('/api/batch/', {
+            'requests': [{'path': '/api/income/'}, {'path': '/api/goals/'}, {'path': '/api/categories/'}],
+            'parallel': True,
+        }, format='json')
+        self.assertEqual([item['status'] for item in response.data['responses']], [200, 200, 200])
+        self.assertEqual(response.data['responses'][0]['body']['results'][0]['name'], 'Pay')
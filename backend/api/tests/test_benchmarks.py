@@ -0,0 +1,56 @@
+from datetime import date
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from api.benchmarks import SCENARIOS, compare_to_baseline, run_scenario
+from api.ledger import balance_as_of
+from api.models import Budget, Expense, LedgerEntry, Savings, UserDataVersion
+
+User = get_user_model()
+
+class BenchmarkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            'seed_demo_data', '--expenses', '300', '--income', '60', '--budgets', '3', '--items', '4',
+            '--days', '90', stdout=StringIO(),
+        )
+        cls.user = User.objects.get(email='bench-0@example.com')
+
+    def test_seed_creates_history(self):
+        self.assertEqual(Expense.objects.filter(user=self.user).count(), 300)
+        self.assertEqual(Budget.objects.filter(user=self.user).count(), 3)
+        # The bulk inserts are reported like any other write
+        savings = Savings.objects.get(user=self.user)
+        total = savings.total
+        savings.calculate_total()
+        self.assertEqual(savings.total, total)
+        self.assertEqual(LedgerEntry.objects.filter(user=self.user).count(), 360)
+        self.assertEqual(balance_as_of(self.user, date.today()), total)
+        self.assertTrue(UserDataVersion.objects.filter(user=self.user).exists())
+        with self.assertRaises(CommandError):
+            call_command('seed_demo_data', stdout=StringIO())
+
+    def test_scenarios_stay_within_query_budgets(self):
+        for name, scenario_class in SCENARIOS.items():
+            if name == 'login':
+                # Password hashing dominates and adds nothing to the query check
+                continue
+            with self.subTest(name):
+                result = run_scenario(scenario_class, self.user, 'bench-password', iterations=2, warmup=1)
+                self.assertLessEqual(result['queries'], result['max_queries'])
+
+    def test_iterations_are_rolled_back(self):
+        expenses = Expense.objects.filter(user=self.user).count()
+        run_scenario(SCENARIOS['create_expense'], self.user, 'bench-password', iterations=3, warmup=0)
+        self.assertEqual(Expense.objects.filter(user=self.user).count(), expenses)
+
+    def test_compare_to_baseline(self):
+        baseline = {'scenarios': {'list_income': {'p50_ms': 10.0, 'queries': 3}}}
+        self.assertEqual(compare_to_baseline({'list_income': {'p50_ms': 12.0, 'queries': 3}}, baseline), [])
+        regressions = compare_to_baseline({'list_income': {'p50_ms': 13.0, 'queries': 4}}, baseline)
+        self.assertEqual(len(regressions), 2)
+        # Scenarios missing from the baseline are not compared
+        self.assertEqual(compare_to_baseline({'login': {'p50_ms': 1.0, 'queries': 9}}, baseline), [])
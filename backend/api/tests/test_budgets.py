@@ -0,0 +1,129 @@
+from datetime import date
+from decimal import Decimal
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from api.models import Category, Expense, Budget, BudgetItem, UserDataVersion
+
+User = get_user_model()
+
+class BudgetActualsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='budgets@example.com', username='budgets', full_name='Budgets', password='securepassword123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.food = Category.objects.create(name='Food', cat_type=Category.EXPENSE, user=self.user)
+        self.fun = Category.objects.create(name='Fun', cat_type=Category.EXPENSE, user=self.user)
+        self.budget = Budget.objects.create(
+            name='January', target_amount='500.00', start_date=date(2025, 1, 1), end_date=date(2025, 1, 31), user=self.user
+        )
+        self.by_name = BudgetItem.objects.create(budget=self.budget, category='food', planned='200.00')
+        self.linked = BudgetItem.objects.create(budget=self.budget, category='Going out', expense_category=self.fun, planned='100.00')
+
+        Expense.objects.create(name='Groceries', amount='30.00', date=date(2025, 1, 5), category=self.food, user=self.user)
+        Expense.objects.create(name='Cinema', amount='12.50', date=date(2025, 1, 6), category=self.fun, user=self.user)
+        # Outside the budget window
+        Expense.objects.create(name='Groceries', amount='99.00', date=date(2025, 2, 1), category=self.food, user=self.user)
+
+    def items(self, response):
+        return {item['id']: item for item in response.data['items']}
+
+    def test_actuals_are_derived_from_expenses(self):
+        response = self.client.get(f'/api/budgets/{self.budget.id}/')
+        items = self.items(response)
+        self.assertEqual(items[self.by_name.id]['actual'], '30.00')
+        self.assertEqual(items[self.by_name.id]['remaining'], '170.00')
+        self.assertEqual(items[self.linked.id]['actual'], '12.50')
+        self.assertEqual(response.data['current_amount'], '42.50')
+
+    def test_expense_writes_invalidate_cache(self):
+        self.client.get(f'/api/budgets/{self.budget.id}/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/expenses/', {'name': 'Lunch', 'amount': '7.50', 'date': '2025-01-10', 'category': self.food.id})
+        response = self.client.get(f'/api/budgets/{self.budget.id}/')
+        self.assertEqual(self.items(response)[self.by_name.id]['actual'], '37.50')
+
+    def test_writes_from_another_process_are_seen(self):
+        self.client.get(f'/api/budgets/{self.budget.id}/')
+        # As from the job worker: nothing touches this process's cache
+        Expense.objects.create(name='Market', amount='5.00', date=date(2025, 1, 11), category=self.food, user=self.user)
+        response = self.client.get(f'/api/budgets/{self.budget.id}/')
+        self.assertEqual(self.items(response)[self.by_name.id]['actual'], '35.00')
+
+    def test_items_are_replaced_only_when_sent(self):
+        url = f'/api/budgets/{self.budget.id}/'
+        response = self.client.patch(url, {'name': 'Jan'}, format='json')
+        self.assertEqual(len(response.data['items']), 2)
+
+        # An empty list is a replacement like any other, not "no change"
+        response = self.client.patch(url, {'items': []}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['items'], [])
+        self.assertFalse(BudgetItem.objects.filter(budget=self.budget).exists())
+
+    def test_client_cannot_overwrite_actual(self):
+        self.client.patch(
+            f'/api/budgets/{self.budget.id}/',
+            {'items': [{'id': self.by_name.id, 'category': 'food', 'planned': '200.00', 'actual': '999.00'}]},
+            format='json'
+        )
+        response = self.client.get(f'/api/budgets/{self.budget.id}/')
+        self.assertEqual(response.data['items'][0]['actual'], '30.00')
+        self.assertEqual(BudgetItem.objects.get(budget=self.budget).actual, Decimal('0.00'))
+
+
+class BudgetQueryCountTests(TestCase):
+    """Listing and updating budgets must not cost a query per budget or item."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='manybudgets@example.com', username='manybudgets', full_name='Many', password='securepassword123'
+        )
+        budgets = Budget.objects.bulk_create([
+            Budget(name=f'Budget {i}', target_amount='1000.00', start_date=date(2025, 1, 1), end_date=date(2025, 12, 31), user=cls.user)
+            for i in range(100)
+        ])
+        BudgetItem.objects.bulk_create([
+            BudgetItem(budget=budget, category=f'Category {j}', planned='50.00')
+            for budget in budgets
+            for j in range(20)
+        ])
+        # As for any user who has written data before
+        UserDataVersion.bump(cls.user.pk)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_list_query_count(self):
+        # Data version, COUNT, budgets, prefetched items, derived actuals
+        with self.assertNumQueries(5):
+            response = self.client.get('/api/budgets/', {'page_size': 100})
+        self.assertEqual(len(response.data['results']), 100)
+        self.assertEqual(sum(len(budget['items']) for budget in response.data['results']), 2000)
+
+    def test_update_query_count(self):
+        for budget in Budget.objects.filter(user=self.user).prefetch_related('items')[:5]:
+            items = [
+                {'id': item.id, 'category': item.category, 'planned': '75.00'}
+                for item in budget.items.all()
+            ]
+            # Drop one item, change the rest and add a client-numbered one
+            items = items[1:] + [{'id': 10 ** 6, 'category': 'New', 'planned': '10.00'}]
+            # Budget and items, savepoint, budget UPDATE, data version bump, item DELETE,
+            # item tombstones, UPDATE and INSERT, release, then the new data version,
+            # actuals and the refreshed items for the response
+            with self.assertNumQueries(13), self.captureOnCommitCallbacks(execute=True):
+                response = self.client.put(f'/api/budgets/{budget.id}/', {
+                    'name': budget.name, 'target_amount': '1000.00', 'start_date': '2025-01-01',
+                    'end_date': '2025-12-31', 'items': items,
+                }, format='json')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data['items']), 20)
+            self.assertEqual({item['planned'] for item in response.data['items']}, {'75.00', '10.00'})
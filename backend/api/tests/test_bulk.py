@@ -0,0 +1,73 @@
+from decimal import Decimal
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from api.models import Category, Expense, LedgerEntry, Savings
+
+User = get_user_model()
+
+class BulkTransactionTests(TestCase):
+    url = '/api/expenses/bulk/'
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='bulk@example.com', username='bulk', full_name='Bulk', password='securepassword123'
+        )
+        self.other = User.objects.create_user(
+            email='notmine@example.com', username='notmine', full_name='Not Mine', password='securepassword123'
+        )
+        self.food = Category.objects.create(name='Food', cat_type=Category.EXPENSE, user=self.user)
+        self.foreign = Category.objects.create(name='Food', cat_type=Category.EXPENSE, user=self.other)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def rows(self, count):
+        return [
+            {'name': f'Row {i}', 'amount': '2.50', 'date': '2025-02-01', 'category': self.food.id}
+            for i in range(count)
+        ]
+
+    def test_bulk_create_in_constant_queries(self):
+        Savings.for_user(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, self.rows(1000), format='json')
+        # One category lookup, batched INSERTs of the rows and their ledger
+        # entries and one savings UPDATE; the INSERT batches are capped by
+        # the backend's bound-parameter limit
+        inserts = 0
+        for model in (Expense, LedgerEntry):
+            batch_size = min(500, connection.ops.bulk_batch_size([f for f in model._meta.concrete_fields if not f.primary_key], []))
+            statements = [query for query in queries if query['sql'].startswith(f'INSERT INTO "{model._meta.db_table}"')]
+            self.assertEqual(len(statements), -(-1000 // batch_size))
+            inserts += len(statements)
+        self.assertLess(len(queries) - inserts, 6)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 1000)
+        self.assertEqual(Expense.objects.filter(user=self.user).count(), 1000)
+        self.assertEqual(Savings.objects.get(user=self.user).total, Decimal('-2500.00'))
+
+    def test_bulk_create_reports_item_errors(self):
+        rows = self.rows(3)
+        rows[1]['amount'] = 'abc'
+        rows[2]['category'] = self.foreign.id
+        response = self.client.post(self.url, rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2])
+        self.assertFalse(Expense.objects.exists())
+
+    def test_bulk_update_and_delete(self):
+        created = self.client.post(self.url, self.rows(3), format='json').data
+        updates = [{'id': row['id'], 'amount': '5.00'} for row in created[:2]]
+        response = self.client.patch(self.url, updates, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Savings.objects.get(user=self.user).total, Decimal('-12.50'))
+
+        response = self.client.patch(self.url, [{'id': 999999, 'amount': '1.00'}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.delete(self.url, {'ids': [row['id'] for row in created]}, format='json')
+        self.assertEqual(response.data['deleted'], 3)
+        self.assertEqual(Savings.objects.get(user=self.user).total, Decimal('0.00'))
@@ -0,0 +1,53 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from api.models import Goal, Income
+
+User = get_user_model()
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='etag@example.com', username='etag', full_name='ETag', password='securepassword123'
+        )
+        Income.objects.create(name='Pay', amount='100.00', user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_unchanged_list_is_not_modified(self):
+        response = self.client.get('/api/income/')
+        etag = response['ETag']
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+
+        # Only the data version lookup runs
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/income/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_writes_change_the_etag(self):
+        etag = self.client.get('/api/income/')['ETag']
+        self.client.post('/api/income/bulk/', [{'name': 'Bonus', 'amount': '5.00', 'date': '2025-01-02'}], format='json')
+        response = self.client.get('/api/income/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_other_resources_and_urls_have_their_own_etag(self):
+        income = self.client.get('/api/income/')['ETag']
+        self.assertNotEqual(self.client.get('/api/goals/')['ETag'], income)
+        self.assertNotEqual(self.client.get('/api/income/', {'page': 1})['ETag'], income)
+
+    def test_serialized_page_is_cached_per_version(self):
+        self.client.get('/api/goals/')
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/api/goals/').data['count'], 0)
+        Goal.objects.create(name='Car', target_amount='1000.00', deadline='2030-01-01', user=self.user)
+        self.assertEqual(self.client.get('/api/goals/').data['count'], 1)
+
+    def test_missing_object_is_not_tagged(self):
+        response = self.client.get('/api/goals/999/')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
@@ -0,0 +1,185 @@
+import json
+import threading
+import time
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgresDatabaseWrapper
+from django.test import SimpleTestCase, TestCase, override_settings
+from api.checks import database_connection_issues
+from api.connection_bench import mode_database, run_mode
+from api.postgresql_pool.base import TRANSACTION_IN_ERROR, TRANSACTION_UNKNOWN, DatabaseWrapper, close_pools
+from api.postgresql_pool.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.info = mock.Mock(transaction_status=0)
+        self.rolled_back = False
+        self.queries = 0
+        self.dropped = False  # by the server, unknown to the client until used
+
+    def cursor(self):
+        if self.dropped:
+            raise PostgresDatabaseWrapper.Database.OperationalError('server closed the connection unexpectedly')
+        self.queries += 1
+        return mock.MagicMock()
+
+    def rollback(self):
+        self.rolled_back = True
+        self.info.transaction_status = 0
+
+    def close(self):
+        self.closed = 1
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def test_reuses_connections_up_to_max_size(self):
+        pool = ConnectionPool(max_size=2, timeout=0.05)
+        first, second = pool.getconn(FakeConnection), pool.getconn(FakeConnection)
+        with self.assertRaises(PoolTimeout):
+            pool.getconn(FakeConnection)
+
+        pool.putconn(first)
+        pool.putconn(second)
+        # Newest first, so the older connection can go idle
+        self.assertIs(pool.getconn(FakeConnection), second)
+        self.assertEqual(pool.stats['opened'], 2)
+        self.assertEqual(pool.stats['timeouts'], 1)
+
+    def test_waiter_gets_returned_connection(self):
+        pool = ConnectionPool(max_size=1, timeout=5)
+        connection = pool.getconn(FakeConnection)
+        threading.Timer(0.05, pool.putconn, [connection]).start()
+        self.assertIs(pool.getconn(FakeConnection), connection)
+        self.assertEqual(pool.stats['waited'], 1)
+
+    def test_discarded_and_expired_connections_are_closed(self):
+        pool = ConnectionPool(max_size=1, max_idle=0.01)
+        broken = pool.getconn(FakeConnection)
+        pool.putconn(broken, discard=True)
+        self.assertTrue(broken.closed)
+
+        idle = pool.getconn(FakeConnection)
+        pool.putconn(idle)
+        time.sleep(0.02)
+        self.assertIsNot(pool.getconn(FakeConnection), idle)
+        self.assertTrue(idle.closed)
+        self.assertEqual(pool.size, 1)
+
+    def test_long_idle_connections_are_checked(self):
+        pool = ConnectionPool(max_size=1, check_after=0.01)
+        connection = pool.getconn(FakeConnection)
+        pool.putconn(connection)
+        check = mock.Mock(return_value=True)
+        self.assertIs(pool.getconn(FakeConnection, check=check), connection)
+        check.assert_not_called()
+
+        pool.putconn(connection)
+        time.sleep(0.02)
+        check.return_value = False
+        replacement = pool.getconn(FakeConnection, check=check)
+        check.assert_called_once_with(connection)
+        self.assertIsNot(replacement, connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.stats['failed_checks'], 1)
+
+    def test_failed_connect_frees_its_slot(self):
+        pool = ConnectionPool(max_size=1, timeout=0)
+        with self.assertRaises(ConnectionError):
+            pool.getconn(mock.Mock(side_effect=ConnectionError))
+        self.assertIsInstance(pool.getconn(FakeConnection), FakeConnection)
+
+
+@override_settings(DB_POOL={'MAX_SIZE': 1, 'TIMEOUT': 0, 'CHECK_AFTER': 0})
+class PooledBackendTests(SimpleTestCase):
+    def setUp(self):
+        settings_dict = connections.configure_settings({
+            DEFAULT_DB_ALIAS: {'ENGINE': 'django.db.backends.sqlite3'},
+            'pooled': {'ENGINE': 'api.postgresql_pool', 'NAME': 'financeflow'},
+        })['pooled']
+        self.wrappers = [DatabaseWrapper(settings_dict, 'pooled'), DatabaseWrapper(settings_dict, 'pooled')]
+        patcher = mock.patch.object(PostgresDatabaseWrapper, 'get_new_connection', side_effect=lambda params: FakeConnection())
+        self.connect = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(close_pools, 'pooled')
+        for wrapper in self.wrappers:
+            self.addCleanup(wrapper.close)
+
+    def borrow(self, wrapper):
+        wrapper.connection = wrapper.get_new_connection({'dbname': 'financeflow'})
+        return wrapper.connection
+
+    def test_close_returns_connection_for_other_threads(self):
+        first, second = self.wrappers
+        connection = self.borrow(first)
+        with self.assertRaises(second.Database.OperationalError):
+            self.borrow(second)
+
+        connection.info.transaction_status = TRANSACTION_IN_ERROR
+        first.close()
+        self.assertTrue(connection.rolled_back)
+        self.assertIs(self.borrow(second), connection)
+        self.assertEqual(self.connect.call_count, 1)
+
+    def test_broken_connection_is_discarded(self):
+        first, second = self.wrappers
+        connection = self.borrow(first)
+        connection.info.transaction_status = TRANSACTION_UNKNOWN
+        first.close()
+        self.assertTrue(connection.closed)
+        self.assertIsNot(self.borrow(second), connection)
+
+    def test_dropped_idle_connection_is_replaced(self):
+        first, second = self.wrappers
+        connection = self.borrow(first)
+        first.close()
+        self.assertIs(self.borrow(second), connection)
+        self.assertEqual(connection.queries, 1)
+        second.close()
+
+        connection.dropped = True
+        self.assertIsNot(self.borrow(first), connection)
+        self.assertEqual(self.connect.call_count, 2)
+
+
+@override_settings(ASYNC_VIEWS=False, JOBS={'THREADS': 2}, DB_POOL={'MAX_SIZE': 4})
+class ConnectionCheckTests(SimpleTestCase):
+    def issue_ids(self, mode, **database):
+        return [issue.id for issue in database_connection_issues(database, mode)]
+
+    def test_modes(self):
+        postgres = 'django.db.backends.postgresql'
+        self.assertEqual(self.issue_ids('persistent', ENGINE=postgres, CONN_MAX_AGE=600), [])
+        self.assertEqual(self.issue_ids('pool', ENGINE='api.postgresql_pool', CONN_MAX_AGE=0), [])
+        self.assertEqual(self.issue_ids('pgbouncer', ENGINE=postgres, CONN_MAX_AGE=0, DISABLE_SERVER_SIDE_CURSORS=True), [])
+        self.assertEqual(self.issue_ids('persistent', ENGINE='django.db.backends.sqlite3'), [])
+
+        self.assertEqual(self.issue_ids('pooled', ENGINE=postgres), ['api.E001'])
+        self.assertEqual(self.issue_ids('pool', ENGINE='django.db.backends.sqlite3'), ['api.W001'])
+        with override_settings(ASYNC_VIEWS=True):
+            self.assertEqual(self.issue_ids('persistent', ENGINE=postgres, CONN_MAX_AGE=None), ['api.W002'])
+            self.assertEqual(self.issue_ids('per_request', ENGINE=postgres, CONN_MAX_AGE=0), [])
+        with override_settings(DB_POOL={'MAX_SIZE': 1}):
+            self.assertEqual(self.issue_ids('pool', ENGINE='api.postgresql_pool', CONN_MAX_AGE=60), ['api.W003', 'api.W004'])
+        self.assertEqual(
+            self.issue_ids('pgbouncer', ENGINE=postgres, CONN_MAX_AGE=0, OPTIONS={'prepare_threshold': 5}),
+            ['api.W005', 'api.W006'],
+        )
+
+
+class ConnectionBenchTests(TestCase):
+    def test_modes_on_sqlite(self):
+        self.assertIsNone(mode_database('pool'))
+        self.assertEqual(mode_database('per_request')['CONN_MAX_AGE'], 0)
+
+        result = run_mode('per_request', mode_database('per_request'), threads=2, requests=3, queries=2)
+        self.assertEqual(result['requests'], 6)
+        self.assertGreater(result['setup']['p95_ms'], 0)
+        self.assertNotIn('bench_per_request', connections.settings)
+
+        output = StringIO()
+        call_command('bench_connections', '--modes', 'persistent,pool', '--requests', '2', stdout=output, stderr=StringIO())
+        self.assertEqual([run['mode'] for run in json.loads(output.getvalue())['runs']], ['persistent'])
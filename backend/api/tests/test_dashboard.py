@@ -0,0 +1,52 @@
+from datetime import date
+from django.urls import reverse
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from api.models import Category, Income, Expense
+
+User = get_user_model()
+
+class DashboardSummaryTests(TestCase):
+    def setUp(self):
+        self.url = reverse('dashboard-summary')
+        self.user = User.objects.create_user(
+            email='summary@example.com', username='summary', full_name='Summary User', password='securepassword123'
+        )
+        self.other = User.objects.create_user(
+            email='other@example.com', username='other', full_name='Other User', password='securepassword123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        salary = Category.objects.create(name='Salary', cat_type=Category.INCOME, user=self.user)
+        food = Category.objects.create(name='Food', cat_type=Category.EXPENSE, user=self.user)
+        Income.objects.create(name='Pay', amount='1000.50', date=date(2025, 1, 15), category=salary, user=self.user)
+        Income.objects.create(name='Pay', amount='1000.00', date=date(2025, 1, 30), category=salary, user=self.user)
+        Income.objects.create(name='Pay', amount='900.00', date=date(2025, 2, 15), category=salary, user=self.user)
+        Expense.objects.create(name='Lunch', amount='12.25', date=date(2025, 1, 3), category=food, user=self.user)
+        Expense.objects.create(name='Other', amount='99.00', date=date(2025, 1, 3), user=self.other)
+
+    def test_monthly_summary(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        rows = response.data['results']
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['period'], '2025-01-01')
+        self.assertEqual(rows[0]['type'], 'expense')
+        self.assertEqual(rows[0]['total'], '12.25')
+        self.assertEqual(rows[1]['total'], '2000.50')
+        self.assertEqual(rows[1]['count'], 2)
+        self.assertEqual(rows[1]['category_name'], 'Salary')
+        self.assertEqual(response.data['totals']['net'], '2888.25')
+
+    def test_daily_summary_with_range(self):
+        response = self.client.get(self.url, {'period': 'day', 'start': '2025-01-01', 'end': '2025-01-31'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['period'] for row in response.data['results']], ['2025-01-03', '2025-01-15', '2025-01-30'])
+
+    def test_invalid_period(self):
+        response = self.client.get(self.url, {'period': 'year'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,68 @@
+import csv
+import gzip
+import io
+import json
+from datetime import date
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from api.models import Category, Income, Expense, Budget, BudgetItem, Goal
+
+User = get_user_model()
+
+class ExportTests(TestCase):
+    url = '/api/export/'
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='export@example.com', username='export', full_name='Export', password='securepassword123'
+        )
+        other = User.objects.create_user(
+            email='hidden@example.com', username='hidden', full_name='Hidden', password='securepassword123'
+        )
+        Income.objects.create(name='Pay', amount='100.00', date=date(2025, 1, 1), user=self.user)
+        food = Category.objects.create(name='Food', cat_type=Category.EXPENSE, user=self.user)
+        Expense.objects.create(name='Rent, flat', amount='40.50', date=date(2025, 1, 2), user=self.user)
+        Expense.objects.create(name='Lunch', amount='20.00', date=date(2025, 1, 3), category=food, user=self.user)
+        Expense.objects.create(name='Not mine', amount='1.00', user=other)
+        budget = Budget.objects.create(
+            name='Jan', target_amount='500.00', start_date=date(2025, 1, 1), end_date=date(2025, 1, 31), user=self.user,
+        )
+        BudgetItem.objects.create(budget=budget, category='Food', planned='200.00')
+        Goal.objects.create(name='Trip', target_amount='1000.00', deadline=date(2025, 12, 1), user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_csv_export(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = list(csv.DictReader(io.StringIO(self.body(response).decode('utf-8'))))
+        self.assertEqual(
+            [row['record_type'] for row in rows], ['income', 'expense', 'expense', 'budget', 'budget_item', 'goal'],
+        )
+        self.assertEqual(rows[1]['name'], 'Rent, flat')
+        self.assertEqual(rows[1]['amount'], '40.50')
+
+    def test_budget_actuals_match_the_api(self):
+        budget = self.client.get('/api/budgets/').data['results'][0]
+        self.assertEqual(budget['current_amount'], '20.00')
+        response = self.client.get(self.url, {'output': 'ndjson', 'types': 'budget,budget_item'})
+        records = [json.loads(line) for line in self.body(response).decode('utf-8').splitlines()]
+        self.assertEqual(records[0]['current_amount'], budget['current_amount'])
+        self.assertEqual(records[1]['actual'], budget['items'][0]['actual'])
+
+    def test_gzip_ndjson_export(self):
+        response = self.client.get(self.url, {'output': 'ndjson', 'gzip': 'true', 'types': 'expense,goal'})
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        lines = gzip.decompress(self.body(response)).decode('utf-8').splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual([record['type'] for record in records], ['expense', 'expense', 'goal'])
+        self.assertEqual(records[0]['amount'], '40.50')
+
+    def test_unknown_type(self):
+        response = self.client.get(self.url, {'types': 'secrets'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
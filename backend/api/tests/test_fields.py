@@ -0,0 +1,54 @@
+from datetime import date
+from django.test import TestCase
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from api.models import Category, Expense, Goal
+from api.serializers import ExpenseSerializer
+
+User = get_user_model()
+
+class SparseFieldsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='fields@example.com', username='fields', full_name='Fields', password='securepassword123'
+        )
+        food = Category.objects.create(name='Food', cat_type=Category.EXPENSE, user=self.user)
+        Expense.objects.create(name='Lunch', amount='12.50', date=date(2025, 1, 3), category=food,
+                               description='A long note', user=self.user)
+        Expense.objects.create(name='Bus', amount='2.00', date=date(2025, 1, 4), user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_fast_list_matches_serializer(self):
+        expected = ExpenseSerializer(Expense.objects.order_by('-date', '-id'), many=True).data
+        self.assertEqual(self.client.get('/api/expenses/').data['results'], expected)
+        self.assertEqual(self.client.get('/api/expenses/', {'pagination': 'cursor'}).data['results'], expected)
+
+    def test_fields_and_exclude(self):
+        rows = self.client.get('/api/expenses/', {'fields': 'id,amount'}).data['results']
+        self.assertEqual([set(row) for row in rows], [{'id', 'amount'}] * 2)
+        rows = self.client.get('/api/expenses/', {'exclude': 'description,user'}).data['results']
+        self.assertEqual(set(rows[0]), {'id', 'name', 'amount', 'date', 'category'})
+
+    def test_unknown_fields_are_rejected(self):
+        for url in ('/api/expenses/', '/api/goals/'):
+            with self.subTest(url):
+                response = self.client.get(url, {'fields': 'id,amout,nmae'})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data['fields'], ['Unknown fields: amout, nmae.'])
+        # Excluding a field that does not exist leaves nothing out
+        rows = self.client.get('/api/expenses/', {'exclude': 'nope'}).data['results']
+        self.assertIn('description', rows[0])
+
+    def test_fields_on_model_serializers(self):
+        Goal.objects.create(name='Car', target_amount='200.00', current_amount='50.00',
+                            deadline=date(2030, 1, 1), user=self.user)
+        goal = self.client.get('/api/goals/', {'fields': 'name,progress'}).data['results'][0]
+        self.assertEqual(goal, {'name': 'Car', 'progress': 25.0})
+        self.assertEqual(set(self.client.get('/api/categories/', {'exclude': 'user'}).data['results'][0]),
+                         {'id', 'name', 'cat_type'})
+
+    def test_writes_ignore_fields(self):
+        response = self.client.post('/api/expenses/?fields=id', {'name': 'Tea', 'amount': '1.00', 'date': '2025-01-05'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['name'], 'Tea')
@@ -0,0 +1,109 @@
+from datetime import date, timedelta
+from decimal import Decimal
+import numpy as np
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from api.forecast import fit, forecast, load_daily_net
+from api.models import Category, Expense, Goal, Income, RecurringRule
+
+User = get_user_model()
+
+TODAY = date(2025, 6, 15)
+
+class ForecastTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='forecast@example.com', username='forecast', full_name='Forecast', password='securepassword123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def seed_history(self):
+        # A year of pay on the 1st and a flat 50 a day of spending
+        day = TODAY - timedelta(days=364)
+        income, expenses = [], []
+        while day <= TODAY:
+            if day.day == 1:
+                income.append(Income(name='Pay', amount=Decimal('3000.00'), date=day, user=self.user))
+            expenses.append(Expense(name='Daily', amount=Decimal('50.00'), date=day, user=self.user))
+            day += timedelta(days=1)
+        Income.objects.bulk_create(income)
+        Expense.objects.bulk_create(expenses)
+
+    def test_load_daily_net_in_one_query(self):
+        Income.objects.create(name='Pay', amount=Decimal('100.00'), date=date(2025, 1, 2), user=self.user)
+        Expense.objects.create(name='Food', amount=Decimal('30.00'), date=date(2025, 1, 2), user=self.user)
+        Expense.objects.create(name='Food', amount=Decimal('5.50'), date=date(2025, 1, 3), user=self.user)
+        rule = RecurringRule.objects.create(
+            user=self.user, kind=Category.EXPENSE, name='Rent', amount=Decimal('900.00'),
+            start_date=date(2025, 1, 1), next_occurrence=date(2025, 2, 1),
+        )
+        Expense.objects.create(name='Rent', amount=Decimal('900.00'), date=date(2025, 1, 1), user=self.user,
+                               recurring_rule=rule, occurrence_date=date(2025, 1, 1))
+
+        with self.assertNumQueries(1):
+            net = load_daily_net(self.user, date(2025, 1, 1), date(2025, 1, 4))
+        # The active rule's row is projected separately, not fitted
+        np.testing.assert_allclose(net, [0, 70, -5.5, 0])
+
+    def test_fit_recovers_trend_and_seasonality(self):
+        start = date(2024, 1, 1)
+        days = np.arange(366)
+        payday = np.array([(start + timedelta(days=int(i))).day == 1 for i in days], dtype=float)
+        model = fit(10 + 0.5 * days + 1000 * payday, start)
+        self.assertAlmostEqual(model['slope'], 0.5, delta=0.05)
+        self.assertGreater(model['seasonal'][1], 900)
+
+        noise = np.random.default_rng(1).normal(0, 100, 366)
+        self.assertEqual(fit(noise, start)['slope'], 0.0)
+
+    def test_forecast_and_goals(self):
+        self.seed_history()
+        Goal.objects.create(name='Soon', target_amount=Decimal('1000.00'), deadline=date(2025, 8, 31), user=self.user)
+        Goal.objects.create(name='Too much', target_amount=Decimal('99999.00'), deadline=date(2025, 9, 30), user=self.user)
+        Goal.objects.create(name='Missed', target_amount=Decimal('10.00'), deadline=date(2025, 1, 1), user=self.user)
+
+        result = forecast(self.user, months=3, today=TODAY)
+        self.assertEqual([month['month'] for month in result['months']], ['2025-07', '2025-08', '2025-09'])
+        # August: one pay day, 31 days of spending
+        self.assertAlmostEqual(result['months'][1]['net'], 3000 - 31 * 50, delta=60)
+        self.assertLessEqual(result['months'][0]['low'], result['months'][0]['expected'])
+        self.assertGreaterEqual(result['months'][0]['high'], result['months'][0]['expected'])
+
+        goals = {goal['name']: goal for goal in result['goals']}
+        self.assertTrue(goals['Soon']['on_track'])
+        self.assertFalse(goals['Too much']['on_track'])
+        self.assertFalse(goals['Missed']['on_track'])
+        self.assertIsNone(goals['Missed']['projected_savings'])
+
+    def test_recurring_rules_are_projected(self):
+        RecurringRule.objects.create(
+            user=self.user, kind=Category.INCOME, name='Pay', amount=Decimal('2000.00'),
+            start_date=date(2025, 7, 10), next_occurrence=date(2025, 7, 10),
+        )
+        result = forecast(self.user, months=3, today=TODAY)
+        self.assertEqual([month['net'] for month in result['months']], [2000.0, 2000.0, 2000.0])
+
+    def test_cached_per_data_version(self):
+        self.seed_history()
+        first = forecast(self.user, months=6, today=TODAY)
+        # The balance row and the data version
+        with self.assertNumQueries(2):
+            self.assertEqual(forecast(self.user, months=6, today=TODAY), first)
+
+        self.client.post('/api/income/', {'name': 'Bonus', 'amount': '5000.00', 'date': TODAY.isoformat()})
+        with CaptureQueriesContext(connection) as queries:
+            updated = forecast(self.user, months=6, today=TODAY)
+        self.assertGreater(len(queries), 1)
+        self.assertAlmostEqual(updated['balance'], first['balance'] + 5000)
+
+    def test_endpoint(self):
+        response = self.client.get('/api/forecast/', {'months': 12})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['months']), 12)
+        self.assertEqual(self.client.get('/api/forecast/', {'months': 24}).status_code, 400)
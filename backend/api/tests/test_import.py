@@ -0,0 +1,102 @@
+from decimal import Decimal
+from unittest import mock
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from api import importers
+from api.models import Category, Income, Expense, Savings, StatementImport
+
+User = get_user_model()
+
+STATEMENT = (
+    "Date,Payee,Memo,Amount,Category\n"
+    "2025-03-01,ACME Corp,March salary,\"2,500.00\",Salary\n"
+    "2025-03-02,Coffee Shop,,-3.50,Food\n"
+    "2025-03-02,Coffee Shop,,-3.50,food\n"
+    "not a date,Broken,,-1.00,\n"
+)
+
+OFX = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250305120000<TRNAMT>-42.10<NAME>Grocer<MEMO>Weekly shop</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20250306<TRNAMT>15.00<NAME>Refund</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+class StatementImportTests(TestCase):
+    url = '/api/import/'
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='importer@example.com', username='importer', full_name='Importer', password='securepassword123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self, content, name='statement.csv', **extra):
+        return self.client.post(self.url, {'file': SimpleUploadedFile(name, content.encode('utf-8')), **extra})
+
+    def test_csv_import_is_idempotent(self):
+        response = self.upload(STATEMENT)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], {'income': 1, 'expense': 2})
+        self.assertEqual(response.data['error_count'], 1)
+        self.assertEqual(response.data['errors'][0]['row'], 4)
+        self.assertEqual(Category.objects.filter(user=self.user, name__iexact='food').count(), 1)
+        self.assertEqual(Savings.objects.get(user=self.user).total, Decimal('2493.00'))
+
+        again = self.upload(STATEMENT)
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+        self.assertTrue(again.data['already_imported'])
+
+        # An overlapping statement only adds the new row
+        overlapping = self.upload(STATEMENT + "2025-03-04,Bookshop,,-20.00,\n")
+        self.assertEqual(overlapping.data['created'], {'income': 0, 'expense': 1})
+        self.assertEqual(overlapping.data['duplicates'], 3)
+        self.assertEqual(Expense.objects.filter(user=self.user).count(), 3)
+
+    def test_concurrent_upload_of_the_same_file(self):
+        self.upload(STATEMENT)
+        recorded = StatementImport.objects.get(user=self.user)
+        Expense.objects.filter(user=self.user).update(import_hash=None)
+
+        # The other upload commits between this one's lookup and its insert
+        with mock.patch.object(importers, 'previous_import', side_effect=[None, recorded]):
+            response = self.upload(STATEMENT)
+        self.assertTrue(response.data['already_imported'])
+        self.assertEqual(Expense.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(Savings.objects.get(user=self.user).total, Decimal('2493.00'))
+
+    def test_concurrent_overlapping_import(self):
+        run = importers.StatementImporter.run
+        collisions = []
+
+        def collide_first(importer, rows):
+            if not collisions:
+                collisions.append(True)
+                raise IntegrityError('UNIQUE constraint failed: api_expense.user_id, api_expense.import_hash')
+            return run(importer, rows)
+
+        # Another file's import inserted some of the same rows first: run again
+        with mock.patch.object(importers.StatementImporter, 'run', collide_first):
+            response = self.upload(STATEMENT)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], {'income': 1, 'expense': 2})
+
+        with mock.patch.object(importers.StatementImporter, 'run', side_effect=IntegrityError):
+            response = self.upload(STATEMENT + "2025-03-04,Bookshop,,-20.00,\n")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_ofx_import(self):
+        response = self.upload(OFX, name='statement.ofx')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        expense = Expense.objects.get(user=self.user)
+        self.assertEqual((expense.name, expense.amount, str(expense.date)), ('Grocer', Decimal('42.10'), '2025-03-05'))
+        self.assertEqual(Income.objects.get(user=self.user).amount, Decimal('15.00'))
+
+    def test_missing_columns(self):
+        response = self.upload("When,How much\n2025-01-01,3\n", columns='{"date": "Posted"}')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
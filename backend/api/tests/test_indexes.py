@@ -0,0 +1,71 @@
+from datetime import date
+from unittest import skipUnless
+from django.db import connection, transaction
+from django.db.models import Q
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from api.models import Category, Income, Expense, Budget, Goal
+
+User = get_user_model()
+
+class QueryPlanTests(TestCase):
+    """
+    Checks that the per-user, date-ordered queries issued by the viewsets
+    are planned against the composite indexes rather than a table scan.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='plans@example.com', username='plans', full_name='Plans', password='securepassword123'
+        )
+        cls.category = Category.objects.create(name='Food', cat_type=Category.EXPENSE, user=cls.user)
+
+    def date_range(self, model):
+        return model.objects.filter(
+            user=self.user, date__gte=date(2025, 1, 1), date__lte=date(2025, 3, 31)
+        ).order_by('-date')
+
+    def category_range(self, model):
+        return model.objects.filter(
+            user=self.user, category=self.category, date__gte=date(2025, 1, 1)
+        ).order_by('date')
+
+    def keyset_page(self, model):
+        cursor_date = date(2025, 3, 1)
+        return model.objects.filter(
+            Q(date__lt=cursor_date) | Q(date=cursor_date, id__lt=100),
+            user=self.user, date__lte=cursor_date,
+        ).order_by('-date', '-id')[:10]
+
+    def plans(self):
+        return [
+            (self.date_range(Income), 'api_income_user_date_idx'),
+            (self.keyset_page(Income), 'api_income_user_date_idx'),
+            (self.keyset_page(Expense), 'api_expense_user_date_idx'),
+            (self.date_range(Expense), 'api_expense_user_date_idx'),
+            (self.category_range(Income), 'api_income_user_cat_date_idx'),
+            (self.category_range(Expense), 'api_expense_user_cat_date_idx'),
+            (Budget.objects.filter(user=self.user, start_date__lte=date(2025, 1, 31), end_date__gte=date(2025, 1, 1)),
+             'api_budget_user_period_idx'),
+            (Goal.objects.filter(user=self.user, deadline__gte=date(2025, 1, 1)).order_by('deadline'),
+             'api_goal_user_deadline_idx'),
+        ]
+
+    @skipUnless(connection.vendor == 'sqlite', "SQLite query plan")
+    def test_sqlite_plans_use_indexes(self):
+        for queryset, index_name in self.plans():
+            plan = queryset.explain()
+            self.assertIn(index_name, plan)
+            self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plan)
+
+    @skipUnless(connection.vendor == 'postgresql', "PostgreSQL query plan")
+    def test_postgresql_plans_use_indexes(self):
+        for queryset, index_name in self.plans():
+            with transaction.atomic():
+                # Empty test tables would otherwise favour a sequential scan
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+                plan = queryset.explain()
+            self.assertIn(index_name, plan)
+            self.assertNotIn('Seq Scan', plan)
@@ -0,0 +1,178 @@
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from api import jobs
+from api.jobs import claim_job, enqueue, enqueue_statement_import, requeue_stale, run_job, run_pending
+from api.models import Category, Expense, Income, Job, RecurringRule, Savings
+
+User = get_user_model()
+
+class JobTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        storage = override_settings(MEDIA_ROOT=media.name)
+        storage.enable()
+        self.addCleanup(storage.disable)
+        self.user = User.objects.create_user(
+            email='jobs@example.com', username='jobs', full_name='Jobs', password='securepassword123'
+        )
+        self.other = User.objects.create_user(
+            email='otherjobs@example.com', username='otherjobs', full_name='Other', password='securepassword123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_one_running_job_per_user(self):
+        first = enqueue(self.user, 'import_statement', {'content': ''})
+        second = enqueue(self.user, 'import_statement', {'content': ''})
+        third = enqueue(self.other, 'recalculate_savings')
+
+        self.assertEqual(claim_job().pk, first.pk)
+        # The user's next job waits; another user's does not
+        self.assertEqual(claim_job().pk, third.pk)
+        self.assertIsNone(claim_job())
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Job.objects.filter(pk=second.pk).update(status=Job.RUNNING)
+
+        Job.objects.filter(pk=first.pk).update(status=Job.SUCCEEDED)
+        self.assertEqual(claim_job().pk, second.pk)
+
+    def test_enqueue_coalesces_identical_work(self):
+        job = enqueue(self.user, 'recalculate_savings')
+        self.assertEqual(enqueue(self.user, 'recalculate_savings').pk, job.pk)
+        self.assertEqual(Job.objects.count(), 1)
+        with self.assertRaises(ValueError):
+            enqueue(self.user, 'nope')
+
+    @override_settings(JOBS={'RETRY_BACKOFF': 10, 'MAX_ATTEMPTS': 2})
+    def test_retries_with_backoff(self):
+        calls = []
+
+        @jobs.handler('flaky')
+        def flaky(job):
+            calls.append(job.attempts)
+            raise RuntimeError('database went away')
+
+        try:
+            job = enqueue(self.user, 'flaky')
+            self.assertEqual(run_job(claim_job()), Job.QUEUED)
+            job.refresh_from_db()
+            self.assertGreaterEqual(job.run_after, timezone.now() + timedelta(seconds=9))
+            self.assertIn('database went away', job.error)
+            self.assertIsNone(claim_job())
+
+            Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+            self.assertEqual(run_job(claim_job()), Job.FAILED)
+            self.assertEqual(calls, [1, 2])
+        finally:
+            del jobs.HANDLERS['flaky']
+
+    def test_bad_statement_fails_without_retry(self):
+        upload = SimpleUploadedFile('statement.pdf', b'%PDF')
+        job = enqueue_statement_import(self.user, upload, file_type='pdf')
+        self.assertEqual(run_job(claim_job()), Job.FAILED)
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 1)
+        self.assertIn('Unsupported file type', job.error)
+        self.assertFalse(default_storage.exists(job.payload['path']))
+
+    @override_settings(JOBS={'STALE_AFTER': 60})
+    def test_stale_running_jobs_are_retried(self):
+        job = enqueue(self.user, 'recalculate_savings')
+        lost = claim_job()
+        # A long job that still sends heartbeats is left running
+        Job.objects.filter(pk=job.pk).update(started_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(requeue_stale(), 0)
+
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+
+        # The presumed-lost attempt finishing late does not touch the retry
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        retry = claim_job()
+        self.assertEqual(run_job(lost), Job.RUNNING)
+        self.assertIsNone(lost.result)
+        self.assertEqual(run_job(retry), Job.SUCCEEDED)
+
+    def test_heartbeat_runs_while_the_handler_does(self):
+        job = enqueue(self.user, 'recalculate_savings')
+        claim_job()
+        rows = mock.Mock()
+        rows.update.return_value = 1
+        with mock.patch.object(jobs, 'attempt_rows', return_value=rows):
+            with jobs.heartbeat(job, 0.01):
+                time.sleep(0.1)
+            beats = rows.update.call_count
+            time.sleep(0.05)
+        self.assertGreater(beats, 1)
+        self.assertEqual(rows.update.call_count, beats)
+
+    def test_handlers(self):
+        Income.objects.create(name='Pay', amount=Decimal('100.00'), date=date(2025, 1, 1), user=self.user)
+        Expense.objects.create(name='Food', amount=Decimal('30.00'), date=date(2025, 1, 2), user=self.user)
+        RecurringRule.objects.create(
+            user=self.user, kind=Category.INCOME, name='Pay', amount=Decimal('5.00'),
+            start_date=date(2025, 1, 1), next_occurrence=date(2025, 1, 1),
+        )
+        RecurringRule.objects.create(
+            user=self.other, kind=Category.INCOME, name='Pay', amount=Decimal('5.00'),
+            start_date=date(2025, 1, 1), next_occurrence=date(2025, 1, 1),
+        )
+        savings = enqueue(self.user, 'recalculate_savings')
+        recurring = enqueue(self.user, 'materialize_recurring')
+        self.assertEqual(run_pending(), 2)
+
+        savings.refresh_from_db()
+        recurring.refresh_from_db()
+        self.assertEqual(savings.result, {'total': '70.00'})
+        self.assertEqual(recurring.result['rules'], 1)
+        self.assertFalse(Income.objects.filter(user=self.other).exists())
+        self.assertEqual(Savings.objects.get(user=self.user).total, Decimal('70.00') + recurring.result['income'] * 5)
+
+    def test_endpoints(self):
+        response = self.client.post('/api/jobs/', {'kind': 'recalculate_savings'})
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(response['Location'].endswith(f"/api/jobs/{response.data['id']}/"))
+        self.assertEqual(self.client.post('/api/jobs/', {'kind': 'import_statement'}).status_code, 400)
+
+        upload = SimpleUploadedFile('statement.csv', b'date,description,amount\n2025-01-05,Coffee,-3.50\n')
+        response = self.client.post('/api/import/', {'file': upload}, HTTP_PREFER='respond-async')
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(Expense.objects.exists())
+        # The upload is stored as a file; the job only refers to it
+        path = Job.objects.get(pk=response.data['id']).payload['path']
+        self.assertTrue(default_storage.exists(path))
+
+        out = StringIO()
+        call_command('run_jobs', once=True, threads=1, stdout=out)
+        self.assertIn('Ran 2 job(s)', out.getvalue())
+
+        response = self.client.get(response['Location'])
+        self.assertEqual(response.data['status'], Job.SUCCEEDED)
+        self.assertEqual(response.data['result']['created'], {'income': 0, 'expense': 1})
+        self.assertFalse(default_storage.exists(path))
+        self.assertEqual(len(self.client.get('/api/jobs/').data['results']), 2)
+
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.client.get(response.request['PATH_INFO']).status_code, 404)
+
+    def test_async_import_passes_cors_preflight(self):
+        response = self.client.options(
+            '/api/import/', HTTP_ORIGIN='https://financeflow-cgn.vercel.app',
+            HTTP_ACCESS_CONTROL_REQUEST_METHOD='POST', HTTP_ACCESS_CONTROL_REQUEST_HEADERS='authorization, prefer',
+        )
+        self.assertIn('prefer', response['Access-Control-Allow-Headers'])
@@ -0,0 +1,103 @@
+from datetime import date
+from decimal import Decimal
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from api.ledger import balance_as_of, compact
+from api.models import Category, LedgerEntry, LedgerSnapshot, RecurringRule, Savings
+from api.recurring import materialize_due
+
+User = get_user_model()
+
+@override_settings(LEDGER={'COMPACTION_LAG': 0})
+class LedgerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='ledger@example.com', username='ledger', full_name='Ledger', password='securepassword123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add(self, kind, amount, day):
+        response = self.client.post(f'/api/{kind}/', {'name': kind, 'amount': amount, 'date': day})
+        self.assertEqual(response.status_code, 201)
+        return response.data['id']
+
+    def entries(self):
+        return list(LedgerEntry.objects.filter(user=self.user).order_by('id').values_list('model', 'date', 'delta'))
+
+    def assert_ledger_matches_savings(self):
+        total = sum(delta for _, _, delta in self.entries())
+        self.assertEqual(total, Savings.objects.get(user=self.user).total)
+
+    def test_writes_append_signed_entries(self):
+        income_id = self.add('income', '1000.00', '2025-01-05')
+        expense_id = self.add('expenses', '40.00', '2025-01-06')
+        # Moving an expense to another day reverses it on the old date
+        self.client.patch(f'/api/expenses/{expense_id}/', {'amount': '50.00', 'date': '2025-02-01'})
+        self.client.patch(f'/api/income/{income_id}/', {'name': 'Salary'})
+        self.client.delete(f'/api/income/{income_id}/')
+
+        self.assertEqual(self.entries(), [
+            ('income', date(2025, 1, 5), Decimal('1000.00')),
+            ('expense', date(2025, 1, 6), Decimal('-40.00')),
+            ('expense', date(2025, 1, 6), Decimal('40.00')),
+            ('expense', date(2025, 2, 1), Decimal('-50.00')),
+            ('income', date(2025, 1, 5), Decimal('-1000.00')),
+        ])
+        self.assert_ledger_matches_savings()
+
+    def test_bulk_writes(self):
+        created = self.client.post('/api/expenses/bulk/', [
+            {'name': 'A', 'amount': '10.00', 'date': '2025-03-01'},
+            {'name': 'B', 'amount': '20.00', 'date': '2025-03-02'},
+        ], format='json').data
+        self.client.patch('/api/expenses/bulk/', [{'id': created[0]['id'], 'amount': '15.00'}], format='json')
+        self.client.delete('/api/expenses/bulk/', [created[1]['id']], format='json')
+
+        self.assertEqual([delta for _, _, delta in self.entries()], [
+            Decimal('-10.00'), Decimal('-20.00'), Decimal('-5.00'), Decimal('20.00'),
+        ])
+        self.assert_ledger_matches_savings()
+
+    def test_recurring_occurrences_are_recorded(self):
+        RecurringRule.objects.create(
+            user=self.user, kind=Category.INCOME, name='Pay', amount=Decimal('500.00'),
+            start_date=date(2025, 1, 1), next_occurrence=date(2025, 1, 1),
+        )
+        materialize_due(date(2025, 3, 1))
+        self.assertEqual(len(self.entries()), 3)
+        self.assert_ledger_matches_savings()
+
+    def test_balance_as_of_with_snapshots(self):
+        self.add('income', '1000.00', '2025-01-05')
+        self.add('expenses', '100.00', '2025-01-20')
+        self.add('expenses', '200.00', '2025-02-10')
+        self.add('income', '50.00', '2025-03-15')
+        self.assertEqual(balance_as_of(self.user, date(2025, 2, 28)), Decimal('700.00'))
+
+        self.assertEqual(compact(), 1)
+        self.assertEqual(
+            list(LedgerSnapshot.objects.filter(user=self.user).order_by('month').values_list('period_end', 'balance')),
+            [(date(2025, 1, 31), Decimal('900.00')), (date(2025, 2, 28), Decimal('700.00')),
+             (date(2025, 3, 31), Decimal('750.00'))],
+        )
+        self.assertEqual(compact(), 0)
+
+        # A back-dated write after compaction is still counted
+        self.add('expenses', '30.00', '2025-01-25')
+        with self.assertNumQueries(2):
+            self.assertEqual(balance_as_of(self.user, date(2025, 2, 15)), Decimal('670.00'))
+        self.assertEqual(balance_as_of(self.user, date(2024, 12, 31)), Decimal('0.00'))
+
+        # Recompaction rewrites the affected months only
+        compact()
+        self.assertEqual(LedgerSnapshot.objects.get(user=self.user, month=date(2025, 3, 1)).balance, Decimal('720.00'))
+        self.assertEqual(balance_as_of(self.user, date(2025, 12, 31)), Savings.objects.get(user=self.user).total)
+
+    def test_balance_endpoint(self):
+        self.add('income', '80.00', '2025-01-05')
+        response = self.client.get('/api/balance/', {'date': '2025-01-04'})
+        self.assertEqual(response.data['balance'], '0.00')
+        response = self.client.get('/api/balance/', {'date': '2025-01-05'})
+        self.assertEqual(response.data['balance'], '80.00')
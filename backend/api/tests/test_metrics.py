@@ -0,0 +1,42 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from api.metrics import registry
+from api.models import Income
+
+User = get_user_model()
+
+@override_settings(API_SERVER_TIMING=True, API_SLOW_REQUEST_MS=0.001, METRICS_TOKEN='scrape-me')
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        registry.reset()
+        self.user = User.objects.create_user(
+            email='metrics@example.com', username='metrics', full_name='Metrics', password='securepassword123'
+        )
+        Income.objects.create(name='Pay', amount='10.00', user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_server_timing_and_prometheus_output(self):
+        with self.assertLogs('api.middlewares', level='WARNING') as logs:
+            response = self.client.get('/api/income/')
+        self.assertIn('Slow request GET /api/income/ (income-list)', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+        timing = response['Server-Timing']
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="3 queries"', timing)
+        self.assertIn('total;dur=', timing)
+
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        body = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-me').content.decode()
+        self.assertIn('api_requests_total{view="income-list",method="GET"} 1', body)
+        self.assertIn('api_db_queries_total{view="income-list",method="GET"} 3', body)
+        self.assertIn('api_request_duration_seconds_count{view="income-list",method="GET"} 1', body)
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_metrics_need_a_token_outside_debug(self):
+        with override_settings(DEBUG=False):
+            self.assertEqual(self.client.get('/metrics').status_code, 404)
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get('/metrics').status_code, 200)
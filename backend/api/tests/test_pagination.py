@@ -0,0 +1,58 @@
+from datetime import date, timedelta
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from api.models import Income
+
+User = get_user_model()
+
+class TransactionPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='pages@example.com', username='pages', full_name='Pages', password='securepassword123'
+        )
+        start = date(2025, 1, 1)
+        # Several rows share a date so the id tie-breaker is exercised
+        Income.objects.bulk_create([
+            Income(name=f'Income {i}', amount='1.00', date=start + timedelta(days=i // 3), user=cls.user)
+            for i in range(25)
+        ])
+        cls.expected = list(Income.objects.filter(user=cls.user).order_by('-date', '-id').values_list('id', flat=True))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_cursor_walks_forward_and_back(self):
+        seen = []
+        pages = []
+        url = '/api/income/?pagination=cursor&page_size=7'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            pages.append(response.data)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(len(pages), 4)
+
+        previous = self.client.get(pages[-1]['previous'])
+        self.assertEqual(previous.data['results'], pages[-2]['results'])
+
+    def test_page_size_is_capped(self):
+        Income.objects.bulk_create([Income(name='Extra', amount='1.00', user=self.user) for _ in range(100)])
+        response = self.client.get('/api/income/', {'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 100)
+
+    def test_page_numbers_without_count(self):
+        response = self.client.get('/api/income/', {'page_size': 10, 'page': 3, 'count': 'false'})
+        self.assertIsNone(response.data['count'])
+        self.assertIsNone(response.data['next'])
+        self.assertEqual([row['id'] for row in response.data['results']], self.expected[20:])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/income/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
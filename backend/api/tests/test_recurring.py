@@ -0,0 +1,133 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from api.models import Category, Expense, Income, RecurringAmountChange, RecurringRule, Savings
+from api.recurring import materialize_due, occurrences
+
+User = get_user_model()
+
+class RecurringRuleTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='recurring@example.com', username='recurring', full_name='Recurring', password='securepassword123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.rent = Category.objects.create(name='Rent', cat_type=Category.EXPENSE, user=self.user)
+
+    def make_rule(self, **fields):
+        fields = {
+            'user': self.user, 'kind': Category.EXPENSE, 'name': 'Rent', 'amount': Decimal('1000.00'),
+            'frequency': RecurringRule.MONTHLY, 'start_date': date(2025, 1, 31), **fields,
+        }
+        fields.setdefault('next_occurrence', fields['start_date'])
+        return RecurringRule.objects.create(**fields)
+
+    def dates(self, rule, start, end):
+        return [occurrence.date for occurrence in occurrences(rule, start, end)]
+
+    def test_occurrence_dates(self):
+        monthly = self.make_rule()
+        self.assertEqual(
+            self.dates(monthly, date(2025, 1, 1), date(2025, 4, 30)),
+            [date(2025, 1, 31), date(2025, 2, 28), date(2025, 3, 31), date(2025, 4, 30)],
+        )
+        # Starting mid-schedule skips straight to the right occurrence
+        self.assertEqual(self.dates(monthly, date(2025, 3, 1), date(2025, 3, 31)), [date(2025, 3, 31)])
+
+        fortnightly = self.make_rule(frequency=RecurringRule.WEEKLY, interval=2, start_date=date(2025, 1, 6),
+                                     end_date=date(2025, 2, 10))
+        self.assertEqual(
+            self.dates(fortnightly, date(2025, 1, 7), date(2025, 12, 31)),
+            [date(2025, 1, 20), date(2025, 2, 3)],
+        )
+        leap = self.make_rule(frequency=RecurringRule.YEARLY, start_date=date(2024, 2, 29))
+        self.assertEqual(
+            self.dates(leap, date(2024, 1, 1), date(2028, 12, 31)),
+            [date(2024, 2, 29), date(2025, 2, 28), date(2026, 2, 28), date(2027, 2, 28), date(2028, 2, 29)],
+        )
+
+    def test_amount_changes(self):
+        rule = self.make_rule(start_date=date(2025, 1, 1))
+        RecurringAmountChange.objects.create(rule=rule, effective_date=date(2025, 3, 1), amount=Decimal('1100.00'))
+        amounts = [occurrence.amount for occurrence in occurrences(rule, date(2025, 1, 1), date(2025, 4, 1))]
+        self.assertEqual(amounts, [Decimal('1000.00'), Decimal('1000.00'), Decimal('1100.00'), Decimal('1100.00')])
+
+    def test_materialize_is_idempotent(self):
+        Savings.for_user(self.user)
+        rule = self.make_rule(start_date=date(2025, 1, 1), category=self.rent)
+        salary = self.make_rule(kind=Category.INCOME, name='Salary', amount=Decimal('3000.00'),
+                                start_date=date(2025, 1, 15), end_date=date(2025, 2, 15))
+
+        summary = materialize_due(date(2025, 3, 10))
+        self.assertEqual(summary, {'rules': 2, 'income': 2, 'expense': 3})
+        self.assertEqual(
+            list(Expense.objects.filter(user=self.user).order_by('date').values_list('date', 'category', 'recurring_rule')),
+            [(date(2025, month, 1), self.rent.id, rule.id) for month in (1, 2, 3)],
+        )
+        self.assertEqual(Savings.objects.get(user=self.user).total, Decimal('3000.00'))
+
+        rule.refresh_from_db()
+        salary.refresh_from_db()
+        self.assertEqual(rule.next_occurrence, date(2025, 4, 1))
+        self.assertIsNone(salary.next_occurrence)
+
+        self.assertEqual(materialize_due(date(2025, 3, 10)), {'rules': 0, 'income': 0, 'expense': 0})
+        # Moving the schedule back does not write the same occurrences twice
+        RecurringRule.objects.filter(id=rule.id).update(next_occurrence=date(2025, 1, 1))
+        self.assertEqual(materialize_due(date(2025, 3, 10))['expense'], 0)
+        self.assertEqual(Expense.objects.filter(user=self.user).count(), 3)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Income.objects.create(name='Salary', amount=1, user=self.user, recurring_rule=salary,
+                                  occurrence_date=date(2025, 1, 15))
+
+    def test_command(self):
+        self.make_rule(start_date=date(2025, 1, 1), is_active=False)
+        self.make_rule(start_date=date(2025, 1, 1), frequency=RecurringRule.DAILY)
+        out = StringIO()
+        call_command('materialize_recurring', '--date', '2025-01-10', '--chunk-size', '1', stdout=out)
+        self.assertIn('Processed 1 rule(s): 0 income and 10 expense row(s) created', out.getvalue())
+
+    def test_api_create_and_projection(self):
+        response = self.client.post('/api/recurring/', {
+            'kind': 'EX', 'name': 'Gym', 'amount': '40.00', 'frequency': 'monthly', 'start_date': '2025-01-10',
+            'category': self.rent.id, 'amount_changes': [{'effective_date': '2025-03-01', 'amount': '45.00'}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['next_occurrence'], '2025-01-10')
+
+        response = self.client.get('/api/recurring/projection/', {'start': '2025-01-01', 'end': '2025-03-31'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(item['date'], str(item['amount'])) for item in response.data['occurrences']],
+            [(date(2025, 1, 10), '40.00'), (date(2025, 2, 10), '40.00'), (date(2025, 3, 10), '45.00')],
+        )
+        self.assertFalse(Expense.objects.exists())
+
+    def test_api_validation(self):
+        salary = Category.objects.create(name='Salary', cat_type=Category.INCOME, user=self.user)
+        response = self.client.post('/api/recurring/', {
+            'kind': 'EX', 'name': 'Gym', 'amount': '40.00', 'start_date': '2025-01-10', 'category': salary.id,
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('category', response.data)
+
+        response = self.client.post('/api/recurring/', {
+            'kind': 'EX', 'name': 'Gym', 'amount': '40.00', 'start_date': '2025-01-10', 'end_date': '2025-01-01',
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('end_date', response.data)
+
+    def test_update_reschedules_after_written_occurrences(self):
+        rule = self.make_rule(start_date=date(2025, 1, 1))
+        materialize_due(date(2025, 2, 15))
+        response = self.client.patch(f'/api/recurring/{rule.id}/', {'frequency': 'weekly'}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        # Weekly from Jan 1, after the Feb 1 occurrence already written
+        self.assertEqual(response.data['next_occurrence'], '2025-02-05')
@@ -0,0 +1,96 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, transaction
+from django.db.models import QuerySet, Sum
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from api.models import Expense, Income, LedgerEntry, Savings, Tombstone, UserDataVersion
+
+User = get_user_model()
+
+class SavingsBalanceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='saver@example.com', username='saver', full_name='Saver', password='securepassword123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def balance(self):
+        return Savings.objects.get(user=self.user).total
+
+    def test_balance_follows_writes(self):
+        income = self.client.post('/api/income/', {'name': 'Pay', 'amount': '1000.25', 'date': '2025-01-01'})
+        self.assertEqual(income.status_code, status.HTTP_201_CREATED)
+        expense = self.client.post('/api/expenses/', {'name': 'Rent', 'amount': '400.10', 'date': '2025-01-02'})
+        self.assertEqual(self.balance(), Decimal('600.15'))
+
+        self.client.patch(f"/api/income/{income.data['id']}/", {'amount': '1200.00'})
+        self.assertEqual(self.balance(), Decimal('799.90'))
+
+        self.client.delete(f"/api/expenses/{expense.data['id']}/")
+        self.assertEqual(self.balance(), Decimal('1200.00'))
+
+        response = self.client.get('/api/savings/')
+        self.assertEqual(response.data['results'][0]['total'], '1200.00')
+
+    def test_one_savings_row_per_user(self):
+        update = QuerySet.update
+
+        def other_writer_creates_first(queryset, **kwargs):
+            if not Savings.objects.filter(user=self.user).exists():
+                # Its own write is in its total; this one is not
+                Savings.objects.create(user=self.user, total=Decimal('5.00'))
+                return 0
+            return update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, 'update', other_writer_creates_first):
+            Savings.apply_delta(self.user, Decimal('10.00'))
+        self.assertEqual(self.balance(), Decimal('15.00'))
+        self.assertEqual(Savings.for_user(self.user).total, Decimal('15.00'))
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Savings.objects.create(user=self.user)
+
+    def test_orm_writes_outside_the_api_are_tracked(self):
+        # Admin, shell and command edits go through the model signal receivers
+        version = UserDataVersion.current(self.user.pk)
+        income = Income.objects.create(name='Pay', amount='100.00', date='2025-01-01', user=self.user)
+        expense = Expense.objects.create(name='Rent', amount='30.00', date='2025-01-02', user=self.user)
+        self.assertEqual(self.balance(), Decimal('70.00'))
+        self.assertNotEqual(UserDataVersion.current(self.user.pk), version)
+
+        income = Income.objects.get(pk=income.pk)
+        income.amount, income.date = Decimal('120.00'), date(2025, 2, 1)
+        income.save()
+        Expense.objects.get(pk=expense.pk).delete()
+        self.assertEqual(self.balance(), Decimal('120.00'))
+        self.assertTrue(Tombstone.objects.filter(model='expense', object_id=expense.pk).exists())
+        self.assertEqual(
+            LedgerEntry.objects.filter(user=self.user).aggregate(total=Sum('delta'))['total'], Decimal('120.00'),
+        )
+
+        # Bulk statements stay signal-free; the bulk endpoint reports them once
+        response = self.client.delete('/api/income/bulk/', {'ids': [income.pk]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.balance(), Decimal('0.00'))
+
+        # Rows deleted with their user are not reported
+        self.user.delete()
+        self.assertFalse(Income.objects.exists())
+
+    def test_rebuild_command(self):
+        Savings.objects.create(user=self.user, total=Decimal('5'))
+        Income.objects.create(name='Gift', amount='10.50', user=self.user)
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_savings', '--verify', stdout=StringIO())
+
+        call_command('rebuild_savings', stdout=StringIO())
+        self.assertEqual(self.balance(), Decimal('10.50'))
+        call_command('rebuild_savings', '--verify', stdout=StringIO())
@@ -0,0 +1,86 @@
+from datetime import date
+from decimal import Decimal
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from api.models import Expense, Goal, Income
+from api.search import search
+
+User = get_user_model()
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='search@example.com', username='search', full_name='Search', password='securepassword123'
+        )
+        self.other = User.objects.create_user(
+            email='other@example.com', username='other', full_name='Other', password='securepassword123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def expense(self, name, description='', user=None):
+        return Expense.objects.create(
+            name=name, description=description, amount=Decimal('1.00'), date=date(2025, 1, 1), user=user or self.user
+        )
+
+    def names(self, queryset, text):
+        return [row.name for row in search(queryset, text)]
+
+    def test_ranked_prefix_matches(self):
+        self.expense('Groceries', 'weekly shop')
+        self.expense('Dinner', 'groceries were forgotten')
+        self.expense('Rent')
+        self.expense('Café')
+        self.expense('Groceries', user=self.other)
+        mine = Expense.objects.filter(user=self.user)
+
+        # Name matches rank above description matches
+        self.assertEqual(self.names(mine, 'grocer'), ['Groceries', 'Dinner'])
+        self.assertEqual(self.names(mine, 'GROCERIES weekly'), ['Groceries'])
+        self.assertEqual(self.names(mine, 'cafe'), ['Café'])
+        self.assertEqual(self.names(mine, '"*()'), [])
+
+    def test_index_follows_bulk_writes(self):
+        rows = Expense.objects.bulk_create([
+            Expense(name=f'Coffee {i}', amount=Decimal('3.00'), date=date(2025, 1, 1), user=self.user) for i in range(3)
+        ])
+        mine = Expense.objects.filter(user=self.user)
+        self.assertEqual(len(self.names(mine, 'coffee')), 3)
+
+        Expense.objects.filter(id=rows[0].id).update(name='Tea')
+        Expense.objects.filter(id=rows[1].id).delete()
+        self.assertEqual(self.names(mine, 'coffee'), ['Coffee 2'])
+        self.assertEqual(self.names(mine, 'tea'), ['Tea'])
+
+    def test_reinstalled_after_table_rebuild(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite triggers only')
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER "api_income_fts_ai"')
+        Income.objects.create(name='Bonus', amount=Decimal('5.00'), date=date(2025, 1, 1), user=self.user)
+        call_command('migrate', verbosity=0)
+        self.assertEqual(self.names(Income.objects.all(), 'bonus'), ['Bonus'])
+
+    def test_list_endpoints(self):
+        for i in range(3):
+            self.expense(f'Taxi {i}', 'airport')
+        self.expense('Train')
+
+        response = self.client.get('/api/expenses/', {'q': 'airport', 'page_size': 2, 'fields': 'id,name'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+        # Cursor pagination follows dates, so searches stay on page numbers
+        response = self.client.get('/api/expenses/', {'q': 'taxi', 'pagination': 'cursor'})
+        self.assertEqual(response.data['count'], 3)
+
+        Goal.objects.create(name='Holiday', description='Trip to Rome', target_amount=Decimal('900.00'),
+                            deadline=date(2026, 1, 1), user=self.user)
+        Goal.objects.create(name='Car', target_amount=Decimal('900.00'), deadline=date(2026, 1, 1), user=self.user)
+        response = self.client.get('/api/goals/', {'q': 'rome'})
+        self.assertEqual([goal['name'] for goal in response.data['results']], ['Holiday'])
+        self.assertEqual(self.client.get('/api/budgets/', {'q': 'rome'}).data['count'], 0)
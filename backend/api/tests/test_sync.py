@@ -0,0 +1,73 @@
+from datetime import date, timedelta
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from api.models import Budget, BudgetItem, Category, Goal, Tombstone
+
+User = get_user_model()
+
+@override_settings(SYNC={'WATERMARK_LAG': 0, 'TOMBSTONE_RETENTION_DAYS': 90})
+class SyncTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='sync@example.com', username='sync', full_name='Sync', password='securepassword123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.food = Category.objects.create(name='Food', cat_type=Category.EXPENSE, user=self.user)
+        self.client.post('/api/expenses/', {'name': 'Lunch', 'amount': '8.00', 'date': '2025-01-03', 'category': self.food.id})
+
+    def sync(self, since=None):
+        response = self.client.get('/api/sync/', {'since': since} if since else {})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def later(self, seconds=1):
+        # Writes stamped after the watermark regardless of clock resolution
+        return mock.patch('django.utils.timezone.now', return_value=timezone.now() + timedelta(seconds=seconds))
+
+    def test_initial_sync_is_a_full_snapshot(self):
+        data = self.sync()
+        self.assertTrue(data['reset'])
+        self.assertEqual([row['name'] for row in data['changes']['expenses']], ['Lunch'])
+        self.assertEqual([row['name'] for row in data['changes']['categories']], ['Food'])
+
+    def test_only_changes_after_watermark_are_returned(self):
+        watermark = self.sync()['watermark']
+        with self.later():
+            Goal.objects.create(name='Car', target_amount='1000.00', deadline=date(2030, 1, 1), user=self.user)
+        data = self.sync(watermark)
+        self.assertFalse(data['reset'])
+        self.assertEqual([row['name'] for row in data['changes']['goals']], ['Car'])
+        self.assertEqual(data['changes']['expenses'], [])
+        self.assertEqual(data['changes']['budgets'], [])
+
+    def test_deletions_are_reported(self):
+        expense_id = self.sync()['changes']['expenses'][0]['id']
+        category_id = self.food.id
+        watermark = self.sync()['watermark']
+        with self.later():
+            self.client.delete('/api/expenses/bulk/', [expense_id], format='json')
+            self.food.delete()
+        data = self.sync(watermark)
+        self.assertEqual(data['deleted']['expenses'], [expense_id])
+        self.assertEqual(data['deleted']['categories'], [category_id])
+
+    def test_budget_items_removed_by_update_leave_tombstones(self):
+        budget = Budget.objects.create(name='Jan', target_amount='100.00', end_date=date(2025, 1, 31), user=self.user)
+        keep = BudgetItem.objects.create(budget=budget, category='Food', planned='50.00')
+        drop = BudgetItem.objects.create(budget=budget, category='Fun', planned='50.00')
+        watermark = self.sync()['watermark']
+        with self.later():
+            self.client.patch(f'/api/budgets/{budget.id}/', {'items': [{'id': keep.id, 'category': 'Food', 'planned': '60.00'}]}, format='json')
+        data = self.sync(watermark)
+        self.assertEqual(data['deleted']['budget_items'], [drop.id])
+        self.assertEqual([item['planned'] for item in data['changes']['budgets'][0]['items']], ['60.00'])
+
+    def test_stale_watermark_forces_reset(self):
+        Tombstone.objects.create(user=self.user, model='goal', object_id=1)
+        data = self.sync((timezone.now() - timedelta(days=365)).isoformat())
+        self.assertTrue(data['reset'])
+        self.assertEqual(data['deleted']['goals'], [])
@@ -0,0 +1,87 @@
+import os
+import tempfile
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory
+from api.throttling import (
+    AnonCounterThrottle, CacheCounterBackend, SQLiteCounterBackend, get_throttle_backend, reset_throttle_backend
+)
+
+class ThrottleTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'throttle.sqlite3')
+        reset_throttle_backend()
+
+    def tearDown(self):
+        reset_throttle_backend()
+        self.directory.cleanup()
+
+    def throttle(self, now, algorithm='fixed'):
+        throttle = AnonCounterThrottle()
+        throttle.rate = '3/m'
+        throttle.num_requests, throttle.duration = 3, 60
+        throttle.timer = lambda: now
+        throttle.get_algorithm = lambda: algorithm
+        return throttle
+
+    def request(self):
+        request = APIRequestFactory().get('/api/token/', REMOTE_ADDR='10.0.0.1')
+        request.user = None
+        return request
+
+    def allowed(self, now, algorithm='fixed'):
+        return self.throttle(now, algorithm).allow_request(self.request(), None)
+
+    def test_sqlite_counters_are_shared_between_workers(self):
+        first, second = SQLiteCounterBackend(self.path), SQLiteCounterBackend(self.path)
+        self.assertEqual(first.incr('k', 60), 1)
+        self.assertEqual(second.incr('k', 60), 2)
+        self.assertEqual(first.get('k'), 2)
+
+    def test_sqlite_counter_restarts_after_expiry(self):
+        backend = SQLiteCounterBackend(self.path)
+        backend.incr('k', -1)
+        self.assertEqual(backend.incr('k', 60), 1)
+
+    def test_cache_backend(self):
+        backend = CacheCounterBackend('default')
+        backend.cache.delete('throttle-test')
+        self.assertEqual(backend.incr('throttle-test', 60), 1)
+        self.assertEqual(backend.incr('throttle-test', 60), 2)
+
+    def test_store_follows_settings(self):
+        self.assertIsInstance(get_throttle_backend(), CacheCounterBackend)
+        with override_settings(THROTTLE_STORE={'BACKEND': 'api.throttling.SQLiteCounterBackend', 'OPTIONS': {'path': self.path}}):
+            self.assertIsInstance(get_throttle_backend(), SQLiteCounterBackend)
+        self.assertIsInstance(get_throttle_backend(), CacheCounterBackend)
+
+    def test_fixed_window(self):
+        with override_settings(THROTTLE_STORE={'BACKEND': 'api.throttling.SQLiteCounterBackend', 'OPTIONS': {'path': self.path}}):
+            self.assertEqual([self.allowed(600 + i) for i in range(4)], [True, True, True, False])
+            self.assertTrue(self.allowed(660))
+            self.assertIsInstance(get_throttle_backend(), SQLiteCounterBackend)
+
+    def test_rejected_requests_are_not_counted(self):
+        stores = [
+            {'BACKEND': 'api.throttling.SQLiteCounterBackend', 'OPTIONS': {'path': self.path}},
+            {'BACKEND': 'api.throttling.CacheCounterBackend', 'OPTIONS': {'alias': 'default'}},
+        ]
+        for store in stores:
+            with self.subTest(store['BACKEND']), override_settings(THROTTLE_STORE=store):
+                cache.clear()
+                for i in range(3):
+                    self.assertTrue(self.allowed(650 + i, 'sliding'))
+                # A client hammering while throttled
+                self.assertFalse(any(self.allowed(655, 'sliding') for _ in range(20)))
+                # Counting those would still hold it back 50s into the next window
+                self.assertTrue(self.allowed(710, 'sliding'))
+
+    def test_sliding_window_carries_previous_window(self):
+        with override_settings(THROTTLE_STORE={'BACKEND': 'api.throttling.SQLiteCounterBackend', 'OPTIONS': {'path': self.path}}):
+            for i in range(3):
+                self.assertTrue(self.allowed(650 + i, 'sliding'))
+            # 10s into the next window most of the previous window still counts
+            self.assertFalse(self.allowed(670, 'sliding'))
+            # 50s in, only a sixth of it does
+            self.assertTrue(self.allowed(710, 'sliding'))
@@ -0,0 +1,81 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.contrib.auth import get_user_model
+from api.token_blacklist import BloomFilter, get_revocation_list, prune_expired_tokens, reset_revocation_list
+
+User = get_user_model()
+
+class TokenBlacklistTests(TestCase):
+    def setUp(self):
+        reset_revocation_list()
+        self.user = User.objects.create_user(
+            email='refresh@example.com', username='refresh', full_name='Refresh', password='securepassword123'
+        )
+        self.client = APIClient()
+
+    def tearDown(self):
+        reset_revocation_list()
+
+    def refresh(self, token):
+        return self.client.post('/api/token/refresh/', {'refresh': token}, format='json')
+
+    def test_rotated_token_cannot_be_reused(self):
+        token = str(RefreshToken.for_user(self.user))
+        response = self.refresh(token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.refresh(response.data['refresh']).status_code, 200)
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_revocation_from_another_process_is_seen(self):
+        token = RefreshToken.for_user(self.user)
+        get_revocation_list().load()
+        # Blacklisted directly in the database, as another worker would
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=token['jti']))
+        self.assertEqual(self.refresh(str(token)).status_code, 401)
+
+    def test_revocation_committed_out_of_id_order_is_seen(self):
+        late, other = RefreshToken.for_user(self.user), RefreshToken.for_user(self.user)
+        revocations = get_revocation_list()
+        revocations.load()
+        last_id = BlacklistedToken.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        # A higher id commits and is synced first, as concurrent transactions can on PostgreSQL
+        BlacklistedToken.objects.create(id=last_id + 2, token=OutstandingToken.objects.get(jti=other['jti']))
+        self.assertTrue(revocations.is_revoked(other['jti']))
+        BlacklistedToken.objects.create(id=last_id + 1, token=OutstandingToken.objects.get(jti=late['jti']))
+        self.assertEqual(self.refresh(str(late)).status_code, 401)
+
+    def test_logout_revokes(self):
+        token = str(RefreshToken.for_user(self.user))
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.post('/api/logout/', {'refresh': token}, format='json').status_code, 200)
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_unrevoked_check_skips_blacklist_lookup(self):
+        token = RefreshToken.for_user(self.user)
+        revocations = get_revocation_list()
+        revocations.load()
+        with self.assertNumQueries(1):
+            # Only the incremental sync runs, never the jti lookup
+            self.assertFalse(revocations.is_revoked(token['jti']))
+
+    def test_prune_removes_expired_tokens(self):
+        expired = RefreshToken.for_user(self.user)
+        live = RefreshToken.for_user(self.user)
+        OutstandingToken.objects.filter(jti=expired['jti']).update(expires_at=timezone.now() - timedelta(days=1))
+        expired.blacklist()
+
+        self.assertEqual(prune_expired_tokens(), 2)
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), [live['jti']])
+        self.assertEqual(len(get_revocation_list()), 0)
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter(1000)
+        for index in range(1000):
+            bloom.add(f'jti-{index}')
+        self.assertTrue(all(f'jti-{index}' in bloom for index in range(1000)))
+        false_positives = sum(f'other-{index}' in bloom for index in range(10000))
+        self.assertLess(false_positives, 100)
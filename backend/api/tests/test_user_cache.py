@@ -0,0 +1,39 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from django.contrib.auth import get_user_model
+from api.authentication import get_user_cache, reset_user_cache
+
+User = get_user_model()
+
+class UserCacheTests(TestCase):
+    def setUp(self):
+        reset_user_cache()
+        self.user = User.objects.create_user(
+            email='cached@example.com', username='cached', full_name='Cached', password='securepassword123'
+        )
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def tearDown(self):
+        reset_user_cache()
+
+    def test_hot_user_needs_no_query(self):
+        self.assertEqual(self.client.get('/api/user/').status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/user/')
+        self.assertEqual(response.data['email'], 'cached@example.com')
+
+    def test_deactivation_invalidates(self):
+        self.client.get('/api/user/')
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertEqual(self.client.get('/api/user/').status_code, 401)
+
+    def test_entries_expire(self):
+        user_cache = get_user_cache()
+        user_cache.ttl = 0
+        self.client.get('/api/user/')
+        with self.assertNumQueries(1):
+            self.client.get('/api/user/')
@@ -0,0 +1,178 @@
+"""
+Request throttling on shared counters.
+
+DRF's SimpleRateThrottle keeps a list of request timestamps per key in
+the (per-process) default cache, so every worker enforces its own limit
+and the cost of a check grows with the rate. The throttles here keep one
+integer per key and window in a backend shared by all workers, and a
+check is a single atomic increment.
+
+Two algorithms are available through THROTTLE_STORE['ALGORITHM']:
+
+* ``fixed``: one counter per aligned window.
+* ``sliding``: the sliding-window counter approximation, which weighs the
+  previous window's count by how much of it still overlaps the sliding
+  window. It smooths the burst allowed at window boundaries and still
+  needs only two counters per key.
+"""
+import sqlite3
+import threading
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from rest_framework.throttling import AnonRateThrottle, SimpleRateThrottle, UserRateThrottle
+
+
+class CacheCounterBackend:
+    """Counters in a Django cache; atomic across workers with Redis."""
+
+    def __init__(self, alias='default'):
+        self.cache = caches[alias]
+
+    def incr(self, key, ttl):
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            if self.cache.add(key, 1, ttl):
+                return 1
+            return self.cache.incr(key)
+
+    def decr(self, key):
+        try:
+            self.cache.decr(key)
+        except ValueError:
+            pass
+
+    def get(self, key):
+        return self.cache.get(key, 0)
+
+
+class SQLiteCounterBackend:
+    """
+    Counters in a local SQLite file shared by the workers of one host.
+    Each increment is a single UPSERT ... RETURNING statement.
+    """
+
+    PURGE_EVERY = 1000
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            if self.path != ':memory:':
+                connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS throttle_counter '
+                '(key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires_at REAL NOT NULL)'
+            )
+            self._local.connection = connection
+        return connection
+
+    def incr(self, key, ttl):
+        now = time.time()
+        connection = self._connection()
+        (count,) = connection.execute(
+            'INSERT INTO throttle_counter (key, count, expires_at) VALUES (?, 1, ?) '
+            'ON CONFLICT(key) DO UPDATE SET '
+            'count = CASE WHEN expires_at <= ? THEN 1 ELSE count + 1 END, '
+            'expires_at = CASE WHEN expires_at <= ? THEN excluded.expires_at ELSE expires_at END '
+            'RETURNING count',
+            (key, now + ttl, now, now),
+        ).fetchone()
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            connection.execute('DELETE FROM throttle_counter WHERE expires_at <= ?', (now,))
+        return count
+
+    def decr(self, key):
+        self._connection().execute(
+            'UPDATE throttle_counter SET count = count - 1 WHERE key = ? AND count > 0', (key,),
+        )
+
+    def get(self, key):
+        row = self._connection().execute(
+            'SELECT count FROM throttle_counter WHERE key = ? AND expires_at > ?', (key, time.time()),
+        ).fetchone()
+        return row[0] if row else 0
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_throttle_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                options = getattr(settings, 'THROTTLE_STORE', {})
+                backend_class = import_string(options.get('BACKEND', 'api.throttling.CacheCounterBackend'))
+                _backend = backend_class(**options.get('OPTIONS', {}))
+    return _backend
+
+def reset_throttle_backend():
+    global _backend
+    _backend = None
+
+
+@receiver(setting_changed)
+def throttle_store_changed(setting, **kwargs):
+    # Lets override_settings(THROTTLE_STORE=...) swap the backend
+    if setting == 'THROTTLE_STORE':
+        reset_throttle_backend()
+
+
+class CounterRateThrottle(SimpleRateThrottle):
+    """SimpleRateThrottle on top of the shared counter backend."""
+
+    def get_algorithm(self):
+        return getattr(settings, 'THROTTLE_STORE', {}).get('ALGORITHM', 'fixed')
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        backend = get_throttle_backend()
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        self.window_end = (window + 1) * self.duration
+        # Counters outlive their window by one so the sliding estimate can read them
+        counter = f"{self.key}:{window}"
+        count = backend.incr(counter, self.duration * 2)
+
+        if self.get_algorithm() == 'sliding':
+            previous = backend.get(f"{self.key}:{window - 1}")
+            overlap = 1 - (self.now - window * self.duration) / self.duration
+            self.count = count + previous * overlap
+        else:
+            self.count = count
+
+        if self.count > self.num_requests:
+            # Only allowed requests count, so a client retrying while
+            # throttled is let through once the window moves on
+            backend.decr(counter)
+            return self.throttle_failure()
+        return True
+
+    def wait(self):
+        return max(self.window_end - self.now, 0)
+
+
+class AnonCounterThrottle(CounterRateThrottle, AnonRateThrottle):
+    pass
+
+
+class UserCounterThrottle(CounterRateThrottle, UserRateThrottle):
+    pass
@@ -0,0 +1,283 @@
+"""
+Bounded-cost refresh token revocation checks.
+
+simplejwt checks the blacklist with a JOIN over OutstandingToken and
+BlacklistedToken on every refresh, and both tables only ever grow. Here
+every process keeps the set of revoked, unexpired jtis in memory, behind
+a Bloom filter that answers the common "not revoked" case without
+touching the set or the database. Revocations made by other processes
+are picked up incrementally by BlacklistedToken primary key, signalled
+through a generation counter in the shared cache when one is configured.
+
+Ids are not committed in order: on PostgreSQL a row can commit after one
+with a higher id has been synced. Every id skipped over by a sync is kept
+as a gap and looked up again on each sync until it shows up or is
+GAP_TIMEOUT seconds old (by then its transaction rolled back), so such a
+revocation is picked up late rather than never.
+"""
+import hashlib
+import math
+import threading
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+GENERATION_KEY = 'token_blacklist:generation'
+# Ids below the newest one at load time that are checked for late commits
+LOAD_GAP_SCAN = 1000
+# A full reload is cheaper than tracking more gaps than this
+MAX_GAPS = 10_000
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing."""
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(int(capacity), 1)
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationList:
+    """
+    Revoked refresh-token jtis of one process, kept in step with the
+    database by BlacklistedToken id. Expired jtis are dropped on rebuild.
+    """
+
+    def __init__(self, capacity=100_000, error_rate=0.001, sync_interval=0, shared_alias=None, gap_timeout=300):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.gap_timeout = gap_timeout
+        self.shared = caches[shared_alias] if shared_alias else None
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._revoked = {}
+        self._bloom = None
+        self._last_id = 0
+        self._gaps = {}  # id not seen yet -> when it was skipped
+        self._last_sync = 0.0
+        self._generation = None
+
+    def _reset(self, expected):
+        # Leave headroom so the filter does not fill up before the next prune
+        self._bloom = BloomFilter(max(self.capacity, expected * 2), self.error_rate)
+        self._revoked = {}
+        self._last_id = 0
+        self._gaps = {}
+
+    def _add(self, jti, expires_at):
+        if jti not in self._revoked:
+            self._revoked[jti] = expires_at
+            self._bloom.add(jti)
+            if self._bloom.count > self._bloom.capacity:
+                self._rebuild_filter()
+
+    def _rebuild_filter(self):
+        now = timezone.now()
+        live = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+        self._bloom = BloomFilter(max(self.capacity, len(live) * 2), self.error_rate)
+        self._revoked = {}
+        for jti, expires_at in live.items():
+            self._revoked[jti] = expires_at
+            self._bloom.add(jti)
+
+    def _fetch_since(self, last_id):
+        return (
+            BlacklistedToken.objects
+            .filter(id__gt=last_id, token__expires_at__gt=timezone.now())
+            .order_by('id')
+            .values_list('id', 'token__jti', 'token__expires_at')
+        )
+
+    def _note_gaps(self, seen_ids, start, end, now):
+        """Records the ids in [start, end) that were not seen as gaps."""
+        for row_id in range(start, end):
+            if row_id not in seen_ids:
+                self._gaps[row_id] = now
+
+    def load(self):
+        """Rebuilds the in-memory state from the database."""
+        with self._lock:
+            expected = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now()).count()
+            self._reset(expected)
+            last_id = BlacklistedToken.objects.order_by('-id').values_list('id', flat=True).first() or 0
+            recent_ids = set()
+            for row_id, jti, expires_at in self._fetch_since(0).filter(id__lte=last_id).iterator(chunk_size=10_000):
+                self._add(jti, expires_at)
+                if row_id > last_id - LOAD_GAP_SCAN:
+                    recent_ids.add(row_id)
+            self._note_gaps(recent_ids, max(last_id - LOAD_GAP_SCAN + 1, 1), last_id, time.monotonic())
+            self._last_id = last_id
+            self._last_sync = time.monotonic()
+            self._generation = self._shared_generation()
+            self._loaded = True
+
+    def sync(self, force=False):
+        """
+        Pulls revocations recorded since the last sync (a primary key range
+        scan) and any that have since committed under a skipped id.
+        """
+        with self._lock:
+            if not self._loaded:
+                self.load()
+                return
+            if not force and not self._sync_due():
+                return
+            now = time.monotonic()
+            if self._gaps:
+                late = BlacklistedToken.objects.filter(id__in=list(self._gaps)).values_list(
+                    'id', 'token__jti', 'token__expires_at',
+                )
+                for row_id, jti, expires_at in late:
+                    self._add(jti, expires_at)
+                    del self._gaps[row_id]
+                self._gaps = {row_id: skipped for row_id, skipped in self._gaps.items()
+                              if now - skipped < self.gap_timeout}
+            expected = self._last_id + 1
+            for row_id, jti, expires_at in self._fetch_since(self._last_id):
+                self._note_gaps((), expected, row_id, now)
+                self._add(jti, expires_at)
+                expected = row_id + 1
+            self._last_id = expected - 1
+            self._last_sync = now
+            if len(self._gaps) > MAX_GAPS:
+                self.load()
+
+    def _sync_due(self):
+        if self._gaps:
+            # A skipped id may commit at any moment and nothing announces it
+            return True
+        elapsed = time.monotonic() - self._last_sync
+        if self.shared is None:
+            return elapsed >= self.sync_interval
+        # The generation announces new revocations; the interval is only a backstop
+        generation = self._shared_generation()
+        if generation != self._generation:
+            self._generation = generation
+            return True
+        return bool(self.sync_interval) and elapsed >= self.sync_interval
+
+    def _shared_generation(self):
+        if self.shared is None:
+            return None
+        return self.shared.get(GENERATION_KEY)
+
+    def is_revoked(self, jti):
+        self.sync()
+        with self._lock:
+            if jti not in self._bloom:
+                return False
+            if jti in self._revoked:
+                return True
+        # Bloom filter false positive, or a revocation not synced yet
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    def revoke(self, jti, expires_at):
+        with self._lock:
+            if not self._loaded:
+                self.load()
+            self._add(jti, expires_at)
+        if self.shared is not None:
+            try:
+                self.shared.incr(GENERATION_KEY)
+            except ValueError:
+                self.shared.set(GENERATION_KEY, 1, None)
+
+    def __len__(self):
+        return len(self._revoked)
+
+
+_revocations = None
+_revocations_lock = threading.Lock()
+
+def get_revocation_list():
+    global _revocations
+    if _revocations is None:
+        with _revocations_lock:
+            if _revocations is None:
+                options = getattr(settings, 'TOKEN_BLACKLIST', {})
+                _revocations = RevocationList(
+                    capacity=options.get('BLOOM_CAPACITY', 100_000),
+                    error_rate=options.get('BLOOM_ERROR_RATE', 0.001),
+                    sync_interval=options.get('SYNC_INTERVAL', 0),
+                    shared_alias=options.get('SHARED_CACHE_ALIAS'),
+                    gap_timeout=options.get('GAP_TIMEOUT', 300),
+                )
+    return _revocations
+
+def reset_revocation_list():
+    global _revocations
+    _revocations = None
+
+
+class FastBlacklistRefreshToken(RefreshToken):
+    """RefreshToken whose blacklist check goes through the RevocationList."""
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if get_revocation_list().is_revoked(jti):
+            raise TokenError("Token is blacklisted")
+
+    def blacklist(self):
+        result = super().blacklist()
+        get_revocation_list().revoke(self.payload[api_settings.JTI_CLAIM], datetime_from_epoch(self.payload['exp']))
+        return result
+
+
+class FastBlacklistTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = FastBlacklistRefreshToken
+
+
+def revoke_refresh_token(raw_token):
+    """Validates and blacklists a refresh token (used by the logout views)."""
+    token = FastBlacklistRefreshToken(raw_token)
+    token.blacklist()
+    return token
+
+
+def prune_expired_tokens(batch_size=10_000):
+    """
+    Deletes expired outstanding tokens (and their blacklist rows) walking
+    the primary key in batches. Tokens are issued with a fixed lifetime, so
+    expiry follows id order and the walk stops at the first batch with
+    nothing expired instead of scanning the whole table.
+    """
+    now = timezone.now()
+    deleted = 0
+    queryset = OutstandingToken.objects.order_by()
+    start = queryset.order_by('id').values_list('id', flat=True).first()
+    while start is not None:
+        end = start + batch_size
+        expired = queryset.filter(id__gte=start, id__lt=end, expires_at__lte=now)
+        count, _ = expired.delete()
+        if not count:
+            break
+        deleted += count
+        start = queryset.filter(id__gte=end).order_by('id').values_list('id', flat=True).first()
+    get_revocation_list().load()
+    return deleted
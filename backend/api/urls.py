@@ -1,15 +1,25 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from .views import (
     CategoryViewSet, IncomeViewSet, ExpenseViewSet,
-    SavingsViewSet, BudgetViewSet, GoalViewSet
+    SavingsViewSet, BudgetViewSet, GoalViewSet, DashboardSummaryView,
+    StatementImportView, ExportView, SyncView, BatchView, RecurringRuleViewSet, ForecastView,
+    BalanceView, JobViewSet
 )
 from .auth_views import (
     RegisterAPIView, LoginAPIView, LogoutAPIView, UserAPIView
 )
 from .signup_view import signup_view
 
+if settings.ASYNC_VIEWS:
+    # Read paths served through the async ORM (api/async_views.py)
+    from .async_views import (
+        AsyncDashboardSummaryView as DashboardSummaryView, AsyncExpenseViewSet as ExpenseViewSet,
+        AsyncIncomeViewSet as IncomeViewSet, AsyncUserAPIView as UserAPIView,
+    )
+
 # Router for ViewSets
 router = DefaultRouter()
 router.register(r'categories', CategoryViewSet, basename='category')
@@ -18,6 +28,8 @@ router.register(r'expenses', ExpenseViewSet, basename='expense')
 router.register(r'budgets', BudgetViewSet, basename='budget')
 router.register(r'goals', GoalViewSet, basename='goal')
 router.register(r'savings', SavingsViewSet, basename='savings')
+router.register(r'recurring', RecurringRuleViewSet, basename='recurring-rule')
+router.register(r'jobs', JobViewSet, basename='job')
 
 # URL patterns
 urlpatterns = [
@@ -27,6 +39,13 @@ urlpatterns = [
     path("login/", LoginAPIView.as_view(), name="login"),
     path("logout/", LogoutAPIView.as_view(), name="logout"),
     path("user/", UserAPIView.as_view(), name="user"),
+    path("dashboard/summary/", DashboardSummaryView.as_view(), name="dashboard-summary"),
+    path("forecast/", ForecastView.as_view(), name="forecast"),
+    path("balance/", BalanceView.as_view(), name="balance"),
+    path("import/", StatementImportView.as_view(), name="statement-import"),
+    path("export/", ExportView.as_view(), name="export"),
+    path("sync/", SyncView.as_view(), name="sync"),
+    path("batch/", BatchView.as_view(), name="batch"),
     path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
 ]
@@ -1,19 +1,46 @@
-from rest_framework.decorators import permission_classes
+from rest_framework.decorators import action, permission_classes
 from rest_framework.permissions import AllowAny
-from rest_framework import generics, permissions, status, viewsets
+from rest_framework import generics, mixins, permissions, status, viewsets
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.urls import reverse
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.http import parse_etags
 from django.contrib.auth import authenticate
+from django.db import transaction
 from rest_framework.decorators import api_view
-from .models import Category, Income, Expense, Savings, Budget, Goal
+from .models import Category, Income, Expense, Savings, Budget, Goal, Job, RecurringRule, UserDataVersion
 from .serializers import (
     RegisterSerializer, LoginSerializer, UserSerializer,
     CategorySerializer, IncomeSerializer, ExpenseSerializer,
-    SavingsSerializer, BudgetSerializer, GoalSerializer
+    SavingsSerializer, BudgetSerializer, GoalSerializer,
+    DashboardSummaryQuerySerializer, DashboardSummarySerializer,
+    StatementImportSerializer, ExportQuerySerializer, SyncQuerySerializer,
+    BatchSerializer, RecurringRuleSerializer, ProjectionQuerySerializer, ForecastQuerySerializer,
+    BalanceQuerySerializer, JobSerializer,
+    select_field_names, values_columns, values_rows
 )
+from .batch import run_batch
+from .exporters import export_stream
+from .forecast import forecast
+from .ledger import balance_as_of, ledger_changes
+from .metrics import registry
+from .importers import StatementImportConflict, StatementParseError, import_statement
+from .jobs import enqueue, enqueue_statement_import
+from .pagination import SizedPageNumberPagination, TransactionPagination
+from .recurring import project
+from .reports import summarize_transactions
+from .search import FullTextSearchFilter
+from .signals import transactions_changed
+from .sync import collect_changes
+from .token_blacklist import revoke_refresh_token
+import hashlib
+import hmac
 import logging
 
 # Root View
@@ -37,6 +64,17 @@ def root_view(request):
     """
     return HttpResponse(html_content)
 
+def metrics_view(request):
+    """Aggregated request metrics in the Prometheus text format."""
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if not token:
+        # Only a development server exposes metrics without a token
+        if not settings.DEBUG:
+            return HttpResponse(status=status.HTTP_404_NOT_FOUND)
+    elif not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+    return HttpResponse(registry.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 User = get_user_model()
 
 # Authentication Views
@@ -95,8 +133,7 @@ class LogoutView(generics.GenericAPIView):
             if not refresh_token:
                 return Response({"error": "Refresh token is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-            token = RefreshToken(refresh_token)
-            token.blacklist()
+            revoke_refresh_token(refresh_token)
 
             response = Response({"message": "Logout successful"}, status=status.HTTP_205_RESET_CONTENT)
             response.delete_cookie('refresh_token')
@@ -113,7 +150,77 @@ class UserView(generics.RetrieveAPIView):
         return self.request.user
 
 # Model ViewSets
-class CategoryViewSet(viewsets.ModelViewSet):
+class ConditionalResponseMixin:
+    """
+    Tags list and detail responses with the user's data version as a strong
+    ETag. A matching If-None-Match is answered with 304 before the queryset
+    or serializers run, and serialized bodies are cached per (user,
+    version, URL) for API_RESPONSE_CACHE_TIMEOUT seconds.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def conditional_response(self, render, request, *args, **kwargs):
+        request.data_version = UserDataVersion.current(request.user.pk)
+        etag, key = self.get_conditional_keys(request, request.data_version)
+        if self.is_not_modified(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            timeout = getattr(settings, 'API_RESPONSE_CACHE_TIMEOUT', 0)
+            data = cache.get(key) if timeout else None
+            if data is not None:
+                response = Response(data)
+            else:
+                response = render(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                if timeout:
+                    cache.set(key, response.data, timeout)
+        return self.tag_response(response, etag)
+
+    async def aconditional_response(self, render, request, *args, **kwargs):
+        """`conditional_response` for async views; `render` is awaited."""
+        request.data_version = await UserDataVersion.acurrent(request.user.pk)
+        etag, key = self.get_conditional_keys(request, request.data_version)
+        if self.is_not_modified(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            timeout = getattr(settings, 'API_RESPONSE_CACHE_TIMEOUT', 0)
+            data = await cache.aget(key) if timeout else None
+            if data is not None:
+                response = Response(data)
+            else:
+                response = await render(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                if timeout:
+                    await cache.aset(key, response.data, timeout)
+        return self.tag_response(response, etag)
+
+    def get_conditional_keys(self, request, version):
+        # date_joined keeps a recycled user id from matching a deleted user's entries
+        resource = (
+            request.user.pk, request.user.date_joined, request.get_host(),
+            request.get_full_path(), request.accepted_renderer.format,
+        )
+        digest = hashlib.blake2b(repr(resource).encode('utf-8'), digest_size=8).hexdigest()
+        return f'"{version}-{digest}"', f"api_response:{digest}:{version}"
+
+    def is_not_modified(self, request, etag):
+        if_none_match = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        return etag in if_none_match or '*' in if_none_match
+
+    def tag_response(self, response, etag):
+        response['ETag'] = etag
+        # Let browsers keep the body but revalidate it on every use
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+class CategoryViewSet(ConditionalResponseMixin, viewsets.ModelViewSet):
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticated]
     
@@ -123,49 +230,464 @@ class CategoryViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-class IncomeViewSet(viewsets.ModelViewSet):
-    serializer_class = IncomeSerializer
-    permission_classes = [permissions.IsAuthenticated]
+class TransactionViewSetMixin:
+    """
+    Shared write path for income and expense viewsets. Single-row writes
+    are reported by the model signal receivers; the bulk endpoints write
+    with single statements and send `transactions_changed` with the signed
+    balance delta themselves, so the savings balance is adjusted in place
+    rather than recomputed from history.
+    """
+    pagination_class = TransactionPagination
+    # `?q=` searches name and description, best matches first
+    filter_backends = [FullTextSearchFilter]
+    # +1 for money coming in, -1 for money going out
+    balance_sign = 1
 
     def get_queryset(self):
-        return Income.objects.filter(user=self.request.user)
+        # Newest first; served by the (user, date, id) index
+        return self.serializer_class.Meta.model.objects.filter(user=self.request.user).order_by('-date', '-id')
+
+    def list(self, request, *args, **kwargs):
+        queryset, fields = self.get_list_rows(request)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(values_rows(page, fields))
+        return Response(values_rows(queryset, fields))
+
+    def get_list_rows(self, request):
+        # Read-only listing: rows come from values_list() tuples instead of
+        # model instances, and only the selected columns are fetched
+        fields = select_field_names(request, self.serializer_class.Meta.fields)
+        # Keyset cursors are built from the page's date and id
+        columns = values_columns(fields, extra=('id', 'date'))
+        return self.filter_queryset(self.get_queryset()).values_list(*columns, named=True), fields
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        with transaction.atomic():
+            serializer.save(user=self.request.user)
 
-class ExpenseViewSet(viewsets.ModelViewSet):
-    serializer_class = ExpenseSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            serializer.save()
 
-    def get_queryset(self):
-        return Expense.objects.filter(user=self.request.user)
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
 
-    def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Bulk create (POST a list of rows), update (PATCH a list of rows with
+        `id`) or delete (DELETE a list of ids) in one transaction. Nothing is
+        written unless every row is valid; errors are reported per index.
+        """
+        items = request.data
+        if request.method == 'DELETE' and isinstance(items, dict):
+            items = items.get('ids')
+        if not isinstance(items, list):
+            return Response({"detail": "Expected a list of items."}, status=status.HTTP_400_BAD_REQUEST)
+
+        max_items = getattr(settings, 'API_BULK_MAX_ITEMS', 5000)
+        if len(items) > max_items:
+            return Response(
+                {"detail": f"At most {max_items} items can be sent in one request."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if request.method == 'POST':
+            return self.bulk_create(items)
+        if request.method == 'PATCH':
+            return self.bulk_update(items)
+        return self.bulk_destroy(items)
+
+    def get_bulk_serializer_context(self):
+        context = self.get_serializer_context()
+        context['category_cache'] = Category.objects.filter(user=self.request.user).in_bulk()
+        return context
+
+    def bulk_create(self, items):
+        model = self.serializer_class.Meta.model
+        serializer = self.serializer_class(data=items, many=True, context=self.get_bulk_serializer_context())
+        if not serializer.is_valid():
+            return self.bulk_error_response(serializer.errors)
+
+        instances = [model(user=self.request.user, **attrs) for attrs in serializer.validated_data]
+        with transaction.atomic():
+            model.objects.bulk_create(instances, batch_size=500)
+            self.send_transactions_changed(
+                sum(instance.amount for instance in instances),
+                entries=[(instance.pk, instance.date, instance.amount) for instance in instances],
+            )
+
+        data = self.serializer_class(instances, many=True, context=self.get_serializer_context()).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    def bulk_update(self, items):
+        model = self.serializer_class.Meta.model
+        ids = [item.get('id') for item in items if isinstance(item, dict)]
+        existing = self.get_queryset().order_by().in_bulk([pk for pk in ids if isinstance(pk, int)])
+        context = self.get_bulk_serializer_context()
+
+        errors = []
+        updates = []
+        for item in items:
+            instance = existing.get(item.get('id')) if isinstance(item, dict) else None
+            if instance is None:
+                errors.append({"id": ["Not found."]})
+                continue
+            serializer = self.serializer_class(instance, data=item, partial=True, context=context)
+            if serializer.is_valid():
+                errors.append({})
+                updates.append((instance, serializer.validated_data))
+            else:
+                errors.append(serializer.errors)
+        if any(errors):
+            return self.bulk_error_response(errors)
 
-class SavingsViewSet(viewsets.ReadOnlyModelViewSet):
+        delta = 0
+        changes = []
+        # bulk_update() does not apply auto_now
+        fields = {'updated_at'}
+        now = timezone.now()
+        for instance, attrs in updates:
+            instance.updated_at = now
+            delta += attrs.get('amount', instance.amount) - instance.amount
+            changes.append((instance.pk, instance.date, -instance.amount))
+            for field, value in attrs.items():
+                setattr(instance, field, value)
+            changes.append((instance.pk, instance.date, instance.amount))
+            fields.update(attrs)
+
+        instances = [instance for instance, _ in updates]
+        with transaction.atomic():
+            model.objects.bulk_update(instances, sorted(fields), batch_size=500)
+            self.send_transactions_changed(delta, entries=ledger_changes(changes))
+
+        data = self.serializer_class(instances, many=True, context=self.get_serializer_context()).data
+        return Response(data, status=status.HTTP_200_OK)
+
+    def bulk_destroy(self, ids):
+        queryset = self.get_queryset().order_by()
+        found = set(queryset.filter(id__in=[pk for pk in ids if isinstance(pk, int)]).values_list('id', flat=True))
+        errors = [{} if pk in found else {"id": ["Not found."]} for pk in ids]
+        if any(errors):
+            return self.bulk_error_response(errors)
+
+        with transaction.atomic():
+            rows = queryset.filter(id__in=found)
+            removed = [(pk, date, -amount) for pk, date, amount in rows.values_list('id', 'date', 'amount')]
+            self.serializer_class.Meta.model.delete_rows(rows)
+            self.send_transactions_changed(
+                sum(amount for _, _, amount in removed), deleted=sorted(found), entries=removed,
+            )
+
+        return Response({"deleted": len(found)}, status=status.HTTP_200_OK)
+
+    def bulk_error_response(self, errors):
+        return Response(
+            {"errors": [{"index": index, "errors": item} for index, item in enumerate(errors) if item]},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    def send_transactions_changed(self, amount, deleted=(), entries=()):
+        # `amount` and the entries' amounts are changes to the rows' amounts;
+        # the signal carries their effect on the balance
+        transactions_changed.send(
+            sender=self.serializer_class.Meta.model,
+            user=self.request.user,
+            delta=self.balance_sign * amount,
+            deleted=deleted,
+            entries=[(pk, date, self.balance_sign * change) for pk, date, change in entries],
+        )
+
+class IncomeViewSet(ConditionalResponseMixin, TransactionViewSetMixin, viewsets.ModelViewSet):
+    serializer_class = IncomeSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    balance_sign = 1
+
+class ExpenseViewSet(ConditionalResponseMixin, TransactionViewSetMixin, viewsets.ModelViewSet):
+    serializer_class = ExpenseSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    balance_sign = -1
+
+class SavingsViewSet(ConditionalResponseMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = SavingsSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         return Savings.objects.filter(user=self.request.user)
 
-class BudgetViewSet(viewsets.ModelViewSet):
+    def list(self, request, *args, **kwargs):
+        # The balance is maintained incrementally; make sure the row exists
+        Savings.for_user(request.user)
+        return super().list(request, *args, **kwargs)
+
+class BudgetViewSet(ConditionalResponseMixin, viewsets.ModelViewSet):
     serializer_class = BudgetSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = SizedPageNumberPagination
+    filter_backends = [FullTextSearchFilter]
 
     def get_queryset(self):
-        return Budget.objects.filter(user=self.request.user)
+        # Items are fetched in one extra query instead of one per budget
+        return (
+            Budget.objects.filter(user=self.request.user)
+            .prefetch_related('items')
+            .order_by('-start_date', '-id')
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request is None or self.request.method not in ('POST', 'PUT', 'PATCH'):
+            return context
+        items = self.request.data.get('items') if isinstance(self.request.data, dict) else None
+        if isinstance(items, list) and any(isinstance(item, dict) and item.get('expense_category') for item in items):
+            # Item categories are validated against one lookup, not one query per item
+            context['category_cache'] = Category.objects.filter(user=self.request.user).in_bulk()
+        return context
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-class GoalViewSet(viewsets.ModelViewSet):
+class GoalViewSet(ConditionalResponseMixin, viewsets.ModelViewSet):
     serializer_class = GoalSerializer
     permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [FullTextSearchFilter]
 
     def get_queryset(self):
         return Goal.objects.filter(user=self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+class RecurringRuleViewSet(ConditionalResponseMixin, viewsets.ModelViewSet):
+    serializer_class = RecurringRuleSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return (
+            RecurringRule.objects.filter(user=self.request.user)
+            .prefetch_related('amount_changes')
+            .order_by('id')
+        )
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    @action(detail=False, methods=['get'])
+    def projection(self, request):
+        """
+        Upcoming occurrences that have not been recorded yet, in date order.
+
+        Query params: start and end (YYYY-MM-DD; default today and 90 days on).
+        """
+        query = ProjectionQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        start, end = query.validated_data['start'], query.validated_data['end']
+        occurrences = [
+            {
+                'rule': occurrence.rule.id,
+                'name': occurrence.rule.name,
+                'kind': occurrence.rule.kind,
+                'category': occurrence.rule.category_id,
+                'date': occurrence.date,
+                'amount': occurrence.amount,
+            }
+            for occurrence in project(request.user, start, end)
+        ]
+        return Response({'start': start, 'end': end, 'occurrences': occurrences}, status=status.HTTP_200_OK)
+
+def job_accepted_response(request, job):
+    """202 with the job's status and where to poll it."""
+    response = Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+    response['Location'] = request.build_absolute_uri(reverse('job-detail', args=[job.pk]))
+    return response
+
+class JobViewSet(mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Background jobs. POST {"kind": ...} queues one and answers 202; poll
+    /jobs/<id>/ for its status and result. Job state is not part of the
+    user's data version, so responses are not conditional.
+    """
+    serializer_class = JobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return Job.objects.filter(user=self.request.user).order_by('-id')
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return job_accepted_response(request, enqueue(request.user, serializer.validated_data['kind']))
+
+# Report Views
+class DashboardSummaryView(generics.GenericAPIView):
+    """
+    Per-period income and expense totals grouped by category.
+
+    Query params: period (day, week or month), start and end (YYYY-MM-DD).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = DashboardSummarySerializer
+
+    def get(self, request):
+        params = self.get_query_params(request)
+        return self.summary_response(params, summarize_transactions(request.user, **params))
+
+    def get_query_params(self, request):
+        query = DashboardSummaryQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        return {'period': params['period'], 'start': params.get('start'), 'end': params.get('end')}
+
+    def summary_response(self, params, summary):
+        serializer = self.get_serializer({**params, **summary})
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+class BalanceView(generics.GenericAPIView):
+    """
+    The balance from all income and expenses dated on or before a day.
+
+    Query params: date (YYYY-MM-DD, default today).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = BalanceQuerySerializer
+
+    def get(self, request):
+        query = self.get_serializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        day = query.validated_data.get('date') or timezone.localdate()
+        balance = balance_as_of(request.user, day)
+        return Response({'date': day, 'balance': format(balance, '.2f')}, status=status.HTTP_200_OK)
+
+class ForecastView(generics.GenericAPIView):
+    """
+    Projected balance at the end of each of the next months, with a
+    confidence band, and whether each goal will be met by its deadline.
+
+    Query params: months (3 to 12, default 6).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = ForecastQuerySerializer
+
+    def get(self, request):
+        query = self.get_serializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        return Response(forecast(request.user, months=query.validated_data['months']), status=status.HTTP_200_OK)
+
+# Sync Views
+class SyncView(generics.GenericAPIView):
+    """
+    Records created, updated or deleted since a client watermark.
+
+    Query params: since (the watermark returned by the previous call; omit
+    it for a full snapshot).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = SyncQuerySerializer
+
+    def get(self, request):
+        query = self.get_serializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        changes = collect_changes(request.user, query.validated_data.get('since'), self.get_serializer_context())
+        return Response(changes, status=status.HTTP_200_OK)
+
+# Batch Views
+class BatchView(generics.GenericAPIView):
+    """
+    Runs several API calls in one request.
+
+    Body: {"requests": [{"method", "path", "params", "headers", "body"}, ...],
+    "parallel": false}. Responds with one {"status", "headers", "body"} per
+    sub-request, in order.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = BatchSerializer
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        responses = run_batch(request, params['requests'], parallel=params['parallel'])
+        return Response({"responses": responses}, status=status.HTTP_200_OK)
+
+# Import Views
+class StatementImportView(generics.GenericAPIView):
+    """
+    Imports a bank statement into income and expenses.
+
+    Multipart fields: file, file_type (csv, ofx or qif; guessed from the
+    file name), kind (income or expense; otherwise decided by sign),
+    date_format (strptime format) and columns (JSON field -> header map).
+    A file already imported returns its earlier summary whatever the
+    options; one that keeps colliding with concurrent imports of
+    overlapping statements answers 409. With `Prefer: respond-async` the import is queued as a background job
+    and the response is 202 with the job.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+    serializer_class = StatementImportSerializer
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        uploaded = params['file']
+
+        if 'respond-async' in request.headers.get('Prefer', ''):
+            job = enqueue_statement_import(
+                request.user, uploaded,
+                file_type=params.get('file_type'),
+                kind=params.get('kind'),
+                columns=params.get('columns'),
+                date_format=params.get('date_format'),
+            )
+            return job_accepted_response(request, job)
+
+        try:
+            summary = import_statement(
+                request.user,
+                uploaded.file,
+                filename=uploaded.name,
+                file_type=params.get('file_type'),
+                kind=params.get('kind'),
+                columns=params.get('columns'),
+                date_format=params.get('date_format'),
+            )
+        except StatementParseError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except StatementImportConflict as e:
+            return Response({"detail": str(e)}, status=status.HTTP_409_CONFLICT)
+
+        response_status = status.HTTP_200_OK if summary['already_imported'] else status.HTTP_201_CREATED
+        return Response(summary, status=response_status)
+
+# Export Views
+class ExportView(generics.GenericAPIView):
+    """
+    Streams the user's income, expenses, budgets, budget items and goals.
+
+    Query params: output (csv or ndjson), gzip (true/false) and types
+    (comma separated subset of record types).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = ExportQuerySerializer
+
+    def get(self, request):
+        query = self.get_serializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        output = params['output']
+        filename = f"financeflow-export.{output}"
+        if params['gzip']:
+            filename += '.gz'
+        content_type = 'text/csv' if output == 'csv' else 'application/x-ndjson'
+
+        response = StreamingHttpResponse(
+            export_stream(request.user, output=output, record_types=params.get('types'), compress=params['gzip']),
+            content_type='application/gzip' if params['gzip'] else f'{content_type}; charset=utf-8',
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
@@ -0,0 +1,21 @@
+"""
+ASGI config for crud project.
+
+It exposes the ASGI callable as a module-level variable named ``application``
+and serves the read-heavy endpoints from async views (ASYNC_VIEWS). Run it
+with e.g. ``gunicorn config.asgi:application -k uvicorn.workers.UvicornWorker``
+and DB_CONNECTION_MODE=pool (or pgbouncer): persistent connections are kept
+per thread, and ASGI runs each request's sync code in a new one.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('DJANGO_ASYNC_VIEWS', 'True')
+
+application = get_asgi_application()
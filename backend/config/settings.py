@@ -1,4 +1,5 @@
 from pathlib import Path
+from corsheaders.defaults import default_headers
 from datetime import timedelta
 import os
 import sys
@@ -34,6 +35,7 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = 'api.CustomUser'
 
 MIDDLEWARE = [
+    'api.middlewares.RequestMetricsMiddleware',  # Per-request query/latency instrumentation
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -65,17 +67,47 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
+# How PostgreSQL connections are managed (DB_CONNECTION_MODE); api/checks.py
+# warns about modes that do not suit the deployment:
+# * persistent: each thread keeps its own connection for CONN_MAX_AGE seconds
+# * per_request: every request opens and closes a connection
+# * pool: requests borrow from a pool of DB_POOL['MAX_SIZE'] connections per
+#   worker process (api/postgresql_pool); size it to the worker's threads
+# * pgbouncer: DATABASE_URL points at PgBouncer in transaction pooling mode,
+#   so no server-side cursors (and no prepared statements, which Django
+#   already leaves off)
+DB_CONNECTION_MODE = os.environ.get('DB_CONNECTION_MODE', 'persistent')
+DB_CONNECTION_MODES = {
+    'persistent': {'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600))},
+    'per_request': {'CONN_MAX_AGE': 0},
+    'pool': {'ENGINE': 'api.postgresql_pool', 'CONN_MAX_AGE': 0},
+    'pgbouncer': {'CONN_MAX_AGE': 0, 'DISABLE_SERVER_SIDE_CURSORS': True},
+}
+
+# Connection pool for DB_CONNECTION_MODE=pool: connections per worker process,
+# seconds to wait for a free one, seconds before idle or old connections are
+# closed, and seconds idle after which a connection is checked before reuse
+DB_POOL = {
+    'MAX_SIZE': int(os.environ.get('DB_POOL_MAX_SIZE', 4)),
+    'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+    'MAX_IDLE': 300,
+    'MAX_LIFETIME': 3600,
+    'CHECK_AFTER': 30,
+}
+
 # Database configuration
 # Use PostgreSQL in production (on Render) if DATABASE_URL is provided, otherwise use SQLite
 if 'DATABASE_URL' in os.environ:
     # Parse database connection url
     import dj_database_url
     DATABASES = {
-        'default': dj_database_url.config(
-            default=os.environ.get('DATABASE_URL'),
-            conn_max_age=600,
-            conn_health_checks=True,
-        )
+        'default': {
+            **dj_database_url.config(
+                default=os.environ.get('DATABASE_URL'),
+                conn_health_checks=True,
+            ),
+            **DB_CONNECTION_MODES.get(DB_CONNECTION_MODE, DB_CONNECTION_MODES['persistent']),
+        }
     }
     print("Using PostgreSQL database", file=sys.stderr)
 else:
@@ -88,6 +120,72 @@ else:
     }
     print("Using SQLite database", file=sys.stderr)
 
+# Cache configuration
+# Use Redis when REDIS_URL is provided so cached data and invalidations are
+# shared by every worker; otherwise fall back to a per-process cache
+if 'REDIS_URL' in os.environ:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds to keep derived budget progress before recomputing it
+BUDGET_ACTUALS_CACHE_TIMEOUT = int(os.environ.get('BUDGET_ACTUALS_CACHE_TIMEOUT', 300))
+
+# Delta sync (api/sync.py). Tombstones older than the retention window are
+# pruned, and clients whose watermark predates it receive a full snapshot.
+SYNC = {
+    'WATERMARK_LAG': 5,
+    'TOMBSTONE_RETENTION_DAYS': int(os.environ.get('SYNC_TOMBSTONE_RETENTION_DAYS', 90)),
+}
+
+# Serve the read-heavy endpoints from async views (api/async_views.py).
+# config/asgi.py turns this on; under WSGI the sync views avoid running an
+# event loop per request.
+ASYNC_VIEWS = os.environ.get('DJANGO_ASYNC_VIEWS', 'False') == 'True'
+
+# Seconds to keep serialized list/detail bodies, keyed by the user's data
+# version so a write makes older entries unreachable (0 disables)
+API_RESPONSE_CACHE_TIMEOUT = int(os.environ.get('API_RESPONSE_CACHE_TIMEOUT', 60))
+
+# Balance ledger (api/ledger.py): entries younger than COMPACTION_LAG seconds
+# are left for the next compaction, in case their transaction is still open.
+LEDGER = {
+    'COMPACTION_LAG': 300,
+}
+
+# Cash-flow forecasts (api/forecast.py): days of history fitted, daily trend
+# damping, z-score of the confidence band and seconds to cache a result
+# (keyed by the user's data version and the date).
+FORECAST = {
+    'HISTORY_DAYS': 365,
+    'TREND_DAMPING': 0.995,
+    'CONFIDENCE_Z': 1.645,
+    'CACHE_TIMEOUT': int(os.environ.get('FORECAST_CACHE_TIMEOUT', 3600)),
+}
+
+# Background jobs (api/jobs.py): attempts per job, retry backoff base and cap
+# in seconds, how often a running job sends a heartbeat and how long without
+# one before it is presumed lost, and the `run_jobs` worker's idle poll
+# interval and thread count.
+JOBS = {
+    'MAX_ATTEMPTS': 3,
+    'RETRY_BACKOFF': 30,
+    'MAX_BACKOFF': 3600,
+    'HEARTBEAT': 60,
+    'STALE_AFTER': 300,
+    'POLL_INTERVAL': 1.0,
+    'THREADS': int(os.environ.get('JOB_WORKER_THREADS', 2)),
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -110,6 +208,11 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Uploads kept for background jobs (queued statement imports). The web
+# service and the job worker must see the same storage: a shared disk, or a
+# remote STORAGES['default'] backend when they run on different hosts.
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
     "http://localhost:5173",
@@ -118,7 +221,9 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 CORS_ALLOW_CREDENTIALS = True  # Important for withCredentials
-CORS_EXPOSE_HEADERS = ['Content-Type', 'X-CSRFToken']
+CORS_EXPOSE_HEADERS = ['Content-Type', 'X-CSRFToken', 'Server-Timing']
+# Prefer: respond-async queues statement imports as background jobs
+CORS_ALLOW_HEADERS = (*default_headers, 'prefer')
 
 # Add these session/cookie settings
 SESSION_COOKIE_SAMESITE = 'Lax'
@@ -135,6 +240,11 @@ if DEBUG:
         'http://localhost:5173'
     ]
 
+# Request instrumentation (api.middlewares.RequestMetricsMiddleware)
+API_SERVER_TIMING = os.environ.get('API_SERVER_TIMING', str(DEBUG)) == 'True'
+API_SLOW_REQUEST_MS = float(os.environ.get('API_SLOW_REQUEST_MS', 0))  # 0 disables slow request logging
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # Bearer token for /metrics; without it, only served when DEBUG
+
 # JWT authentication exemptions for specific paths
 REST_FRAMEWORK_EXEMPT_ENDPOINTS = ['register', 'signup']
 
@@ -154,13 +264,35 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        'api.throttling.AnonCounterThrottle',
+        'api.throttling.UserCounterThrottle'
     ],
     'DEFAULT_THROTTLE_RATES': {
-        'anon': '100/day',
-        'user': '1000/day'
+        'anon': os.environ.get('API_ANON_THROTTLE_RATE', '100/day'),
+        'user': os.environ.get('API_USER_THROTTLE_RATE', '1000/day'),
+    }
+}
+
+# Shared counters behind api.throttling, in the default cache: global with
+# Redis, per process otherwise. THROTTLE_DB_PATH instead shares a SQLite file
+# between the workers of one host that has no Redis.
+if 'THROTTLE_DB_PATH' in os.environ:
+    THROTTLE_STORE = {
+        'BACKEND': 'api.throttling.SQLiteCounterBackend',
+        'OPTIONS': {'path': os.environ['THROTTLE_DB_PATH']},
     }
+else:
+    THROTTLE_STORE = {'BACKEND': 'api.throttling.CacheCounterBackend', 'OPTIONS': {'alias': 'default'}}
+THROTTLE_STORE['ALGORITHM'] = os.environ.get('THROTTLE_ALGORITHM', 'sliding')
+
+# Cache of authenticated users for api.authentication.ExemptableJWTAuthentication.
+# Entries expire after TTL seconds, which bounds how long another worker can
+# keep serving a user that was just deactivated.
+JWT_USER_CACHE = {
+    'ENABLED': os.environ.get('JWT_USER_CACHE_ENABLED', 'True') == 'True',
+    'TTL': int(os.environ.get('JWT_USER_CACHE_TTL', 60)),
+    'MAX_SIZE': 4096,
+    'SHARED_CACHE_ALIAS': 'default' if 'REDIS_URL' in os.environ else None,
 }
 
 SIMPLE_JWT = {
@@ -175,12 +307,25 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
+    'TOKEN_REFRESH_SERIALIZER': 'api.token_blacklist.FastBlacklistTokenRefreshSerializer',
+}
+
+# In-process revocation list for refresh tokens (see api/token_blacklist.py).
+# Without a shared cache every check pulls new revocations by primary key
+# (SYNC_INTERVAL 0); with Redis the generation counter announces them and
+# SYNC_INTERVAL is only a backstop.
+TOKEN_BLACKLIST = {
+    'BLOOM_CAPACITY': int(os.environ.get('TOKEN_BLACKLIST_BLOOM_CAPACITY', 100000)),
+    'BLOOM_ERROR_RATE': 0.001,
+    'SYNC_INTERVAL': 30 if 'REDIS_URL' in os.environ else 0,
+    'SHARED_CACHE_ALIAS': 'default' if 'REDIS_URL' in os.environ else None,
+    'GAP_TIMEOUT': 300,  # Seconds to keep looking for a blacklist row committed out of id order
 }
 
 # Add this to ensure static files are served properly
 if not DEBUG:
     # Enable WhiteNoise for serving static files in production
-    MIDDLEWARE.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')
+    MIDDLEWARE.insert(MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1, 'whitenoise.middleware.WhiteNoiseMiddleware')
     CSRF_COOKIE_SECURE = True
     SESSION_COOKIE_SECURE = True
     CSRF_TRUSTED_ORIGINS = [
@@ -63,4 +63,218 @@ export const getGoals = async (): Promise<Goal[]> => {
 export const createGoal = async (data: Omit<Goal, 'id'>): Promise<Goal> => {
   const response = await apiClient.post('/goals/', data);
   return response.data;
+};
+
+// Dashboard summary
+export interface SummaryRow {
+  period: string;
+  type: 'income' | 'expense';
+  category: number | null;
+  category_name: string | null;
+  total: string;
+  count: number;
+}
+
+export interface DashboardSummary {
+  period: 'day' | 'week' | 'month';
+  start: string | null;
+  end: string | null;
+  results: SummaryRow[];
+  totals: { income: string; expense: string; net: string };
+}
+
+export const getDashboardSummary = async (
+  params: { period?: 'day' | 'week' | 'month'; start?: string; end?: string } = {}
+): Promise<DashboardSummary> => {
+  const response = await apiClient.get('/dashboard/summary/', { params });
+  return response.data;
+};
+
+// Delta sync
+export interface SyncChanges {
+  watermark: string;
+  reset: boolean;
+  changes: {
+    categories: { id: number; name: string; cat_type: 'IN' | 'EX' }[];
+    income: FinanceItem[];
+    expenses: FinanceItem[];
+    budgets: Budget[];
+    goals: Goal[];
+  };
+  deleted: {
+    categories: number[];
+    income: number[];
+    expenses: number[];
+    budgets: number[];
+    budget_items: number[];
+    goals: number[];
+  };
+}
+
+// Pass the previous watermark to receive only what changed since then
+export const getSyncChanges = async (since?: string): Promise<SyncChanges> => {
+  const response = await apiClient.get('/sync/', { params: since ? { since } : {} });
+  return response.data;
+};
+
+// Batched requests
+export interface BatchRequest {
+  method?: 'GET' | 'POST' | 'PUT' | 'PATCH' | 'DELETE';
+  path: string;
+  params?: Record<string, string | number>;
+  headers?: Record<string, string>;
+  body?: unknown;
+}
+
+export interface BatchResponse<T = any> {
+  status: number;
+  headers: Record<string, string>;
+  body: T;
+}
+
+export const batchRequests = async (
+  requests: BatchRequest[],
+  parallel = false
+): Promise<BatchResponse[]> => {
+  const response = await apiClient.post('/batch/', { requests, parallel });
+  return response.data.responses;
+};
+
+// Everything the dashboard needs on first load, in one round trip
+export const getDashboardData = async () => {
+  const [income, expenses, budgets, goals, savings] = await batchRequests(
+    ['/api/income/', '/api/expenses/', '/api/budgets/', '/api/goals/', '/api/savings/'].map((path) => ({ path })),
+    true
+  );
+  return { income, expenses, budgets, goals, savings };
+};
+// Recurring rules
+export interface RecurringRule {
+  id?: number;
+  kind: 'IN' | 'EX';
+  name: string;
+  amount: string;
+  category?: number | null;
+  description?: string;
+  frequency: 'daily' | 'weekly' | 'monthly' | 'yearly';
+  interval?: number;
+  start_date: string;
+  end_date?: string | null;
+  next_occurrence?: string | null;
+  is_active?: boolean;
+  amount_changes?: { effective_date: string; amount: string }[];
+}
+
+export interface ProjectedOccurrence {
+  rule: number;
+  name: string;
+  kind: 'IN' | 'EX';
+  category: number | null;
+  date: string;
+  amount: string;
+}
+
+export const getRecurringRules = async (): Promise<RecurringRule[]> => {
+  const response = await apiClient.get('/recurring/');
+  return response.data;
+};
+
+export const createRecurringRule = async (rule: RecurringRule): Promise<RecurringRule> => {
+  const response = await apiClient.post('/recurring/', rule);
+  return response.data;
+};
+
+export const updateRecurringRule = async (id: number, rule: Partial<RecurringRule>): Promise<RecurringRule> => {
+  const response = await apiClient.patch(`/recurring/${id}/`, rule);
+  return response.data;
+};
+
+export const deleteRecurringRule = async (id: number) => {
+  await apiClient.delete(`/recurring/${id}/`);
+};
+
+// Occurrences not yet recorded, for forecasts; dates are YYYY-MM-DD
+export const getRecurringProjection = async (start?: string, end?: string): Promise<ProjectedOccurrence[]> => {
+  const response = await apiClient.get('/recurring/projection/', { params: { start, end } });
+  return response.data.occurrences;
+};
+
+// Cash-flow forecast
+export interface ForecastMonth {
+  month: string;
+  net: number;
+  expected: number;
+  low: number;
+  high: number;
+}
+
+export interface GoalForecast {
+  id: number;
+  name: string;
+  deadline: string;
+  remaining: number;
+  projected_savings: number | null;
+  on_track: boolean | null;
+  probability: number | null;
+}
+
+export interface Forecast {
+  as_of: string;
+  balance: number;
+  history_days: number;
+  trend_per_day: number;
+  months: ForecastMonth[];
+  goals: GoalForecast[];
+}
+
+export const getForecast = async (months = 6): Promise<Forecast> => {
+  const response = await apiClient.get('/forecast/', { params: { months } });
+  return response.data;
+};
+
+// Balance from all transactions dated on or before `date` (YYYY-MM-DD; default today)
+export const getBalanceAsOf = async (date?: string): Promise<{ date: string; balance: string }> => {
+  const response = await apiClient.get('/balance/', { params: date ? { date } : {} });
+  return response.data;
+};
+
+// Full-text search over name and description, best matches first
+export type SearchableResource = 'income' | 'expenses' | 'budgets' | 'goals';
+
+export const search = async <T = FinanceItem>(resource: SearchableResource, q: string, page = 1) => {
+  const response = await apiClient.get(`/${resource}/`, { params: { q, page } });
+  return response.data as { count: number | null; next: string | null; previous: string | null; results: T[] };
+};
+
+// Background jobs: queue one, then poll its status
+export interface Job {
+  id: number;
+  kind: 'recalculate_savings' | 'materialize_recurring' | 'import_statement';
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  attempts: number;
+  max_attempts: number;
+  run_after: string;
+  result: Record<string, unknown> | null;
+  error: string;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+}
+
+export const startJob = async (kind: Exclude<Job['kind'], 'import_statement'>): Promise<Job> => {
+  const response = await apiClient.post('/jobs/', { kind });
+  return response.data;
+};
+
+export const getJob = async (id: number): Promise<Job> => {
+  const response = await apiClient.get(`/jobs/${id}/`);
+  return response.data;
+};
+
+// Queues a statement import instead of waiting for it
+export const importStatementInBackground = async (file: File): Promise<Job> => {
+  const form = new FormData();
+  form.append('file', file);
+  const response = await apiClient.post('/import/', form, { headers: { Prefer: 'respond-async' } });
+  return response.data;
 };
\ No newline at end of file